@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Chat rendering benchmark for Stream Artifact
+Feeds synthetic chat into ChatWindow through the UI bridge at a fixed rate
+and reports sustained frames per second and per-frame render cost
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+import tkinter as tk
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.ui.chat_window import ChatWindow
+from src.ui.ui_bridge import UIBridge
+
+# Subset of the main window palette used by ChatWindow
+COLORS = {
+    'bg_primary': '#0a0a0a',
+    'bg_secondary': '#1a1a1a',
+    'bg_tertiary': '#2a2a2a',
+    'text_primary': '#ffffff',
+    'text_secondary': '#d4d4d4',
+    'border_color': '#404040',
+    'accent_primary': '#3CA0FF',
+    'accent_secondary': '#40E0D0',
+    'accent_tertiary': '#FF6B9D',
+    'hover_color': '#2a2a2a',
+    'success_color': '#4ade80',
+    'warning_color': '#fbbf24',
+    'error_color': '#f87171',
+}
+
+SAMPLE_TEXT = [
+    "PogChamp that was insane",
+    "!ai what game is this?",
+    "first time here, love the stream",
+    "check this out https://example.com/clip/12345",
+    "LUL",
+    "gg",
+    "how long have you been streaming today?",
+]
+
+
+def synthetic_message(index: int):
+    """Build UIBridge.post_message arguments for a random chat message"""
+    text = random.choice(SAMPLE_TEXT)
+    return {
+        'username': f"viewer{random.randint(1, 500)}",
+        'message': f"{text} #{index}",
+        'message_type': 'command' if text.startswith('!') else 'chat',
+        'user_badges': random.choice([[], [], ['subscriber'], ['vip'], ['moderator']]),
+    }
+
+
+def run(rate: float, duration: float, interval_ms: int, per_message: bool):
+    """Run the benchmark and return (frame_times, frames, elapsed, messages)"""
+    root = tk.Tk()
+    root.geometry("900x700")
+
+    chat = ChatWindow(root, COLORS)
+    chat._add_example_messages = lambda: None
+    chat.create_interface()
+
+    bridge = UIBridge(interval_ms=interval_ms)
+    if per_message:
+        # Legacy path: one widget update and scroll per message
+        bridge.on_messages = lambda batch: [chat.add_messages([msg]) for msg in batch]
+    else:
+        bridge.on_messages = chat.add_messages
+
+    frame_times = []
+    state = {'sent': 0, 'frames': 0}
+    start = time.perf_counter()
+
+    def frame():
+        now = time.perf_counter()
+        elapsed = now - start
+
+        # Produce whatever the target rate says should have arrived by now
+        due = int(elapsed * rate)
+        while state['sent'] < due:
+            bridge.post_message(**synthetic_message(state['sent']))
+            state['sent'] += 1
+
+        frame_start = time.perf_counter()
+        bridge.drain()
+        root.update_idletasks()
+        frame_times.append(time.perf_counter() - frame_start)
+        state['frames'] += 1
+
+        if elapsed < duration:
+            root.after(interval_ms, frame)
+        else:
+            root.quit()
+
+    root.after(interval_ms, frame)
+    root.mainloop()
+    elapsed = time.perf_counter() - start
+    root.destroy()
+
+    return frame_times, state['frames'], elapsed, state['sent']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ChatWindow rendering under sustained chat")
+    parser.add_argument("--rate", type=float, default=100.0, help="messages per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--interval-ms", type=int, default=50, help="UI bridge frame interval")
+    parser.add_argument("--per-message", action="store_true", help="render each message separately (legacy path)")
+    parser.add_argument("--min-fps", type=float, default=15.0, help="fail if sustained fps drops below this")
+    args = parser.parse_args()
+
+    try:
+        frame_times, frames, elapsed, sent = run(args.rate, args.duration, args.interval_ms, args.per_message)
+    except tk.TclError as e:
+        print(f"❌ Tk is not available (no display?): {e}")
+        sys.exit(2)
+
+    fps = frames / elapsed
+    frame_ms = sorted(t * 1000 for t in frame_times)
+    p95 = frame_ms[int(len(frame_ms) * 0.95) - 1] if frame_ms else 0.0
+
+    mode = "per-message" if args.per_message else "batched"
+    print(f"💬 {sent} messages at {args.rate:.0f} msg/s over {elapsed:.1f}s ({mode})")
+    print(f"🖼️ Sustained: {fps:.1f} fps (target {1000 / args.interval_ms:.0f})")
+    print(f"⏱️ Frame render: mean {statistics.mean(frame_ms):.2f} ms, "
+          f"p95 {p95:.2f} ms, max {frame_ms[-1]:.2f} ms")
+
+    if fps < args.min_fps:
+        print(f"❌ Sustained fps below {args.min_fps:.0f}")
+        sys.exit(1)
+
+    print("✅ Chat rendering kept up")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Chat replay benchmark for Stream Artifact
+Replays synthetic or recorded chat through TwitchClient.event_message with a
+stub AI backend and a real database, and reports throughput, end-to-end and
+database commit latency and memory growth as JSON for comparing commits
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.chat_replay import (ChatReplay, Raid, StubAIClient, load_chat, percentiles, save_chat,
+                                  synthetic_chat)
+from src.core.database import Database
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def replay(lines, args, db_path: Path):
+    """Run the replay; returns (ReplayResult, database commit latencies, replies sent, AI calls)"""
+    from src.core.twitch_client import TwitchClient
+
+    database = Database(db_path)
+    ai_client = StubAIClient(args.ai_latency_ms / 1000)
+    try:
+        client = TwitchClient(args.channel, "oauth:replay", ai_client, database)
+    except TypeError as e:
+        # TwitchClient is written against twitchio 2.x (see requirements.txt)
+        print(f"❌ Could not create TwitchClient (twitchio 2.x required): {e}")
+        sys.exit(2)
+    client.random_reply_chance = args.reply_chance
+
+    # Replies go through the real send queue and worker; only the socket write is stubbed
+    sent = []
+
+    async def send_message(message, channel=None):
+        sent.append(message)
+        return True
+
+    client.send_message = send_message
+    await client.event_ready()
+
+    loop = asyncio.get_running_loop()
+    commit_latencies = []
+
+    async def handle(message):
+        await client.event_message(message)
+        due = message.due
+        database.queue_callback(lambda error: commit_latencies.append(loop.time() - due))
+
+    result = await ChatReplay(lines, handle, channel=args.channel, speed=args.speed).run()
+    await database.flush()
+    await client.drain_outbound(timeout=10)
+    await database.close()
+    return result, commit_latencies, len(sent), ai_client.calls
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> bool:
+    """Print the change against a previous report; False if it regressed by more than max_regression"""
+    ok = True
+    checks = [
+        ("messages/s", report['messages_per_sec'], baseline['messages_per_sec'], True),
+        ("p99 latency ms", report['latency_ms'].get('p99', 0), baseline['latency_ms'].get('p99', 0), False),
+        ("p99 DB commit ms", report['db_commit_latency_ms'].get('p99', 0),
+         baseline['db_commit_latency_ms'].get('p99', 0), False),
+    ]
+    print(f"🔁 Compared with {baseline.get('commit', '?')} ({baseline.get('timestamp', '?')}):")
+    for name, new, old, higher_is_better in checks:
+        if not old:
+            continue
+        change = (new - old) / old
+        regressed = -change > max_regression if higher_is_better else change > max_regression
+        ok = ok and not regressed
+        print(f"   {'❌' if regressed else '✅'} {name}: {old:.1f} -> {new:.1f} ({change:+.1%})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chat pipeline by replaying chat through event_message")
+    parser.add_argument("--chat", type=Path, default=None, help="replay this JSONL chat instead of synthetic chat")
+    parser.add_argument("--save-chat", type=Path, default=None, help="write the synthetic chat as JSONL")
+    parser.add_argument("--rate", type=float, default=50.0, help="synthetic messages per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="synthetic chat length in seconds")
+    parser.add_argument("--users", type=int, default=2000, help="distinct regular chatters")
+    parser.add_argument("--zipf", type=float, default=1.1, help="skew of messages per chatter")
+    parser.add_argument("--command-share", type=float, default=0.05, help="share of lines that are commands")
+    parser.add_argument("--raid", action="append", default=[], metavar="AT:CHATTERS[:SECONDS]",
+                        help="raid burst, e.g. 10:3000:5 (repeatable)")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic chat seed")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed (0 = everything at once)")
+    parser.add_argument("--ai-latency-ms", type=float, default=800.0, help="mean stub AI response time")
+    parser.add_argument("--reply-chance", type=float, default=0.05, help="random reply chance for plain chat")
+    parser.add_argument("--channel", default="replay", help="channel name")
+    parser.add_argument("--output", type=Path, default=None, help="write the JSON report here")
+    parser.add_argument("--compare", type=Path, default=None, help="previous JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="fail if worse than the baseline by more")
+    args = parser.parse_args()
+
+    if args.chat:
+        lines = load_chat(args.chat)
+        workload = {'chat': str(args.chat)}
+    else:
+        raids = []
+        for spec in args.raid:
+            parts = spec.split(":")
+            raids.append(Raid(float(parts[0]), int(parts[1]), float(parts[2]) if len(parts) > 2 else 5.0))
+        lines = synthetic_chat(args.duration, args.rate, args.users, args.zipf, args.command_share, raids, args.seed)
+        workload = {'rate': args.rate, 'duration': args.duration, 'users': args.users, 'zipf': args.zipf,
+                    'command_share': args.command_share, 'raids': args.raid, 'seed': args.seed}
+        if args.save_chat:
+            save_chat(lines, args.save_chat)
+    workload.update(speed=args.speed, ai_latency_ms=args.ai_latency_ms, reply_chance=args.reply_chance)
+
+    print(f"💬 Replaying {len(lines)} messages at speed {args.speed:g}...")
+    with tempfile.TemporaryDirectory() as tmp:
+        result, commit_latencies, replies, ai_calls = asyncio.run(replay(lines, args, Path(tmp) / "replay.db"))
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'workload': workload,
+        **result.summary(),
+        'db_commit_latency_ms': percentiles(commit_latencies),
+        'ai_calls': ai_calls,
+        'replies_sent': replies,
+    }
+
+    latency, commits, memory = report['latency_ms'], report['db_commit_latency_ms'], report['memory']
+    print(f"🚀 {report['messages_per_sec']:.0f} msg/s ({result.messages} in {result.seconds:.1f}s, "
+          f"{result.errors} errors)")
+    print(f"⏱️ End-to-end: p50 {latency['p50']:.2f} ms, p95 {latency['p95']:.2f} ms, p99 {latency['p99']:.2f} ms")
+    print(f"🗄️ Database commit: p50 {commits['p50']:.1f} ms, p95 {commits['p95']:.1f} ms, p99 {commits['p99']:.1f} ms")
+    print(f"🤖 {ai_calls} AI calls, {replies} replies sent")
+    if memory:
+        print(f"🧠 RSS {memory['rss_start_mb']:.1f} -> {memory['rss_end_mb']:.1f} MB "
+              f"(peak {memory['rss_peak_mb']:.1f}, growth {memory['growth_mb']:+.1f})")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"📄 Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        if not compare(report, baseline, args.max_regression):
+            print(f"❌ Regressed by more than {args.max_regression:.0%}")
+            sys.exit(1)
+
+    if result.errors:
+        print(f"❌ {result.errors} messages failed")
+        sys.exit(1)
+
+    print("✅ Chat replay benchmarked")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Database backup benchmark for Stream Artifact
+Times full and delta snapshots of a synthetic database while a writer keeps
+inserting chat, and reports how long the writer's commits were held up
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.database import Database
+from src.core.db_backup import DatabaseBackup
+
+WORDS = "pog kappa gg raid hype stream boss clip lag emote chat dragon castle quest loot".split()
+
+
+def populate(db_path: Path, rows: int, chunk: int = 50000):
+    """Insert synthetic chat into the main messages table"""
+    conn = sqlite3.connect(str(db_path))
+    for start in range(0, rows, chunk):
+        conn.executemany("INSERT INTO messages (username, content, channel) VALUES (?, ?, 'chan')",
+                         ((f"viewer{i % 5000}", " ".join(random.choices(WORDS, k=random.randint(3, 12))))
+                          for i in range(start, min(rows, start + chunk))))
+        conn.commit()
+    conn.close()
+
+
+def chat_writer(db_path: Path, stop: threading.Event, commit_ms: list):
+    """Commit a small batch every 50 ms, like the bot's batched writer"""
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    while not stop.is_set():
+        start = time.perf_counter()
+        conn.executemany("INSERT INTO messages (username, content, channel) VALUES ('live', ?, 'chan')",
+                         ((" ".join(random.choices(WORDS, k=8)),) for _ in range(20)))
+        conn.commit()
+        commit_ms.append((time.perf_counter() - start) * 1000)
+        stop.wait(0.05)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark online database snapshots")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="messages to generate")
+    parser.add_argument("--deltas", type=int, default=3, help="delta snapshots after the full one")
+    parser.add_argument("--pages-per-step", type=int, default=1024, help="pages copied per backup step")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="fail if a writer commit stalls longer")
+    args = parser.parse_args()
+
+    random.seed(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        Database(db_path)
+        populate(db_path, args.rows)
+        print(f"🗄️ {args.rows:,} messages ({db_path.stat().st_size / 1024 / 1024:.0f} MB database)")
+
+        backup = DatabaseBackup(db_path, Path(tmp) / "backups", pages_per_step=args.pages_per_step)
+        stop, commit_ms = threading.Event(), []
+        writer = threading.Thread(target=chat_writer, args=(db_path, stop, commit_ms))
+        writer.start()
+        try:
+            for index in range(args.deltas + 1):
+                snapshot = backup.snapshot()
+                print(f"💾 {snapshot.kind:5} {snapshot.changed_pages:,}/{snapshot.page_count:,} pages in "
+                      f"{snapshot.seconds:.2f}s ({snapshot.megabytes_per_second:.0f} MB/s), "
+                      f"{snapshot.file_size / 1024 / 1024:.2f} MB written")
+                time.sleep(0.5)
+
+            start = time.perf_counter()
+            verified = backup.verify()
+            print(f"🔍 Restore and verify of the latest snapshot: {time.perf_counter() - start:.2f}s")
+        finally:
+            stop.set()
+            writer.join()
+
+    worst = max(commit_ms)
+    print(f"✍️ Writer commits during backups: median {statistics.median(commit_ms):.1f} ms, worst {worst:.1f} ms")
+
+    if not verified:
+        print("❌ Latest snapshot failed verification")
+        sys.exit(1)
+    if worst > args.budget_ms:
+        print(f"❌ Writer stalled {worst:.1f} ms, more than {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+    print("✅ Database snapshots benchmarked")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+History export benchmark for Stream Artifact
+Measures export throughput in rows/s for every available columnar format,
+for a full export and for an incremental one after new chat arrives
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.database import Database
+from src.core.export import HistoryExporter, available_formats
+
+WORDS = "pog kappa gg raid hype stream boss clip lag emote chat dragon castle quest loot".split()
+
+
+def populate(db_path: Path, rows: int, chunk: int = 50000):
+    """Append synthetic chat and AI memory (memory is a tenth of the chat)"""
+    conn = sqlite3.connect(str(db_path))
+    have = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+    target = have + rows
+    while have < target:
+        batch = min(chunk, target - have)
+        conn.executemany("""
+            INSERT INTO messages (username, content, channel, message_type, display_name, badges)
+            VALUES (?, ?, 'chan', 'chat', ?, ?)
+        """, ((f"viewer{i % 5000}", " ".join(random.choices(WORDS, k=random.randint(3, 12))),
+               f"Viewer{i % 5000}", random.choice((0, 0, 8, 2))) for i in range(have, have + batch)))
+        conn.executemany("INSERT INTO ai_memory (username, context, response) VALUES (?, ?, ?)",
+                         ((f"viewer{i % 5000}", f"context {i}", f"response {i}") for i in range(0, batch, 10)))
+        conn.commit()
+        have += batch
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark columnar chat history export")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="messages to generate")
+    parser.add_argument("--new-rows", type=int, default=50_000, help="messages added before the incremental run")
+    parser.add_argument("--chunk-rows", type=int, default=50_000, help="rows per exported chunk file")
+    parser.add_argument("--min-rows-per-sec", type=float, default=50_000, help="fail if a full export is slower")
+    args = parser.parse_args()
+
+    random.seed(42)
+    slowest = None
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        Database(db_path)
+        populate(db_path, args.rows)
+        db_size = db_path.stat().st_size
+        print(f"🗄️ {args.rows:,} messages ({db_size / 1024 / 1024:.0f} MB database)")
+
+        for export_format in available_formats():
+            output_dir = Path(tmp) / export_format
+            exporter = HistoryExporter(db_path, output_dir, export_format, args.chunk_rows)
+
+            full = exporter.export(full=True)
+            size = sum(path.stat().st_size for path in full.files)
+            print(f"📦 {export_format:8} full: {full.total_rows:,} rows in {full.seconds:.2f}s "
+                  f"({full.rows_per_second:,.0f} rows/s, {size / 1024 / 1024:.1f} MB, "
+                  f"{db_size / size:.1f}x smaller than the database)")
+
+            populate(db_path, args.new_rows)
+            start = time.perf_counter()
+            incremental = exporter.export()
+            print(f"📦 {export_format:8} incremental: {incremental.total_rows:,} rows in "
+                  f"{time.perf_counter() - start:.2f}s ({incremental.rows_per_second:,.0f} rows/s)")
+
+            if slowest is None or full.rows_per_second < slowest:
+                slowest = full.rows_per_second
+
+    if slowest < args.min_rows_per_sec:
+        print(f"❌ Slowest full export {slowest:,.0f} rows/s is below {args.min_rows_per_sec:,.0f} rows/s")
+        sys.exit(1)
+
+    print(f"✅ Slowest full export {slowest:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Full-text search benchmark for Stream Artifact
+Fills a database with synthetic chat and AI memory, then compares FTS5
+searches through Database.search_messages/search_memory with LIKE scans
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.database import Database
+
+COMMON_WORDS = (
+    "pog pogchamp lul kappa gg clip raid hype stream game boss speedrun chat emote "
+    "subscriber follow music setup keyboard mouse camera headset lag ping server "
+    "viewer mod vip banned timeout question answer tonight tomorrow weekend level "
+    "dragon sword castle quest loot craft build strategy patch update glitch"
+).split()
+
+# Chat vocabulary is heavy-tailed: a few words are everywhere, most are rare
+VOCABULARY = COMMON_WORDS + [f"word{i}" for i in range(50000)]
+CUM_WEIGHTS = list(itertools.accumulate(1.0 / rank for rank in range(1, len(VOCABULARY) + 1)))
+
+CHANNELS = ["mainchannel", "secondchannel", "thirdchannel"]
+
+# A very common word, a common pair, rarer words and a prefix
+QUERIES = ["pogchamp", "dragon castle", "word1234", "word300 word301", "glitc"]
+
+
+def synthetic_rows(count: int, start: int):
+    """Yield message rows with a few Zipf-distributed words each"""
+    for i in range(start, start + count):
+        words = random.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=random.randint(3, 12))
+        yield (f"viewer{i % 5000}", " ".join(words), CHANNELS[i % len(CHANNELS)], 'chat', '{}')
+
+
+def populate(db_path: Path, rows: int, memory_rows: int, chunk: int = 50000):
+    """Insert synthetic rows (the FTS triggers index them as they go)"""
+    conn = sqlite3.connect(str(db_path))
+    have = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+    have_memory = conn.execute("SELECT COUNT(*) FROM ai_memory").fetchone()[0]
+
+    start = time.perf_counter()
+    while have < rows:
+        batch = min(chunk, rows - have)
+        conn.executemany("""
+            INSERT INTO messages (username, content, channel, message_type, metadata)
+            VALUES (?, ?, ?, ?, ?)
+        """, synthetic_rows(batch, have))
+        conn.commit()
+        have += batch
+        print(f"\r📥 {have:,} / {rows:,} messages", end="", flush=True)
+
+    while have_memory < memory_rows:
+        batch = min(chunk, memory_rows - have_memory)
+        conn.executemany("""
+            INSERT INTO ai_memory (username, context, response)
+            VALUES (?, ?, ?)
+        """, ((user, content, content[::-1]) for user, content, *_ in synthetic_rows(batch, have_memory)))
+        conn.commit()
+        have_memory += batch
+
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def time_like(db_path: Path, query: str, limit: int, repeat: int):
+    """Median milliseconds for the pre-FTS LIKE scan"""
+    conn = sqlite3.connect(str(db_path))
+    words = query.split()
+    where = " AND ".join("content LIKE ?" for _ in words)
+    params = [f"%{word}%" for word in words]
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(f"SELECT id FROM messages WHERE {where} ORDER BY id DESC LIMIT ?", (*params, limit)).fetchall()
+        times.append((time.perf_counter() - start) * 1000)
+    conn.close()
+    return statistics.median(times)
+
+
+async def time_fts(database: Database, query: str, limit: int, repeat: int):
+    """Median milliseconds for ranked, recent and filtered FTS searches"""
+    results = {}
+    cases = {
+        'ranked': dict(),
+        'recent': dict(order='recent'),
+        'channel': dict(channel=CHANNELS[0]),
+        'page 5': dict(offset=limit * 5),
+    }
+    for name, kwargs in cases.items():
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await database.search_messages(query, limit=limit, **kwargs)
+            times.append((time.perf_counter() - start) * 1000)
+        results[name] = statistics.median(times)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await database.search_memory(query, limit=limit)
+        times.append((time.perf_counter() - start) * 1000)
+    results['memory'] = statistics.median(times)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full-text search over chat history")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="messages to generate (e.g. 1000000, 10000000)")
+    parser.add_argument("--memory-rows", type=int, default=None, help="AI memory rows (default rows / 10)")
+    parser.add_argument("--db", type=Path, default=None, help="reuse/extend this database file")
+    parser.add_argument("--limit", type=int, default=50, help="results per page")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query")
+    parser.add_argument("--skip-like", action="store_true", help="skip the LIKE baseline (slow at 10M rows)")
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="fail if a median FTS search exceeds this")
+    args = parser.parse_args()
+
+    memory_rows = args.rows // 10 if args.memory_rows is None else args.memory_rows
+    tmp = None
+    if args.db is None:
+        tmp = tempfile.TemporaryDirectory()
+        args.db = Path(tmp.name) / "bench.db"
+
+    random.seed(42)
+    database = Database(args.db)
+    elapsed = populate(args.db, args.rows, memory_rows)
+    print(f"\n🗄️ {args.rows:,} messages / {memory_rows:,} memories ready in {elapsed:.1f}s")
+
+    async def run_fts():
+        try:
+            return {query: await time_fts(database, query, args.limit, args.repeat) for query in QUERIES}
+        finally:
+            await database.close()
+
+    fts = asyncio.run(run_fts())
+
+    worst = 0.0
+    for query in QUERIES:
+        line = ", ".join(f"{name} {ms:.1f}" for name, ms in fts[query].items())
+        if not args.skip_like:
+            line += f" | LIKE {time_like(args.db, query, args.limit, max(1, args.repeat // 2)):.1f}"
+        print(f"🔎 {query!r}: {line} ms")
+        worst = max(worst, *fts[query].values())
+
+    if tmp:
+        tmp.cleanup()
+
+    if worst > args.budget_ms:
+        print(f"❌ Slowest FTS search {worst:.1f} ms exceeds {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+    print(f"✅ Slowest FTS search {worst:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
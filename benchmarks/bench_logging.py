@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Logging overhead benchmark for Stream Artifact
+Times a log call on the calling (hot) thread with RichHandler formatting
+inline, as before, and with the queue-based pipeline
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rich.console import Console
+from rich.logging import RichHandler
+
+from src.core.log_pipeline import LogPipeline
+
+
+def rich_handler(stream) -> logging.Handler:
+    handler = RichHandler(console=Console(file=stream, force_terminal=True, width=120), rich_tracebacks=True)
+    handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
+    return handler
+
+
+def time_calls(logger: logging.Logger, calls: int, errors: int) -> tuple:
+    """Nanoseconds per chat log call and per logged exception, on this thread"""
+    start = time.perf_counter()
+    for index in range(calls):
+        logger.info(f"💬 viewer{index % 500}: pog that was a great play")
+    chat_ns = (time.perf_counter() - start) / calls * 1e9
+
+    start = time.perf_counter()
+    for _ in range(errors):
+        try:
+            raise ConnectionResetError("connection reset by peer")
+        except ConnectionResetError:
+            logger.exception("❌ Failed to send message")
+    error_ns = (time.perf_counter() - start) / errors * 1e9
+    return chat_ns, error_ns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-call logging cost on the hot thread")
+    parser.add_argument("--calls", type=int, default=20_000, help="chat log calls to time")
+    parser.add_argument("--errors", type=int, default=500, help="logged exceptions to time")
+    parser.add_argument("--min-speedup", type=float, default=10.0,
+                        help="fail if a queued chat log call is not this many times cheaper than inline")
+    args = parser.parse_args()
+
+    logger = logging.getLogger("bench_logging")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    # Creating the LogRecord is the floor any handler pays
+    logger.addHandler(logging.NullHandler())
+    floor_chat, _ = time_calls(logger, args.calls, 1)
+    logger.handlers.clear()
+
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, tempfile.TemporaryDirectory() as tmp:
+        inline = rich_handler(devnull)
+        logger.addHandler(inline)
+        inline_chat, inline_error = time_calls(logger, args.calls, args.errors)
+        logger.removeHandler(inline)
+
+        pipeline = LogPipeline()
+        pipeline.set_console(rich_handler(devnull))
+        pipeline.attach_file(Path(tmp) / "bench.log")
+        pipeline.start()
+        logger.addHandler(pipeline.handler)
+        queued_chat, queued_error = time_calls(logger, args.calls, args.errors)
+        logger.removeHandler(pipeline.handler)
+
+        start = time.perf_counter()
+        pipeline.stop(timeout=600)
+        drain = time.perf_counter() - start
+
+    print(f"🧱 LogRecord creation: {floor_chat:.0f} ns per call")
+    print(f"🎨 Inline RichHandler: {inline_chat:.0f} ns per chat line, {inline_error:.0f} ns per exception")
+    print(f"📨 Queued pipeline:    {queued_chat:.0f} ns per chat line, {queued_error:.0f} ns per exception "
+          f"({inline_chat / queued_chat:.0f}x / {inline_error / queued_error:.0f}x less on the hot thread)")
+    print(f"✍️ Writer thread caught up {drain:.2f}s after the last call "
+          f"({pipeline.suppressor.suppressed} duplicate errors suppressed)")
+
+    if inline_chat / queued_chat < args.min_speedup:
+        print(f"❌ A queued log call is only {inline_chat / queued_chat:.1f}x cheaper than inline formatting")
+        sys.exit(1)
+
+    print("✅ Logging overhead benchmarked")
+
+
+if __name__ == "__main__":
+    main()
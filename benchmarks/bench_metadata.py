@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Message metadata benchmark for Stream Artifact
+Compares storing display name, role flags and badges as JSON against the
+typed columns with a badge bitmask, for inserts, reads and analytics
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.badges import SUBSCRIBER, split_message_metadata
+from src.core.database import Database
+
+BADGE_SETS = [[], [], [], ['subscriber'], ['subscriber', 'sub-gifter'], ['vip'], ['moderator', 'subscriber']]
+
+
+def synthetic_metadata():
+    """Metadata shaped like what TwitchClient.event_message stores"""
+    badges = random.choice(BADGE_SETS)
+    return {
+        'display_name': f"Viewer{random.randint(1, 5000)}",
+        'is_subscriber': 'subscriber' in badges,
+        'is_vip': 'vip' in badges,
+        'is_mod': 'moderator' in badges,
+        'badges': badges,
+    }
+
+
+# Both layouts share the messages table (same indexes and FTS triggers) and
+# are told apart by channel
+LEGACY_CHANNEL = "json"
+TYPED_CHANNEL = "typed"
+
+
+def insert_legacy(conn, rows):
+    """Old write path: everything serialized into the JSON column"""
+    conn.executemany("""
+        INSERT INTO messages (username, content, channel, message_type, metadata)
+        VALUES (?, ?, ?, 'chat', ?)
+    """, ((f"viewer{i}", f"message {i}", LEGACY_CHANNEL, json.dumps(metadata)) for i, metadata in rows))
+    conn.commit()
+
+
+def insert_typed(conn, rows):
+    """New write path: typed columns, JSON only for leftovers"""
+    def values():
+        for i, metadata in rows:
+            display_name, mask, extras = split_message_metadata(metadata)
+            yield (f"viewer{i}", f"message {i}", TYPED_CHANNEL, display_name, mask, json.dumps(extras) if extras else None)
+
+    conn.executemany("""
+        INSERT INTO messages (username, content, channel, message_type, display_name, badges, metadata)
+        VALUES (?, ?, ?, 'chat', ?, ?, ?)
+    """, values())
+    conn.commit()
+
+
+def timed(function, *args):
+    """Run once and return (result, seconds)"""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark typed message metadata columns against JSON")
+    parser.add_argument("--rows", type=int, default=500_000, help="messages to insert per layout")
+    parser.add_argument("--reads", type=int, default=2000, help="get_recent_messages calls")
+    args = parser.parse_args()
+
+    random.seed(42)
+    rows = [(i, synthetic_metadata()) for i in range(args.rows)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        database = Database(db_path)
+
+        conn = sqlite3.connect(str(db_path))
+
+        # Alternate chunks so neither layout always inserts into the bigger table
+        legacy_insert = typed_insert = 0.0
+        chunk = max(1, len(rows) // 10)
+        for start in range(0, len(rows), chunk):
+            legacy_insert += timed(insert_legacy, conn, rows[start:start + chunk])[1]
+            typed_insert += timed(insert_typed, conn, rows[start:start + chunk])[1]
+
+        async def read_legacy():
+            # The old get_recent_messages: always fetch and parse the JSON
+            for _ in range(args.reads):
+                cursor = await database.connection.execute("""
+                    SELECT username, content, timestamp, message_type, metadata FROM messages
+                    WHERE channel = ? ORDER BY timestamp DESC LIMIT 50
+                """, (LEGACY_CHANNEL,))
+                [json.loads(row['metadata'] or '{}') for row in await cursor.fetchall()]
+
+        async def read_typed(include_metadata):
+            for _ in range(args.reads):
+                await database.get_recent_messages(TYPED_CHANNEL, include_metadata=include_metadata)
+
+        async def read_all():
+            await database.connect()
+            try:
+                _, legacy = await timed_async(read_legacy())
+                _, plain = await timed_async(read_typed(False))
+                _, full = await timed_async(read_typed(True))
+                return legacy, plain, full
+            finally:
+                await database.close()
+
+        async def timed_async(coroutine):
+            start = time.perf_counter()
+            result = await coroutine
+            return result, time.perf_counter() - start
+
+        legacy_read, typed_read, typed_read_full = asyncio.run(read_all())
+
+        # Analytics: how many messages came from subscribers
+        def count_legacy():
+            return sum(json.loads(metadata or '{}').get('is_subscriber', False)
+                       for (metadata,) in conn.execute("SELECT metadata FROM messages WHERE channel = ?",
+                                                       (LEGACY_CHANNEL,)))
+
+        def count_typed():
+            return conn.execute("SELECT COUNT(*) FROM messages WHERE channel = ? AND badges & ?",
+                                (TYPED_CHANNEL, SUBSCRIBER)).fetchone()[0]
+
+        legacy_count, legacy_analytics = timed(count_legacy)
+        typed_count, typed_analytics = timed(count_typed)
+        conn.close()
+
+    reads = args.reads * 50
+    print(f"📝 Insert: JSON {args.rows / legacy_insert:,.0f} rows/s, typed {args.rows / typed_insert:,.0f} rows/s")
+    print(f"📖 Recent reads: JSON {reads / legacy_read:,.0f} rows/s, typed {reads / typed_read:,.0f} rows/s "
+          f"({reads / typed_read_full:,.0f} rows/s with metadata)")
+    print(f"📊 Subscriber count: JSON scan {legacy_analytics * 1000:.0f} ms, bitmask {typed_analytics * 1000:.0f} ms")
+
+    if legacy_count != typed_count:
+        print(f"❌ Analytics disagree: {legacy_count} vs {typed_count}")
+        sys.exit(1)
+
+    print("✅ Typed metadata columns benchmarked")
+
+
+if __name__ == "__main__":
+    main()
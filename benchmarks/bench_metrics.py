@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Metrics overhead benchmark for Stream Artifact
+Times the metric updates made for each chat message against the message's
+own hot-path work (queueing its database writes), and the cost of a scrape
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core import database as database_module
+from src.core.database import Database
+from src.core.metrics import metrics
+
+HISTOGRAMS = (database_module.WRITE_SECONDS, database_module.WRITE_BATCH_SIZE)
+
+
+def per_message_updates(messages: int, batch_size: int) -> float:
+    """Seconds for the metric updates of messages chat lines, batch writes included"""
+    received = metrics.counter('stream_artifact_chat_messages_received_total',
+                               'Chat messages received', ('type',)).labels('chat')
+    write_seconds, batch_sizes = HISTOGRAMS
+    writes = database_module.WRITES
+
+    start = time.perf_counter()
+    for index in range(messages):
+        received.inc()
+        if index % batch_size == 0:
+            # One committed batch per batch_size messages
+            write_seconds.observe(0.004)
+            batch_sizes.observe(batch_size * 2)
+            writes.inc(batch_size * 2)
+    return time.perf_counter() - start
+
+
+def baseline(messages: int, db_path: Path) -> float:
+    """Seconds to queue the database writes of messages chat lines (no commits)"""
+    async def run():
+        database = Database(db_path)
+        start = time.perf_counter()
+        for index in range(messages):
+            database.queue_message(f"viewer{index % 500}", "pog that was a great play", "chan",
+                                   metadata={'display_name': "Viewer", 'badges': []})
+        elapsed = time.perf_counter() - start
+        database._writer_task.cancel()
+        return elapsed
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-message metrics overhead")
+    parser.add_argument("--messages", type=int, default=200_000, help="chat messages to simulate")
+    parser.add_argument("--batch-size", type=int, default=200, help="messages per database batch")
+    parser.add_argument("--budget-ns", type=float, default=1000.0, help="fail if metrics cost more per message")
+    args = parser.parse_args()
+
+    metrics_seconds = min(per_message_updates(args.messages, args.batch_size) for _ in range(3))
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline_seconds = baseline(args.messages, Path(tmp) / "bench.db")
+
+    per_message_ns = metrics_seconds / args.messages * 1e9
+    baseline_ns = baseline_seconds / args.messages * 1e9
+    print(f"📈 Metric updates: {per_message_ns:.0f} ns per message")
+    print(f"🗄️ Queueing the message's database writes: {baseline_ns:.0f} ns per message "
+          f"(metrics add {per_message_ns / baseline_ns:.1%})")
+
+    start = time.perf_counter()
+    text = metrics.render()
+    print(f"🔍 Scrape: {len(text.splitlines())} lines rendered in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    if per_message_ns > args.budget_ns:
+        print(f"❌ Metrics cost {per_message_ns:.0f} ns per message, more than {args.budget_ns:.0f} ns")
+        sys.exit(1)
+
+    print("✅ Metrics overhead benchmarked")
+
+
+if __name__ == "__main__":
+    main()
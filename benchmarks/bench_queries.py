@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Hot query benchmark for Stream Artifact
+Times the Database read paths on a synthetic multi-million-row database,
+with the composite indexes and with the legacy single-column ones
+"""
+
+import argparse
+import asyncio
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.database import Database
+from src.core.migrations import INDEXES
+
+# Indexes the schema had before the composite ones were introduced
+LEGACY_INDEXES = {
+    'idx_messages_timestamp': "messages(timestamp)",
+    'idx_messages_username': "messages(username)",
+    'idx_ai_memory_username': "ai_memory(username)",
+    'idx_ai_memory_timestamp': "ai_memory(timestamp)",
+    'idx_users_username': "users(username)",
+    'idx_stream_events_timestamp': "stream_events(timestamp)",
+}
+
+# Traffic is skewed: one busy channel and a few heavy chatters dominate,
+# while queries also hit quiet channels and occasional viewers
+CHANNELS = [f"channel{i}" for i in range(20)]
+CHANNEL_WEIGHTS = [1.0 / (rank + 1) ** 2 for rank in range(len(CHANNELS))]
+USERS = [f"viewer{i}" for i in range(20000)]
+USER_WEIGHTS = [1.0 / (rank + 1) for rank in range(len(USERS))]
+
+
+def populate(db_path: Path, rows: int, memory_rows: int, chunk: int = 100000):
+    """Insert synthetic chat, memory and events spread over many channels and users"""
+    conn = sqlite3.connect(str(db_path))
+    have = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+    have_memory = conn.execute("SELECT COUNT(*) FROM ai_memory").fetchone()[0]
+    base = time.time() - 90 * 86400
+
+    def stamp(i, total):
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(base + 90 * 86400 * i / total))
+
+    start = time.perf_counter()
+    while have < rows:
+        batch = min(chunk, rows - have)
+        conn.executemany("""
+            INSERT INTO messages (username, content, timestamp, channel, message_type, metadata)
+            VALUES (?, ?, ?, ?, 'chat', '{}')
+        """, zip(random.choices(USERS, USER_WEIGHTS, k=batch),
+                 (f"message {i}" for i in range(have, have + batch)),
+                 (stamp(i, rows) for i in range(have, have + batch)),
+                 random.choices(CHANNELS, CHANNEL_WEIGHTS, k=batch)))
+        conn.commit()
+        have += batch
+        print(f"\r📥 {have:,} / {rows:,} messages", end="", flush=True)
+
+    while have_memory < memory_rows:
+        batch = min(chunk, memory_rows - have_memory)
+        conn.executemany("""
+            INSERT INTO ai_memory (username, context, response, timestamp, relevance_score)
+            VALUES (?, ?, ?, ?, ?)
+        """, ((user, f"context {i}", f"response {i}", stamp(i, memory_rows), random.random())
+              for i, user in zip(range(have_memory, have_memory + batch),
+                                 random.choices(USERS, USER_WEIGHTS, k=batch))))
+        conn.commit()
+        have_memory += batch
+
+    conn.executemany("INSERT OR IGNORE INTO users (username) VALUES (?)", ((user,) for user in USERS))
+    conn.executemany("INSERT INTO stream_events (event_type, username) VALUES ('follow', ?)",
+                     ((random.choice(USERS),) for _ in range(10000)))
+    conn.commit()
+    conn.close()
+    return time.perf_counter() - start
+
+
+def use_indexes(db_path: Path, indexes: dict):
+    """Replace every secondary index on the hot tables with the given set"""
+    conn = sqlite3.connect(str(db_path))
+    for name in set(INDEXES) | set(LEGACY_INDEXES):
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    for name, definition in indexes.items():
+        conn.execute(f"CREATE INDEX {name} ON {definition}")
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+
+async def time_queries(database: Database, repeat: int):
+    """Median milliseconds for each hot read path"""
+    queries = {
+        'get_recent_messages': lambda: database.get_recent_messages(random.choice(CHANNELS)),
+        'get_user_memory': lambda: database.get_user_memory(random.choice(USERS[:100])),
+        'get_user_stats': lambda: database.get_user_stats(random.choice(USERS)),
+        'get_recent_events': lambda: database.get_recent_events(),
+    }
+
+    results = {}
+    try:
+        for name, query in queries.items():
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                await query()
+                times.append((time.perf_counter() - start) * 1000)
+            results[name] = statistics.median(times)
+    finally:
+        await database.disconnect()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hot Database queries with and without composite indexes")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="messages to generate")
+    parser.add_argument("--memory-rows", type=int, default=None, help="AI memory rows (default rows / 4)")
+    parser.add_argument("--db", type=Path, default=None, help="reuse/extend this database file")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per query")
+    parser.add_argument("--budget-ms", type=float, default=20.0, help="fail if an indexed query exceeds this")
+    args = parser.parse_args()
+
+    memory_rows = args.rows // 4 if args.memory_rows is None else args.memory_rows
+    tmp = None
+    if args.db is None:
+        tmp = tempfile.TemporaryDirectory()
+        args.db = Path(tmp.name) / "bench.db"
+
+    random.seed(42)
+    database = Database(args.db)
+    elapsed = populate(args.db, args.rows, memory_rows)
+    print(f"\n🗄️ {args.rows:,} messages / {memory_rows:,} memories ready in {elapsed:.1f}s")
+
+    use_indexes(args.db, LEGACY_INDEXES)
+    legacy = asyncio.run(time_queries(database, args.repeat))
+    use_indexes(args.db, INDEXES)
+    composite = asyncio.run(time_queries(database, args.repeat))
+
+    for name in composite:
+        speedup = legacy[name] / composite[name] if composite[name] else float('inf')
+        print(f"⏱️ {name:22} legacy {legacy[name]:8.2f} ms  composite {composite[name]:6.2f} ms  ({speedup:.0f}x)")
+
+    if tmp:
+        tmp.cleanup()
+
+    worst = max(composite.values())
+    if worst > args.budget_ms:
+        print(f"❌ Slowest hot query {worst:.2f} ms exceeds {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+    print(f"✅ Slowest hot query {worst:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
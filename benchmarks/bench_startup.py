@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Startup import benchmark for Stream Artifact
+Measures the import cost of the application entry module and fails when it
+grows past the budget, or when heavy subsystems are imported eagerly again
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Module imported by main.py before the window is created
+ENTRY_MODULE = "src.core.app"
+
+# Subsystems that must only be loaded on first use
+LAZY_MODULES = [
+    "customtkinter",
+    "twitchio",
+    "aiohttp",
+    "PIL",
+    "src.ui.main_window",
+    "src.ui.settings_window",
+    "src.ui.setup_wizard",
+    "src.core.twitch_client",
+    "src.ai.openrouter_client",
+]
+
+IMPORTTIME_PATTERN = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_import(module: str):
+    """Import a module in a fresh interpreter and return (total_us, per_module_us)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    per_module = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            per_module[match.group(4)] = int(match.group(2))
+
+    return per_module.get(module, 0), per_module
+
+
+def find_eager_imports(module: str):
+    """Return the lazy subsystems that importing the module pulls in"""
+    check = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", check],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return [name for name in result.stdout.strip().split(",") if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Stream Artifact startup imports")
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh interpreters to measure")
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="fail if the median import time exceeds this")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest modules to show")
+    args = parser.parse_args()
+
+    print(f"⏱️ Measuring import of {ENTRY_MODULE} over {args.runs} runs")
+
+    totals = []
+    per_module = {}
+    for _ in range(args.runs):
+        total, per_module = measure_import(ENTRY_MODULE)
+        totals.append(total / 1000)
+
+    median_ms = statistics.median(totals)
+    print(f"📊 Median: {median_ms:.1f} ms  (min {min(totals):.1f} ms, max {max(totals):.1f} ms)")
+
+    print("🐢 Slowest modules (cumulative, last run):")
+    for name, micros in sorted(per_module.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"   {micros / 1000:8.1f} ms  {name}")
+
+    failed = False
+
+    eager = find_eager_imports(ENTRY_MODULE)
+    if eager:
+        print(f"❌ Imported eagerly at startup: {', '.join(eager)}")
+        failed = True
+
+    if median_ms > args.budget_ms:
+        print(f"❌ Import time {median_ms:.1f} ms exceeds budget of {args.budget_ms:.1f} ms")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+
+    print("✅ Startup import budget met")
+
+
+if __name__ == "__main__":
+    main()
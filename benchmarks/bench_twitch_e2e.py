@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+End-to-end chat load test for Stream Artifact
+Connects a real TwitchClient to the local fake Twitch server and plays a
+scenario (steady chat, a raid, a forced disconnect) over the network path,
+reporting delivery, reconnection, send throttling and event loop lag
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.chat_replay import StubAIClient
+from src.core.database import Database
+from src.core.fake_twitch import FakeTwitchServer, Scenario
+from src.core.loop_monitor import LoopMonitor
+
+
+async def settle(read, quiet: float = 1.0, timeout: float = 60.0) -> None:
+    """Wait until read() stops changing for quiet seconds"""
+    deadline = time.monotonic() + timeout
+    last, changed = read(), time.monotonic()
+    while time.monotonic() < deadline and time.monotonic() - changed < quiet:
+        await asyncio.sleep(0.1)
+        if read() != last:
+            last, changed = read(), time.monotonic()
+
+
+def local_client(server_url: str, nick: str, *args, **kwargs):
+    """A TwitchClient that talks to server_url instead of Twitch
+
+    twitchio 2 connects to its module-level websocket.HOST and validates the
+    token over HTTPS only to learn the nick. The subclass points HOST at the
+    local server while it is connected, restores it on close and presets the
+    nick, so nothing leaves the machine and later clients are unaffected.
+    """
+    from twitchio import websocket
+    from src.core.twitch_client import TwitchClient
+
+    class LocalTwitchClient(TwitchClient):
+        async def connect(self):
+            self._previous_host = websocket.HOST
+            websocket.HOST = server_url
+            self._http.nick = nick
+            if self._http.session is None:
+                # Normally opened by the skipped token check
+                self._http.session = aiohttp.ClientSession()
+            await super().connect()
+
+        async def close(self):
+            try:
+                await super().close()
+            finally:
+                websocket.HOST = getattr(self, '_previous_host', websocket.HOST)
+
+    return LocalTwitchClient(*args, **kwargs)
+
+
+async def run(args, db_path: Path) -> dict:
+    server = FakeTwitchServer(rate_limit=args.rate_limit)
+    await server.start()
+    monitor = LoopMonitor(lag_budget=0.1, warn_every=3600)
+    monitor.start()
+
+    database = Database(db_path)
+    ai_client = StubAIClient(args.ai_latency_ms / 1000)
+    try:
+        client = local_client(server.ws_url, "streamartifact", args.channel, "oauth:loadtest", ai_client, database)
+    except (ImportError, TypeError) as e:
+        # TwitchClient is written against twitchio 2.x (see requirements.txt)
+        print(f"❌ Could not create TwitchClient (twitchio 2.x required): {e}")
+        sys.exit(2)
+    client.random_reply_chance = args.reply_chance
+
+    connect = asyncio.get_running_loop().create_task(client.connect())
+    await server.wait_for_join(args.channel, timeout=15)
+
+    scenario = Scenario.synthetic(args.channel, args.duration, args.rate, seed=args.seed, users=args.users,
+                                  command_share=args.command_share)
+    if args.raid:
+        scenario.raid(args.raid_at, "bigstreamer", args.raid, args.raid_seconds, seed=args.seed)
+    if args.disconnect_at is not None:
+        scenario.disconnect(args.disconnect_at)
+
+    async def time_reconnect():
+        await server.wait_for(lambda: server.connections >= 2 and server.sessions, timeout=args.duration + 60)
+        await server.wait_for_join(args.channel, timeout=30)
+        return time.monotonic()
+
+    reconnected = asyncio.get_running_loop().create_task(time_reconnect()) if args.disconnect_at is not None else None
+    start = time.monotonic()
+    await server.play(scenario, speed=args.speed)
+    await settle(lambda: client.stats['messages_received'])
+    elapsed = time.monotonic() - start
+
+    reconnect_seconds = None
+    if reconnected is not None:
+        try:
+            reconnected_at = await asyncio.wait_for(reconnected, 30)
+            reconnect_seconds = max(0.0, reconnected_at - (start + args.disconnect_at / args.speed))
+        except asyncio.TimeoutError:
+            pass
+
+    await settle(lambda: len(server.received) + server.rate_limited + server.duplicates)
+    dropped = await client.drain_outbound(timeout=5)
+    await database.flush()
+    monitor.stop()
+
+    report = {
+        'scenario_lines': scenario.chat_lines,
+        'handled': client.stats['messages_received'],
+        'seconds': round(elapsed, 3),
+        'handled_per_sec': round(client.stats['messages_received'] / elapsed, 1),
+        'connections': server.connections,
+        'reconnect_seconds': round(reconnect_seconds, 3) if reconnect_seconds is not None else None,
+        'replies_accepted': len(server.received),
+        'replies_rate_limited': server.rate_limited,
+        'replies_duplicate': server.duplicates,
+        'replies_dropped': dropped,
+        'ai_calls': ai_client.calls,
+        'max_loop_lag_ms': round(monitor.max_lag * 1000, 3),
+    }
+
+    await client.disconnect()
+    connect.cancel()
+    await database.close()
+    await server.stop()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end chat load test against a local fake Twitch server")
+    parser.add_argument("--channel", default="loadtest", help="channel to join")
+    parser.add_argument("--rate", type=float, default=50.0, help="steady chat messages per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="scenario length in seconds")
+    parser.add_argument("--users", type=int, default=2000, help="distinct regular chatters")
+    parser.add_argument("--command-share", type=float, default=0.05, help="share of lines that are commands")
+    parser.add_argument("--raid", type=int, default=3000, help="raid chatters (0 for none)")
+    parser.add_argument("--raid-at", type=float, default=5.0, help="raid start in seconds")
+    parser.add_argument("--raid-seconds", type=float, default=5.0, help="seconds the raiders take to write")
+    parser.add_argument("--disconnect-at", type=float, default=15.0, help="forced disconnect time (negative: none)")
+    parser.add_argument("--rate-limit", type=int, default=20, help="server: messages a client may send per 30s")
+    parser.add_argument("--ai-latency-ms", type=float, default=300.0, help="mean stub AI response time")
+    parser.add_argument("--reply-chance", type=float, default=0.05, help="random reply chance for plain chat")
+    parser.add_argument("--speed", type=float, default=1.0, help="scenario speed")
+    parser.add_argument("--seed", type=int, default=0, help="chat seed")
+    parser.add_argument("--output", type=Path, default=None, help="write the JSON report here")
+    args = parser.parse_args()
+    if args.disconnect_at < 0:
+        args.disconnect_at = None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = asyncio.run(run(args, Path(tmp) / "e2e.db"))
+
+    print(f"💬 Handled {report['handled']} of {report['scenario_lines']} lines "
+          f"({report['handled_per_sec']:.0f}/s over {report['seconds']:.1f}s)")
+    if report['reconnect_seconds'] is not None:
+        print(f"🔌 Reconnected {report['reconnect_seconds']:.2f}s after the forced disconnect "
+              f"({report['connections']} connections)")
+    elif args.disconnect_at is not None:
+        print("❌ Did not reconnect after the forced disconnect")
+    print(f"📤 Replies: {report['replies_accepted']} accepted, {report['replies_rate_limited']} rate limited, "
+          f"{report['replies_duplicate']} duplicates, {report['replies_dropped']} dropped")
+    print(f"🐢 Max event loop lag: {report['max_loop_lag_ms']:.1f} ms")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"📄 Report written to {args.output}")
+
+    if args.disconnect_at is not None and report['reconnect_seconds'] is None:
+        sys.exit(1)
+
+    print("✅ End-to-end run finished")
+
+
+if __name__ == "__main__":
+    main()
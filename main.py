@@ -15,11 +15,76 @@ from pathlib import Path
 # Add src directory to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from src.core.app import StreamArtifact
+from src.core.startup_profiler import profiler, is_profiling_requested
+
+# Maintenance commands: rebuild the chat/memory search index, report how
+# long pending schema migrations would take, or export chat history, then exit
+REBUILD_SEARCH_FLAG = "--rebuild-search-index"
+MIGRATIONS_DRY_RUN_FLAG = "--migrations-dry-run"
+EXPORT_FLAG = "--export-history"
+
+def rebuild_search_index():
+    """Rebuild the full-text search indexes of the configured database"""
+    from src.core.app import configure_logging
+    from src.core.config import Config
+    from src.core.database import Database
+    
+    configure_logging()
+    database = Database(Config().database_path)
+    
+    async def run():
+        await database.rebuild_search_index()
+        await database.close()
+    
+    asyncio.run(run())
+
+def report_migrations():
+    """Time the pending schema migrations on a copy of the configured database"""
+    from src.core.config import Config
+    from src.core.migrations import dry_run, format_report
+    
+    current_version, results = dry_run(Config().database_path)
+    print(format_report(results, current_version))
+
+def export_history():
+    """Export new chat history rows to columnar files (--export-history [DIR] [--format F])"""
+    from src.core.app import configure_logging
+    from src.core.config import Config
+    from src.core.export import HistoryExporter
+    
+    configure_logging()
+    config = Config()
+    args = sys.argv[sys.argv.index(EXPORT_FLAG) + 1:]
+    output_dir = Path(args[0]) if args and not args[0].startswith("--") else config.data_dir / "exports"
+    export_format = args[args.index("--format") + 1] if "--format" in args else None
+    
+    result = HistoryExporter(config.database_path, output_dir, export_format).export()
+    for table, rows in result.rows.items():
+        print(f"📦 {table}: {rows:,} rows")
+    print(f"✅ {result.total_rows:,} rows exported to {output_dir} as {result.format} "
+          f"({result.rows_per_second:,.0f} rows/s)")
 
 def main():
     """Main entry point for Stream Artifact"""
+    if REBUILD_SEARCH_FLAG in sys.argv:
+        rebuild_search_index()
+        return
+    
+    if MIGRATIONS_DRY_RUN_FLAG in sys.argv:
+        report_migrations()
+        return
+    
+    if EXPORT_FLAG in sys.argv:
+        export_history()
+        return
+    
+    if is_profiling_requested():
+        profiler.enable()
+    
     try:
+        with profiler.stage("import src.core.app"):
+            from src.core.app import StreamArtifact
+        
         # Create and run the application
         app = StreamArtifact()
         app.run()
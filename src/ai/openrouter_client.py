@@ -7,12 +7,20 @@ import aiohttp
 import asyncio
 import json
 import re
+import time
 import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 
+from ..core.metrics import metrics
+from ..core.tracing import tracer
+
 logger = logging.getLogger(__name__)
 
+REQUEST_SECONDS = metrics.histogram('stream_artifact_ai_request_seconds', 'OpenRouter chat completion latency',
+                                    ('model', 'outcome'))
+RATE_LIMITED = metrics.counter('stream_artifact_ai_rate_limited_total', 'AI requests skipped by the rate limit')
+
 
 class OpenRouterClient:
     """OpenRouter API client for AI responses"""
@@ -37,6 +45,23 @@ class OpenRouterClient:
         
         logger.info(f"🤖 OpenRouter client initialized with model: {model}")
     
+    async def apply_config(self, event) -> None:
+        """Follow a reloaded configuration (model, API key, personality)"""
+        model = event.get('ai.model')
+        if model and model.new:
+            self.model = model.new
+            logger.info(f"🤖 AI model switched to: {self.model}")
+        
+        api_key = event.get('ai.api_key')
+        if api_key and api_key.new:
+            # The key is baked into the session headers
+            self.api_key = api_key.new
+            await self.close()
+        
+        if event.get('ai.personality'):
+            # Cached context was produced under the old personality
+            self.context_cache.clear()
+    
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session"""
         if self.session is None or self.session.closed:
@@ -118,11 +143,13 @@ class OpenRouterClient:
         try:
             # Rate limiting check
             if not self._check_rate_limit():
+                RATE_LIMITED.inc()
                 logger.warning("⚠️ Rate limit exceeded, skipping request")
                 return None
             
             # Build context and messages
-            messages = await self._build_messages(prompt, username, context or {})
+            with tracer.span("ai.build_messages"):
+                messages = await self._build_messages(prompt, username, context or {})
             
             # Prepare the request payload
             payload = {
@@ -138,28 +165,39 @@ class OpenRouterClient:
             # Make the API request
             session = await self._get_session()
             
-            async with session.post(f"{self.base_url}/chat/completions", json=payload) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    if "choices" in data and len(data["choices"]) > 0:
-                        ai_response = data["choices"][0]["message"]["content"].strip()
-                        
-                        # Clean and validate response
-                        cleaned_response = self._clean_response(ai_response)
-                        
-                        # Store in memory
-                        await self._store_memory(username, prompt, cleaned_response, context)
-                        
-                        logger.info(f"🤖 AI response generated for {username}")
-                        return cleaned_response
-                    else:
-                        logger.warning("⚠️ No choices in AI response")
-                        return None
-                else:
-                    error_text = await response.text()
-                    logger.error(f"❌ AI API error: {response.status} - {error_text}")
-                    return None
+            start, outcome = time.perf_counter(), 'error'
+            try:
+                with tracer.span("ai.http", model=payload["model"]) as span:
+                    async with session.post(f"{self.base_url}/chat/completions", json=payload) as response:
+                        span.set(status=response.status)
+                        if response.status == 200:
+                            data = await response.json()
+                            outcome = 'ok'
+                        else:
+                            error_text = await response.text()
+                            outcome = 'http_error'
+            finally:
+                REQUEST_SECONDS.labels(payload["model"], outcome).observe(time.perf_counter() - start)
+            
+            if outcome != 'ok':
+                logger.error(f"❌ AI API error: {response.status} - {error_text}")
+                return None
+            
+            if "choices" in data and len(data["choices"]) > 0:
+                ai_response = data["choices"][0]["message"]["content"].strip()
+                
+                # Clean and validate response
+                with tracer.span("ai.clean_response"):
+                    cleaned_response = self._clean_response(ai_response)
+                
+                # Store in memory
+                await self._store_memory(username, prompt, cleaned_response, context)
+                
+                logger.info(f"🤖 AI response generated for {username}")
+                return cleaned_response
+            else:
+                logger.warning("⚠️ No choices in AI response")
+                return None
                     
         except Exception as e:
             logger.error(f"❌ Error getting AI response: {e}")
@@ -7,47 +7,127 @@ import asyncio
 import threading
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, TYPE_CHECKING
 
-import customtkinter as ctk
-from rich.console import Console
-from rich.logging import RichHandler
-
-from ..ui.main_window import MainWindow
 from ..core.config import Config
+from ..core.config_watcher import ConfigWatcher
 from ..core.database import Database
-from ..core.twitch_client import TwitchClient
-from ..ai.openrouter_client import OpenRouterClient
-
-# Configure rich console
-console = Console()
+from ..core.backup_scheduler import BackupScheduler
+from ..core.lifecycle import LifecycleManager
+from ..core.log_pipeline import pipeline
+from ..core.loop_monitor import LoopMonitor
+from ..core.startup_profiler import profiler
+from ..core.tracing import JsonlExporter, tracer
+from ..ui.ui_bridge import UIBridge
 
-# Configure logging with rich
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s",
-    datefmt="[%X]",
-    handlers=[RichHandler(console=console, rich_tracebacks=True)]
-)
+# Heavy subsystems (UI toolkit, twitchio, aiohttp) are imported on first use
+# so the window can appear before they are loaded
+if TYPE_CHECKING:
+    from ..ui.main_window import MainWindow
+    from ..core.twitch_client import TwitchClient
+    from ..ai.openrouter_client import OpenRouterClient
+    from ..core.metrics_server import MetricsServer
+    from ..core.cpu_profiler import ProfileReport, SamplingProfiler
 
 logger = logging.getLogger(__name__)
 
 
+def configure_logging(logs_dir: Optional[Path] = None, console: bool = True):
+    """Configure logging through the background pipeline
+    
+    Log calls only enqueue the record; the pipeline thread writes it to the
+    rich console (if console) and to a rotating file in logs_dir (if given).
+    Safe to call again to change either sink.
+    """
+    root = logging.getLogger()
+    if pipeline.handler not in root.handlers:
+        root.addHandler(pipeline.handler)
+        root.setLevel(logging.INFO)
+        pipeline.start()
+    
+    if not console:
+        pipeline.set_console(None)
+    elif pipeline.console is None:
+        from rich.console import Console
+        from rich.logging import RichHandler
+        
+        handler = RichHandler(console=Console(), rich_tracebacks=True)
+        handler.setFormatter(logging.Formatter("%(message)s", datefmt="[%X]"))
+        pipeline.set_console(handler)
+    
+    if logs_dir is not None:
+        pipeline.attach_file(logs_dir / "stream_artifact.log")
+
+
 class StreamArtifact:
     """Main application class that coordinates all components"""
     
     def __init__(self):
-        self.config = Config()
-        self.database = Database()
-        self.twitch_client: Optional[TwitchClient] = None
-        self.ai_client: Optional[OpenRouterClient] = None
-        self.main_window: Optional[MainWindow] = None
+        with profiler.stage("logging"):
+            configure_logging()
+        
+        with profiler.stage("config"):
+            self.config = Config()
+        
+        # Keep a log file next to the traces and profiles
+        configure_logging(self.config.logs_dir, console=self.config.monitoring.log_console)
+        self.config.subscribe('monitoring.log_console', lambda change: configure_logging(console=change.new))
+        
+        # Schema creation runs off the UI thread; async callers wait for it
+        with profiler.stage("database"):
+            self.database = Database(self.config.database_path, defer_init=True)
+        
+        # Debounced configuration backups and periodic database snapshots,
+        # created on the event loop thread (the cloud service needs aiohttp)
+        self.backup_scheduler: Optional[BackupScheduler] = None
+        
+        # Hot reload of config.json; components subscribe to their sections
+        self.config_watcher = ConfigWatcher(self.config)
+        
+        # Sampled per-message traces, written next to the logs
+        tracer.configure(self.config.monitoring.trace_sample_rate,
+                         JsonlExporter(self.config.logs_dir / "traces.jsonl"))
+        self.config.subscribe('monitoring.trace_sample_rate', lambda change: tracer.configure(change.new))
+        
+        # Scheduling lag of the event loop, with the stack of whatever blocks it
+        monitoring = self.config.monitoring
+        self.loop_monitor = LoopMonitor(lag_budget=monitoring.loop_lag_budget_ms / 1000,
+                                        capture_after=monitoring.slow_callback_ms / 1000)
+        self.config.subscribe('monitoring.loop_lag_budget_ms',
+                              lambda change: setattr(self.loop_monitor, 'lag_budget', change.new / 1000))
+        self.config.subscribe('monitoring.slow_callback_ms',
+                              lambda change: setattr(self.loop_monitor, 'capture_after', change.new / 1000))
+        
+        # On-demand sampling of the event loop and Tk threads
+        self.cpu_profiler: Optional["SamplingProfiler"] = None
+        
+        # Prometheus endpoint, when enabled (started on the event loop)
+        self.metrics_server: Optional["MetricsServer"] = None
+        
+        self.twitch_client: Optional["TwitchClient"] = None
+        self.ai_client: Optional["OpenRouterClient"] = None
+        self.main_window: Optional["MainWindow"] = None
         self.event_loop: Optional[asyncio.AbstractEventLoop] = None
         self.loop_thread: Optional[threading.Thread] = None
         
-        # Initialize CustomTkinter
-        ctk.set_appearance_mode("dark")
-        ctk.set_default_color_theme("blue")
+        # Batched hand-off of chat and stats from the event loop to Tk
+        self.ui_bridge = UIBridge()
+        
+        # Ordered shutdown: stop input, drain queues, then close resources
+        self.lifecycle = LifecycleManager(deadline=10.0, min_step_time=0.5)
+        self.lifecycle.register("stop ingest", self._stop_ingest)
+        self.lifecycle.register("config watcher", self._stop_config_watcher)
+        self.lifecycle.register("config file", self._flush_config)
+        self.lifecycle.register("outbound messages", self._drain_outbound)
+        self.lifecycle.register("database writes", self._drain_database_writes)
+        self.lifecycle.register("twitch connection", self._disconnect_twitch)
+        self.lifecycle.register("ai session", self._close_ai)
+        self.lifecycle.register("database", self._close_database)
+        # After the chat and database steps: a final gist upload can be slow
+        self.lifecycle.register("backups", self._stop_backups)
+        self.lifecycle.register("metrics server", self._stop_metrics_server)
+        self.lifecycle.register("traces", self._close_traces)
+        self.lifecycle.register("loop monitor", self._stop_loop_monitor)
         
         logger.info("🌟 Stream Artifact initialized")
     
@@ -58,7 +138,16 @@ class StreamArtifact:
             self.start_event_loop()
             
             # Create and run the main GUI
-            self.main_window = MainWindow(self)
+            with profiler.stage("import ui"):
+                import customtkinter as ctk
+                from ..ui.main_window import MainWindow
+            
+            # Initialize CustomTkinter
+            ctk.set_appearance_mode("dark")
+            ctk.set_default_color_theme("blue")
+            
+            with profiler.stage("main window"):
+                self.main_window = MainWindow(self)
             self.main_window.run()
             
         except Exception as e:
@@ -72,6 +161,15 @@ class StreamArtifact:
         def run_loop():
             self.event_loop = asyncio.new_event_loop()
             asyncio.set_event_loop(self.event_loop)
+            try:
+                self.backup_scheduler = self._create_backup_scheduler()
+                self.backup_scheduler.start(self.event_loop)
+            except Exception as e:
+                logger.error(f"❌ Backup scheduler failed to start: {e}")
+            self.config_watcher.start(self.event_loop)
+            self.loop_monitor.start(self.event_loop)
+            if self.config.monitoring.metrics_enabled:
+                self.event_loop.create_task(self._start_metrics_server())
             self.event_loop.run_forever()
         
         self.loop_thread = threading.Thread(target=run_loop, daemon=True)
@@ -80,19 +178,149 @@ class StreamArtifact:
     
     def cleanup(self):
         """Clean up resources"""
-        if self.event_loop and not self.event_loop.is_closed():
+        if self.event_loop and self.event_loop.is_running():
+            # Drain queues and close resources on the loop before stopping it
+            future = asyncio.run_coroutine_threadsafe(self.lifecycle.shutdown(), self.event_loop)
+            try:
+                future.result(timeout=self.lifecycle.deadline + 5)
+            except Exception as e:
+                logger.error(f"❌ Graceful shutdown failed: {e}")
+            
             self.event_loop.call_soon_threadsafe(self.event_loop.stop)
         
-        if self.twitch_client:
-            # Stop Twitch client
-            pass
+        if self.loop_thread:
+            self.loop_thread.join(timeout=2)
         
         logger.info("🧹 Cleanup completed")
     
+    async def _stop_ingest(self, timeout: float):
+        """Stop accepting chat messages"""
+        if self.twitch_client:
+            self.twitch_client.stop_ingest()
+    
+    def _create_backup_scheduler(self) -> BackupScheduler:
+        """Backup targets chosen in the configuration"""
+        from ..core.cloud_backup import CloudBackupService, LocalBackupService
+        from ..core.db_backup import DatabaseBackupJob
+        
+        backup = self.config.config.backup
+        services = [LocalBackupService(self.config)]
+        if backup.backup_type == 'github' and backup.github_token:
+            cloud = CloudBackupService(self.config)
+            cloud.set_github_credentials(backup.github_token)
+            services.append(cloud)
+        
+        database_job = None
+        if backup.database_enabled:
+            database_job = DatabaseBackupJob(
+                self.config.database_path, self.config.database_backup_dir, verify=backup.database_verify,
+                full_every=backup.database_full_every, keep_chains=backup.database_keep_chains
+            )
+        
+        return BackupScheduler(self.config, services, database_job, debounce=backup.config_debounce,
+                               database_interval=backup.database_interval)
+    
+    async def _stop_backups(self, timeout: float):
+        """Stop scheduled backups, uploading a pending configuration change if it fits the budget"""
+        if self.backup_scheduler:
+            await self.backup_scheduler.stop(timeout=timeout)
+    
+    def start_profiling(self, seconds: float = 30.0,
+                        on_done: Optional[Callable[["ProfileReport"], None]] = None) -> bool:
+        """Profile the event loop and Tk threads for seconds (any thread)
+        
+        on_done receives the report on the profiler thread. Returns False
+        if a profile is already running.
+        """
+        from ..core.cpu_profiler import SamplingProfiler
+        
+        if self.cpu_profiler is None:
+            threads = {'tk': threading.main_thread().ident}
+            if self.loop_thread:
+                threads['asyncio'] = self.loop_thread.ident
+            self.cpu_profiler = SamplingProfiler(threads, self.config.logs_dir / "profiles")
+        return self.cpu_profiler.start(seconds, on_done)
+    
+    async def profile(self, seconds: float = 30.0) -> "ProfileReport":
+        """Profile for seconds and return the report (event loop)"""
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        
+        def finished(report):
+            loop.call_soon_threadsafe(lambda: done.done() or done.set_result(report))
+        
+        if not self.start_profiling(seconds, finished):
+            raise RuntimeError("A profile is already running")
+        return await done
+    
+    async def _start_metrics_server(self):
+        """Serve /metrics on the configured address"""
+        from ..core.metrics_server import MetricsServer
+        
+        monitoring = self.config.monitoring
+        server = MetricsServer(host=monitoring.metrics_host, port=monitoring.metrics_port, profile=self.profile)
+        try:
+            await server.start()
+            self.metrics_server = server
+        except Exception:
+            # Already logged; the bot runs on without metrics
+            pass
+    
+    async def _stop_metrics_server(self, timeout: float):
+        """Stop serving metrics"""
+        if self.metrics_server:
+            await self.metrics_server.stop()
+    
+    async def _close_traces(self, timeout: float):
+        """Write the queued spans and close the trace file"""
+        if tracer.exporter:
+            await asyncio.get_running_loop().run_in_executor(None, tracer.exporter.close, timeout)
+    
+    async def _stop_loop_monitor(self, timeout: float):
+        """Stop measuring event loop lag"""
+        self.loop_monitor.stop()
+    
+    async def _stop_config_watcher(self, timeout: float):
+        """Stop reloading configuration changes"""
+        self.config_watcher.stop()
+    
+    async def _flush_config(self, timeout: float) -> bool:
+        """Write a pending configuration save"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.config.flush, timeout)
+    
+    async def _drain_outbound(self, timeout: float) -> int:
+        """Send queued chat messages"""
+        if self.twitch_client:
+            return await self.twitch_client.drain_outbound(timeout)
+        return 0
+    
+    async def _drain_database_writes(self, timeout: float) -> int:
+        """Commit queued database writes"""
+        return await self.database.flush(timeout)
+    
+    async def _disconnect_twitch(self, timeout: float):
+        """Close the Twitch connection"""
+        if self.twitch_client:
+            await self.twitch_client.disconnect()
+    
+    async def _close_ai(self, timeout: float):
+        """Close the AI client's HTTP session"""
+        if self.ai_client:
+            await self.ai_client.close()
+    
+    async def _close_database(self, timeout: float):
+        """Checkpoint the WAL and close the database connection"""
+        await self.database.close()
+    
     async def connect_twitch(self, channel: str, token: str):
         """Connect to Twitch chat"""
         try:
-            self.twitch_client = TwitchClient(channel, token, self.ai_client, self.database)
+            from ..core.twitch_client import TwitchClient
+            
+            self.twitch_client = TwitchClient(
+                channel, token, self.ai_client, self.database, ui_bridge=self.ui_bridge
+            )
+            self.config_watcher.subscribe(self.twitch_client.apply_config, 'twitch')
             await self.twitch_client.connect()
             logger.info(f"🎮 Connected to Twitch: {channel}")
         except Exception as e:
@@ -102,7 +330,12 @@ class StreamArtifact:
     def initialize_ai(self, api_key: str, model: str):
         """Initialize AI client"""
         try:
+            from ..ai.openrouter_client import OpenRouterClient
+            
+            if self.ai_client:
+                self.config_watcher.unsubscribe(self.ai_client.apply_config)
             self.ai_client = OpenRouterClient(api_key, model, self.database, self.config)
+            self.config_watcher.subscribe(self.ai_client.apply_config, 'ai')
             logger.info(f"🤖 AI client initialized with model: {model}")
         except Exception as e:
             logger.error(f"❌ AI initialization failed: {e}")
@@ -112,22 +345,6 @@ class StreamArtifact:
         """Schedule a coroutine to run in the event loop"""
         if self.event_loop and not self.event_loop.is_closed():
             return asyncio.run_coroutine_threadsafe(coro, self.event_loop)
+        
+        logger.error("❌ Event loop not available")
         return None
-    
-    def initialize_ai(self, api_key: str, model: str):
-        """Initialize the AI client"""
-        try:
-            self.ai_client = OpenRouterClient(api_key, model, self.database)
-            logger.info(f"🤖 AI client initialized with model: {model}")
-        except Exception as e:
-            logger.error(f"❌ AI initialization failed: {e}")
-            raise
-    
-    def schedule_coroutine(self, coro):
-        """Schedule a coroutine to run in the event loop"""
-        if self.event_loop:
-            future = asyncio.run_coroutine_threadsafe(coro, self.event_loop)
-            return future
-        else:
-            logger.error("❌ Event loop not available")
-            return None
@@ -0,0 +1,172 @@
+"""
+Backup Scheduler for Stream Artifact
+Debounced configuration backups and periodic database snapshots on the event loop
+"""
+
+import asyncio
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BackupRun:
+    """Outcome of the latest run of one backup target"""
+    finished: str
+    duration: float
+    size: int
+    success: bool
+    error: Optional[str] = None
+
+
+class BackupScheduler:
+    """Runs every backup in the background of the asyncio loop
+
+    Configuration saves only mark the configuration dirty; the backup runs
+    once the saves have been quiet for debounce seconds (or max_delay after
+    the first one), so a burst of settings changes becomes one backup per
+    service. Database snapshots run every database_interval seconds. All
+    compression and hashing runs on a small thread pool, never on the loop.
+    Works with any service exposing backup_configuration(config_data), such
+    as LocalBackupService and CloudBackupService.
+    """
+
+    def __init__(self, config, services: List, database_job=None, debounce: float = 5.0,
+                 max_delay: float = 60.0, database_interval: float = 3600.0, workers: int = 2):
+        self.config = config
+        self.services = list(services)
+        self.database_job = database_job
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.database_interval = database_interval
+
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backup")
+        for service in self.services:
+            if hasattr(service, 'executor'):
+                service.executor = self.executor
+
+        self.last_runs: Dict[str, BackupRun] = {}
+        self.config_backups = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dirty_since: Optional[float] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._config_task: Optional[asyncio.Task] = None
+        self._database_task: Optional[asyncio.Task] = None
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Start the database cadence and listen for configuration saves"""
+        self._loop = loop or asyncio.get_running_loop()
+        if self.database_job is not None and self.database_interval > 0:
+            self._database_task = self._loop.create_task(self._database_loop())
+        self.config.add_save_listener(self.config_changed)
+
+    def config_changed(self) -> None:
+        """Note a configuration change (safe from any thread)"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._schedule_config_backup)
+
+    def _schedule_config_backup(self) -> None:
+        if self._loop is None:
+            return
+        now = time.monotonic()
+        if self._dirty_since is None:
+            self._dirty_since = now
+        if self._timer is not None:
+            self._timer.cancel()
+
+        # Quiet period, but never postpone past max_delay after the first change
+        delay = min(self.debounce, max(0.0, self._dirty_since + self.max_delay - now))
+        self._timer = self._loop.call_later(delay, self._start_config_backup)
+
+    def _start_config_backup(self) -> None:
+        self._timer = None
+        if self._config_task is not None and not self._config_task.done():
+            # Still uploading the previous one; back up again afterwards
+            self._config_task.add_done_callback(lambda _: self._schedule_config_backup())
+            return
+        self._dirty_since = None
+        self._config_task = self._loop.create_task(self.backup_config_now())
+
+    async def backup_config_now(self) -> Dict[str, BackupRun]:
+        """Back up the current configuration to every service"""
+        config_data = self.config.to_dict()
+        results = await asyncio.gather(*(self._run_service(service, config_data) for service in self.services))
+        self.config_backups += 1
+        return dict(zip((type(service).__name__ for service in self.services), results))
+
+    async def _run_service(self, service, config_data: Dict) -> BackupRun:
+        name = type(service).__name__
+        start = time.perf_counter()
+        try:
+            success, error = await service.backup_configuration(config_data), None
+        except Exception as e:
+            success, error = False, str(e)
+        run = BackupRun(
+            finished=datetime.now().isoformat(),
+            duration=time.perf_counter() - start,
+            size=getattr(service, 'last_backup_size', 0) if success else 0,
+            success=success,
+            error=error,
+        )
+        self.last_runs[name] = run
+        if not success:
+            logger.warning(f"⚠️ Scheduled backup via {name} failed{f': {error}' if error else ''}")
+        return run
+
+    async def snapshot_database_now(self) -> BackupRun:
+        """Snapshot the database on the thread pool"""
+        start = time.perf_counter()
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, self.database_job.run)
+            run = BackupRun(datetime.now().isoformat(), time.perf_counter() - start,
+                            sum(snapshot.file_size for snapshot in results.values()), True)
+        except Exception as e:
+            logger.error(f"❌ Database backup failed: {e}")
+            run = BackupRun(datetime.now().isoformat(), time.perf_counter() - start, 0, False, str(e))
+        self.last_runs['database'] = run
+        return run
+
+    async def _database_loop(self):
+        while True:
+            await asyncio.sleep(self.database_interval)
+            await self.snapshot_database_now()
+
+    def status(self) -> Dict[str, Dict]:
+        """Last run of each target: when it finished, how long it took and bytes written"""
+        return {name: vars(run).copy() for name, run in self.last_runs.items()}
+
+    async def stop(self, flush: bool = True, timeout: Optional[float] = None) -> None:
+        """Stop scheduling; with flush, back up a pending configuration change first
+
+        A backup still running after timeout seconds (e.g. a slow gist
+        upload) is cancelled, so shutdown never waits on the network.
+        """
+        try:
+            # Let change notifications already handed to the loop arrive
+            await asyncio.sleep(0)
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+                if flush:
+                    self._config_task = asyncio.get_running_loop().create_task(self.backup_config_now())
+
+            if self._database_task is not None:
+                self._database_task.cancel()
+                self._database_task = None
+
+            if self._config_task is not None and not self._config_task.done():
+                try:
+                    await asyncio.wait_for(self._config_task, timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"⚠️ Final configuration backup cancelled after {timeout:.1f}s")
+                except Exception as e:
+                    logger.error(f"❌ Final configuration backup failed: {e}")
+        finally:
+            self._loop = None
+            self.executor.shutdown(wait=False)
@@ -0,0 +1,189 @@
+"""
+Backup Store for Stream Artifact
+Content-addressed, deduplicated and compressed storage behind a single manifest
+"""
+
+import hashlib
+import json
+import lzma
+import os
+import zlib
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Content-defined chunking: boundaries depend on the bytes around them, so
+# an edit only changes the chunks it touches instead of shifting every
+# chunk after it
+MIN_CHUNK = 1024
+MAX_CHUNK = 16 * 1024
+# Twelve high bits of the hash (which see the last 32 bytes): about 4 KiB
+# between boundaries on average
+CHUNK_MASK = ((1 << 12) - 1) << 20
+
+# A fixed pseudo-random table for the gear rolling hash
+_GEAR = [int.from_bytes(hashlib.sha256(bytes([value])).digest()[:4], 'big') for value in range(256)]
+
+COMPRESSORS = {
+    'zlib': (".z", lambda data: zlib.compress(data, 9), zlib.decompress),
+    'lzma': (".xz", lzma.compress, lzma.decompress),
+}
+
+
+def chunk_boundaries(data: bytes) -> Iterator[bytes]:
+    """Split data into content-defined chunks"""
+    start = 0
+    rolling = 0
+    length = len(data)
+    index = start + MIN_CHUNK
+    while index < length:
+        rolling = ((rolling << 1) + _GEAR[data[index]]) & 0xFFFFFFFF
+        if (rolling & CHUNK_MASK) == 0 or index - start >= MAX_CHUNK:
+            yield data[start:index + 1]
+            start = index + 1
+            rolling = 0
+            index = start + MIN_CHUNK
+            continue
+        index += 1
+    if start < length:
+        yield data[start:]
+
+
+class BackupStore:
+    """Chunked, content-addressed backups with one manifest
+
+    A backup is split into chunks named by their SHA-256, so a chunk shared
+    by many backups is stored once, compressed. manifest.json lists every
+    backup with its chunk hashes: listing reads one file, retention edits
+    the manifest and garbage-collects chunks nothing refers to any more,
+    and a payload identical to the newest backup writes nothing at all.
+    """
+
+    def __init__(self, directory: Path, compression: str = 'zlib'):
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unknown compression: {compression}")
+
+        self.directory = Path(directory)
+        self.objects_dir = self.directory / "objects"
+        self.compression = compression
+        self._manifest: Optional[Dict] = None
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / "manifest.json"
+
+    @property
+    def manifest(self) -> Dict:
+        """The manifest, read from disk once"""
+        if self._manifest is None:
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as handle:
+                    self._manifest = json.load(handle)
+            except FileNotFoundError:
+                self._manifest = {'version': 1, 'backups': []}
+        return self._manifest
+
+    @property
+    def backups(self) -> List[Dict]:
+        """Backup entries, oldest first"""
+        return self.manifest['backups']
+
+    def _save_manifest(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        partial = self.manifest_path.with_suffix(".partial")
+        with open(partial, 'w', encoding='utf-8') as handle:
+            json.dump(self.manifest, handle, indent=1)
+        os.replace(partial, self.manifest_path)
+
+    def _object_path(self, digest: str, compression: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}{COMPRESSORS[compression][0]}"
+
+    def _write_chunk(self, chunk: bytes) -> tuple:
+        """Store a chunk unless present; returns (digest, bytes written)"""
+        digest = hashlib.sha256(chunk).hexdigest()
+        for compression in COMPRESSORS:
+            if self._object_path(digest, compression).exists():
+                return digest, 0
+
+        path = self._object_path(digest, self.compression)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = COMPRESSORS[self.compression][1](chunk)
+        partial = path.with_name(path.name + ".partial")
+        with open(partial, 'wb') as handle:
+            handle.write(data)
+        os.replace(partial, path)
+        return digest, len(data)
+
+    def _read_chunk(self, digest: str) -> bytes:
+        for compression, (_, _, decompress) in COMPRESSORS.items():
+            path = self._object_path(digest, compression)
+            if path.exists():
+                chunk = decompress(path.read_bytes())
+                if hashlib.sha256(chunk).hexdigest() != digest:
+                    raise ValueError(f"Backup chunk {digest} is corrupt")
+                return chunk
+        raise FileNotFoundError(f"Backup chunk {digest} is missing")
+
+    def put(self, backup_id: str, payload: bytes, **info) -> Optional[Dict]:
+        """Store a backup; returns its entry, or None when it equals the newest backup"""
+        digest = hashlib.sha256(payload).hexdigest()
+        if self.backups and self.backups[-1]['digest'] == digest:
+            return None
+
+        chunks, written = [], 0
+        for chunk in chunk_boundaries(payload):
+            chunk_digest, size = self._write_chunk(chunk)
+            chunks.append(chunk_digest)
+            written += size
+
+        entry = dict(info, id=backup_id, digest=digest, size=len(payload), stored=written, chunks=chunks)
+        self.backups.append(entry)
+        self._save_manifest()
+        return entry
+
+    def get(self, backup_id: Optional[str] = None) -> Optional[bytes]:
+        """Payload of a backup (the newest by default), verified against its digest"""
+        entry = self.find(backup_id)
+        if entry is None:
+            return None
+
+        payload = b"".join(self._read_chunk(digest) for digest in entry['chunks'])
+        if hashlib.sha256(payload).hexdigest() != entry['digest']:
+            raise ValueError(f"Backup {entry['id']} does not match its digest")
+        return payload
+
+    def find(self, backup_id: Optional[str] = None) -> Optional[Dict]:
+        """Manifest entry of a backup (the newest by default)"""
+        if backup_id is None:
+            return self.backups[-1] if self.backups else None
+        return next((entry for entry in self.backups if entry['id'] == backup_id), None)
+
+    def remove(self, backup_ids) -> int:
+        """Drop backups from the manifest and collect their unshared chunks"""
+        backup_ids = set(backup_ids)
+        before = len(self.backups)
+        self.manifest['backups'] = [entry for entry in self.backups if entry['id'] not in backup_ids]
+        removed = before - len(self.backups)
+        if removed:
+            self._save_manifest()
+            self.collect_garbage()
+        return removed
+
+    def collect_garbage(self) -> int:
+        """Delete chunk files no backup refers to"""
+        if not self.objects_dir.exists():
+            return 0
+
+        referenced = {digest for entry in self.backups for digest in entry['chunks']}
+        deleted = 0
+        for bucket in self.objects_dir.iterdir():
+            for path in bucket.iterdir():
+                digest = path.name.split(".", 1)[0]
+                if digest not in referenced:
+                    path.unlink()
+                    deleted += 1
+        if deleted:
+            logger.info(f"🗑️ Collected {deleted} unused backup chunks")
+        return deleted
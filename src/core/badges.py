@@ -0,0 +1,68 @@
+"""
+Chat Badges for Stream Artifact
+Compact bitmask encoding of the Twitch badges stored with each message
+"""
+
+from typing import Iterable, List
+
+# Bit per badge. Append only: the values are stored in the database
+BADGE_BITS = {
+    'broadcaster': 1 << 0,
+    'moderator': 1 << 1,
+    'vip': 1 << 2,
+    'subscriber': 1 << 3,
+    'founder': 1 << 4,
+    'staff': 1 << 5,
+    'admin': 1 << 6,
+    'global_mod': 1 << 7,
+    'partner': 1 << 8,
+    'turbo': 1 << 9,
+    'premium': 1 << 10,
+    'bits': 1 << 11,
+    'sub-gifter': 1 << 12,
+    'artist-badge': 1 << 13,
+}
+
+SUBSCRIBER = BADGE_BITS['subscriber']
+VIP = BADGE_BITS['vip']
+MODERATOR = BADGE_BITS['moderator']
+
+
+def badges_to_mask(badges: Iterable[str]) -> int:
+    """Encode badge names; names without a bit are ignored"""
+    mask = 0
+    for badge in badges:
+        mask |= BADGE_BITS.get(badge, 0)
+    return mask
+
+
+def mask_to_badges(mask: int) -> List[str]:
+    """Decode a bitmask back to badge names"""
+    if not mask:
+        return []
+    return [badge for badge, bit in BADGE_BITS.items() if mask & bit]
+
+
+def split_message_metadata(metadata: dict):
+    """Split message metadata into (display_name, badge mask, remaining extras)
+
+    The subscriber/VIP/mod flags are folded into the mask as their badge
+    bits; badges without a bit stay in the extras.
+    """
+    extras = dict(metadata)
+    display_name = extras.pop('display_name', None)
+
+    badges = extras.pop('badges', None) or []
+    mask = badges_to_mask(badges)
+    if extras.pop('is_subscriber', False):
+        mask |= SUBSCRIBER
+    if extras.pop('is_vip', False):
+        mask |= VIP
+    if extras.pop('is_mod', False):
+        mask |= MODERATOR
+
+    unknown = [badge for badge in badges if badge not in BADGE_BITS]
+    if unknown:
+        extras['badges'] = unknown
+
+    return display_name, mask, extras
@@ -0,0 +1,287 @@
+"""
+Chat Replay for Stream Artifact
+Synthetic or recorded chat played into the bot's message handler at realistic timing
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+import logging
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_TEXT = [
+    "PogChamp that was insane",
+    "first time here, love the stream",
+    "check this out https://example.com/clip/12345",
+    "LUL",
+    "gg",
+    "how long have you been streaming today?",
+    "KEKW no way",
+    "what settings do you use?",
+    "hi chat",
+    "that boss fight was brutal",
+]
+
+# Command mix: command -> relative weight
+COMMANDS = {
+    "!ai what game is this?": 5,
+    "!ask how do I beat this level?": 3,
+    "!help": 1,
+    "!stats": 1,
+    "!uptime": 1,
+}
+
+
+@dataclass
+class ChatLine:
+    """One chat message of a replay"""
+    at: float  # seconds after the start of the replay
+    user: str
+    text: str
+    badges: Tuple[str, ...] = ()
+
+
+@dataclass
+class Raid:
+    """A burst of new chatters: chatters users each sending one message within seconds"""
+    at: float
+    chatters: int
+    seconds: float = 5.0
+
+
+def synthetic_chat(duration: float, rate: float, users: int = 2000, zipf: float = 1.1,
+                   command_share: float = 0.05, raids: Sequence[Raid] = (), seed: int = 0) -> List[ChatLine]:
+    """Chat at rate messages per second for duration seconds, plus raid bursts
+
+    Senders follow a Zipf distribution over users (a few regulars write
+    most lines); command_share of lines are commands drawn from COMMANDS.
+    The same arguments always give the same chat.
+    """
+    rng = random.Random(seed)
+    names = [f"viewer{rank}" for rank in range(users)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) ** zipf for rank in range(users)))
+    badges = {name: _badges_for(rng) for name in names}
+    commands, command_weights = list(COMMANDS), list(COMMANDS.values())
+
+    def text() -> str:
+        if rng.random() < command_share:
+            return rng.choices(commands, command_weights)[0]
+        return rng.choice(SAMPLE_TEXT)
+
+    lines = []
+    at = 0.0
+    while rate > 0:
+        at += rng.expovariate(rate)
+        if at >= duration:
+            break
+        user = rng.choices(names, cum_weights=cum_weights)[0]
+        lines.append(ChatLine(round(at, 6), user, text(), badges[user]))
+
+    for index, raid in enumerate(raids):
+        for chatter in range(raid.chatters):
+            at = raid.at + rng.random() * raid.seconds
+            lines.append(ChatLine(round(at, 6), f"raider{index}_{chatter}", text(), _badges_for(rng)))
+
+    lines.sort(key=lambda line: line.at)
+    return lines
+
+
+def _badges_for(rng: random.Random) -> Tuple[str, ...]:
+    roll = rng.random()
+    if roll < 0.01:
+        return ('moderator',)
+    if roll < 0.03:
+        return ('vip',)
+    if roll < 0.33:
+        return ('subscriber',)
+    return ()
+
+
+def save_chat(lines: Iterable[ChatLine], path: Path) -> None:
+    """Write chat as JSON lines ({"at", "user", "text", "badges"})"""
+    with open(path, 'w', encoding='utf-8') as handle:
+        for line in lines:
+            handle.write(json.dumps(asdict(line), ensure_ascii=False) + "\n")
+
+
+def load_chat(path: Path) -> List[ChatLine]:
+    """Read chat written by save_chat (or recorded in the same format)"""
+    lines = []
+    with open(path, 'r', encoding='utf-8') as handle:
+        for raw in handle:
+            if raw.strip():
+                data = json.loads(raw)
+                lines.append(ChatLine(float(data['at']), data['user'], data['text'], tuple(data.get('badges', ()))))
+    lines.sort(key=lambda line: line.at)
+    return lines
+
+
+class StubAIClient:
+    """Stands in for OpenRouterClient: answers after a random delay around latency seconds"""
+
+    config = None
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def get_response(self, prompt: str, username: str, context=None):
+        self.calls += 1
+        await asyncio.sleep(random.uniform(0.5, 1.5) * self.latency)
+        return f"Great question, {username}! Here is a short answer."
+
+
+class ReplayAuthor:
+    """The chatter attributes TwitchClient reads from a twitchio message author"""
+
+    __slots__ = ('name', 'display_name', 'id', 'badges', 'is_subscriber', 'is_vip', 'is_mod')
+
+    def __init__(self, name: str, badges: Tuple[str, ...]):
+        self.name = name
+        self.display_name = name
+        self.id = abs(hash(name)) % 10 ** 9
+        self.badges = {badge: "1" for badge in badges}  # name -> version, as twitchio has them
+        self.is_subscriber = 'subscriber' in badges
+        self.is_vip = 'vip' in badges
+        self.is_mod = 'moderator' in badges
+
+
+class ReplayChannel:
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class ReplayMessage:
+    """Stands in for a twitchio Message; due is the loop time it should have arrived"""
+
+    __slots__ = ('content', 'author', 'channel', 'echo', 'timestamp', 'tags', 'due')
+
+    def __init__(self, line: ChatLine, channel: ReplayChannel, due: float):
+        self.content = line.text
+        self.author = ReplayAuthor(line.user, line.badges)
+        self.channel = channel
+        self.echo = False
+        self.timestamp = datetime.now()
+        self.tags = {}
+        self.due = due
+
+
+def percentiles(values: Sequence[float], points: Sequence[int] = (50, 95, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles (and max) of values, in milliseconds"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {f"p{point}": round(ordered[max(0, -(-len(ordered) * point // 100) - 1)] * 1000, 3)
+              for point in points}
+    result['max'] = round(ordered[-1] * 1000, 3)
+    return result
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of this process, where the platform exposes it cheaply"""
+    try:
+        with open('/proc/self/statm', 'r') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+@dataclass
+class ReplayResult:
+    """Outcome of one replay"""
+    messages: int
+    errors: int
+    seconds: float
+    latencies: List[float] = field(default_factory=list)
+    rss_samples: List[int] = field(default_factory=list)
+
+    @property
+    def messages_per_sec(self) -> float:
+        return self.messages / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> Dict:
+        memory = {}
+        if self.rss_samples:
+            mb = 1024 * 1024
+            memory = {
+                'rss_start_mb': round(self.rss_samples[0] / mb, 2),
+                'rss_peak_mb': round(max(self.rss_samples) / mb, 2),
+                'rss_end_mb': round(self.rss_samples[-1] / mb, 2),
+                'growth_mb': round((self.rss_samples[-1] - self.rss_samples[0]) / mb, 2),
+            }
+        return {
+            'messages': self.messages,
+            'errors': self.errors,
+            'seconds': round(self.seconds, 3),
+            'messages_per_sec': round(self.messages_per_sec, 1),
+            'latency_ms': percentiles(self.latencies),
+            'memory': memory,
+        }
+
+
+class ChatReplay:
+    """Plays chat lines into an async message handler
+
+    Each line is dispatched as its own task when it is due (speed 2 plays
+    twice as fast; speed 0 dispatches everything at once), the way twitchio
+    runs event_message. A line's latency is from when it was due until its
+    handler returned, so time spent waiting behind a busy event loop counts.
+    """
+
+    def __init__(self, lines: Sequence[ChatLine], handler: Callable[[ReplayMessage], Awaitable],
+                 channel: str = "replay", speed: float = 1.0, memory_interval: float = 0.5):
+        self.lines = lines
+        self.handler = handler
+        self.channel = ReplayChannel(channel)
+        self.speed = speed
+        self.memory_interval = memory_interval
+
+    async def run(self) -> ReplayResult:
+        loop = asyncio.get_running_loop()
+        result = ReplayResult(len(self.lines), 0, 0.0)
+        tasks = []
+        sampler = loop.create_task(self._sample_memory(result.rss_samples))
+
+        start = loop.time()
+        wall_start = time.perf_counter()
+        for line in self.lines:
+            due = start + line.at / self.speed if self.speed else start
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(loop.create_task(self._deliver(ReplayMessage(line, self.channel, due), result)))
+
+        await asyncio.gather(*tasks)
+        result.seconds = time.perf_counter() - wall_start
+        sampler.cancel()
+        rss = rss_bytes()
+        if rss is not None:
+            result.rss_samples.append(rss)
+        return result
+
+    async def _deliver(self, message: ReplayMessage, result: ReplayResult) -> None:
+        try:
+            await self.handler(message)
+        except Exception as e:
+            result.errors += 1
+            if result.errors == 1:
+                logger.error(f"❌ Replayed message failed: {e}")
+        result.latencies.append(asyncio.get_running_loop().time() - message.due)
+
+    async def _sample_memory(self, samples: List[int]) -> None:
+        while True:
+            rss = rss_bytes()
+            if rss is None:
+                return
+            samples.append(rss)
+            await asyncio.sleep(self.memory_interval)
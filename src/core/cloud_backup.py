@@ -5,22 +5,124 @@ Handles backing up bot configuration to cloud services
 
 import asyncio
 import aiohttp
+import hashlib
 import json
 import logging
-from typing import Dict, Optional, Any
+import re
+import time
+from typing import Dict, Optional, Any, Tuple
 from datetime import datetime
 import base64
 
+from .backup_store import BackupStore
+from .metrics import metrics
+
 logger = logging.getLogger(__name__)
 
+CACHE_REQUESTS = metrics.counter('stream_artifact_cache_requests_total', 'Cache lookups', ('cache', 'result'))
+
+
+# Gist file names; the index file keeps the old single-file name so
+# list_backups still recognizes older backups
+INDEX_FILE = 'stream-artifact-config.json'
+PART_PREFIX = 'stream-artifact-config.'
+
+# Gists are meant for small files; bigger sections are split across several
+PART_SIZE = 256 * 1024
+
+# Settings never uploaded: a secret gist is readable by anyone with its URL
+SECRET_FIELD = re.compile(r"(\w+_)?(token|api_key|secret|password)")
+
+
+def redact_secrets(config_data: Dict) -> Dict:
+    """Copy of config_data without credential settings (twitch.token, ai.api_key, ...)"""
+    return {
+        section: {key: value for key, value in values.items() if not SECRET_FIELD.fullmatch(key)}
+        if isinstance(values, dict) else values
+        for section, values in config_data.items()
+    }
+
+
+def split_backup(config_data: Dict, part_size: int = PART_SIZE) -> Tuple[Dict[str, str], list]:
+    """Gist files for a configuration, one per top-level section with large sections in parts
+    
+    Returns the file contents by name and the index entries describing them.
+    """
+    files, parts = {}, []
+    for section, value in config_data.items():
+        content = json.dumps(value, indent=1, sort_keys=True)
+        if len(content) <= part_size or not isinstance(value, (dict, list)) or len(value) < 2:
+            name = f"{PART_PREFIX}{section}.json"
+            files[name] = content
+            parts.append({'file': name, 'section': section})
+            continue
+        
+        # Split keys (or items) into parts of roughly part_size
+        items = sorted(value.items()) if isinstance(value, dict) else list(value)
+        groups, group, size = [], [], 0
+        for item in items:
+            item_size = len(json.dumps(item))
+            if group and size + item_size > part_size:
+                groups.append(group)
+                group, size = [], 0
+            group.append(item)
+            size += item_size
+        groups.append(group)
+        
+        for index, group in enumerate(groups):
+            name = f"{PART_PREFIX}{section}.{index:03d}.json"
+            files[name] = json.dumps(dict(group) if isinstance(value, dict) else group, indent=1, sort_keys=True)
+            parts.append({'file': name, 'section': section, 'part': index})
+    return files, parts
+
+
+def join_backup(index: Dict, files: Dict[str, str]) -> Dict:
+    """Rebuild a configuration from its index and gist file contents"""
+    config = {}
+    for part in index['parts']:
+        value = json.loads(files[part['file']])
+        section = part['section']
+        if 'part' not in part:
+            config[section] = value
+        elif isinstance(value, dict):
+            config.setdefault(section, {}).update(value)
+        else:
+            config.setdefault(section, []).extend(value)
+    return config
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
 
 class CloudBackupService:
-    """Cloud backup service for bot configurations"""
+    """Cloud backup service for bot configurations
+    
+    The configuration is stored in a private gist as one file per section
+    plus an index file listing them with their hashes. A backup compares
+    those hashes with what the gist already holds and PATCHes only the
+    files that changed; an unchanged configuration makes no request at all.
+    """
     
-    def __init__(self, config):
+    def __init__(self, config, api_url: str = 'https://api.github.com', list_cache_ttl: float = 300.0,
+                 part_size: int = PART_SIZE):
         self.config = config
+        self.api_url = api_url.rstrip('/')
+        self.part_size = part_size
+        
+        # Serializing and hashing run here (None: the loop's default pool)
+        self.executor = None
+        self.last_backup_size = 0
         self.github_token = None
-        self.backup_gist_id = None
+        self.backup_gist_id = config.get('backup.gist_id') or None
+        
+        # Hash of every file in the backup gist, as last uploaded or fetched
+        self._remote_hashes: Optional[Dict[str, str]] = None
+        
+        # list_backups results with their ETag, reused while fresh
+        self.list_cache_ttl = list_cache_ttl
+        self._list_cache: Optional[Tuple[float, list]] = None
+        self._list_etags: Dict[str, Tuple[str, list]] = {}
         
         logger.info("☁️ Cloud backup service initialized")
     
@@ -29,23 +131,20 @@ class CloudBackupService:
         self.github_token = access_token
         logger.info("🔑 GitHub credentials configured")
     
+    def _headers(self) -> Dict[str, str]:
+        return {
+            'Authorization': f'token {self.github_token}',
+            'Accept': 'application/vnd.github.v3+json'
+        }
+    
     async def backup_configuration(self, config_data: Dict) -> bool:
-        """Backup configuration to cloud"""
+        """Backup configuration to cloud (without tokens and API keys)"""
         try:
             if not self.github_token:
                 logger.warning("⚠️ No GitHub token configured")
                 return False
             
-            # Prepare backup data
-            backup_data = {
-                'timestamp': datetime.now().isoformat(),
-                'version': '1.0.0',
-                'application': 'Stream Artifact',
-                'config': config_data
-            }
-            
-            # Create or update GitHub Gist
-            success = await self._backup_to_github_gist(backup_data)
+            success = await self._backup_to_github_gist(redact_secrets(config_data))
             
             if success:
                 logger.info("✅ Configuration backed up to cloud")
@@ -59,7 +158,7 @@ class CloudBackupService:
             return False
     
     async def restore_configuration(self) -> Optional[Dict]:
-        """Restore configuration from cloud"""
+        """Restore configuration from cloud; credentials were never uploaded, so keep the local ones"""
         try:
             if not self.github_token:
                 logger.warning("⚠️ No GitHub token configured")
@@ -79,132 +178,186 @@ class CloudBackupService:
             logger.error(f"❌ Restore error: {e}")
             return None
     
-    async def _backup_to_github_gist(self, backup_data: Dict) -> bool:
-        """Backup to GitHub Gist"""
+    async def _fetch_gist_files(self, session: aiohttp.ClientSession, gist_id: str) -> Optional[Dict[str, str]]:
+        """Contents of every file in a gist (truncated files are fetched in full)"""
+        async with session.get(f'{self.api_url}/gists/{gist_id}', headers=self._headers()) as resp:
+            if resp.status != 200:
+                error_text = await resp.text()
+                logger.error(f"❌ GitHub API error: {resp.status} - {error_text}")
+                return None
+            result = await resp.json()
+        
+        files = {}
+        for name, file in result.get('files', {}).items():
+            if file.get('truncated') and file.get('raw_url'):
+                async with session.get(file['raw_url'], headers=self._headers()) as resp:
+                    files[name] = await resp.text()
+            else:
+                files[name] = file.get('content', '')
+        return files
+    
+    async def _backup_to_github_gist(self, config_data: Dict) -> bool:
+        """Backup to GitHub Gist, uploading only changed files"""
         try:
+            def prepare():
+                parts, index_parts = split_backup(config_data, self.part_size)
+                return parts, index_parts, {name: _content_hash(content) for name, content in parts.items()}
+            
+            parts, index_parts, hashes = await asyncio.get_running_loop().run_in_executor(self.executor, prepare)
+            self.last_backup_size = 0
+            
             async with aiohttp.ClientSession() as session:
-                headers = {
-                    'Authorization': f'token {self.github_token}',
-                    'Accept': 'application/vnd.github.v3+json',
-                    'Content-Type': 'application/json'
+                if self.backup_gist_id and self._remote_hashes is None:
+                    remote = await self._fetch_gist_files(session, self.backup_gist_id)
+                    if remote is not None:
+                        self._remote_hashes = {name: _content_hash(content) for name, content in remote.items()}
+                
+                remote_hashes = self._remote_hashes or {}
+                changed = {name: {'content': parts[name]} for name in parts if remote_hashes.get(name) != hashes[name]}
+                removed = [name for name in remote_hashes
+                           if name.startswith(PART_PREFIX) and name != INDEX_FILE and name not in parts]
+                
+                if self.backup_gist_id and not changed and not removed:
+                    logger.info("☁️ Configuration unchanged, nothing to upload")
+                    return True
+                
+                # The index names every part, so a restore never mixes backups
+                index = {
+                    'timestamp': datetime.now().isoformat(),
+                    'version': '2.0.0',
+                    'application': 'Stream Artifact',
+                    'parts': [dict(part, sha256=hashes[part['file']]) for part in index_parts]
                 }
+                index_content = json.dumps(index, indent=2)
+                changed[INDEX_FILE] = {'content': index_content}
                 
-                # Prepare gist data
                 gist_data = {
                     'description': 'Stream Artifact Bot Configuration Backup',
-                    'public': False,  # Private gist
-                    'files': {
-                        'stream-artifact-config.json': {
-                            'content': json.dumps(backup_data, indent=2)
-                        }
-                    }
+                    'files': dict(changed, **{name: None for name in removed})
                 }
                 
-                # Create or update gist
                 if self.backup_gist_id:
                     # Update existing gist
-                    url = f'https://api.github.com/gists/{self.backup_gist_id}'
+                    url = f'{self.api_url}/gists/{self.backup_gist_id}'
                     method = session.patch
                 else:
                     # Create new gist
-                    url = 'https://api.github.com/gists'
+                    url = f'{self.api_url}/gists'
                     method = session.post
+                    gist_data['public'] = False  # Private gist
                 
-                async with method(url, json=gist_data, headers=headers) as resp:
+                async with method(url, json=gist_data, headers=self._headers()) as resp:
                     if resp.status in [200, 201]:
                         result = await resp.json()
-                        self.backup_gist_id = result['id']
                         
-                        # Save gist ID to config
-                        self.config.set('cloud.backup_gist_id', self.backup_gist_id)
-                        self.config.save()
+                        if result['id'] != self.backup_gist_id:
+                            self.backup_gist_id = result['id']
+                            # Save gist ID to config
+                            self.config.set('backup.gist_id', self.backup_gist_id)
+                            self.config.save()
+                        
+                        hashes[INDEX_FILE] = _content_hash(index_content)
+                        self._remote_hashes = hashes
+                        self.last_backup_size = sum(len(file['content']) for file in changed.values())
+                        self._list_cache = None
+                        self.config.set('backup.last_cloud_backup', index['timestamp'])
                         
-                        logger.info(f"✅ Backup saved to gist: {self.backup_gist_id}")
+                        logger.info(f"✅ Backup saved to gist: {self.backup_gist_id} "
+                                    f"({len(changed)} of {len(parts) + 1} files uploaded)")
                         return True
                     else:
                         error_text = await resp.text()
                         logger.error(f"❌ GitHub API error: {resp.status} - {error_text}")
+                        # The gist may be partly updated; compare again next time
+                        self._remote_hashes = None
                         return False
                         
         except Exception as e:
             logger.error(f"❌ GitHub backup error: {e}")
+            self._remote_hashes = None
             return False
     
     async def _restore_from_github_gist(self) -> Optional[Dict]:
         """Restore from GitHub Gist"""
         try:
-            # Get gist ID from config
-            gist_id = self.config.get('cloud.backup_gist_id')
+            gist_id = self.backup_gist_id
             if not gist_id:
                 logger.warning("⚠️ No backup gist ID found")
                 return None
             
             async with aiohttp.ClientSession() as session:
-                headers = {
-                    'Authorization': f'token {self.github_token}',
-                    'Accept': 'application/vnd.github.v3+json'
-                }
-                
-                url = f'https://api.github.com/gists/{gist_id}'
-                
-                async with session.get(url, headers=headers) as resp:
-                    if resp.status == 200:
-                        result = await resp.json()
-                        
-                        # Extract configuration from gist
-                        files = result.get('files', {})
-                        config_file = files.get('stream-artifact-config.json')
-                        
-                        if config_file and 'content' in config_file:
-                            backup_data = json.loads(config_file['content'])
-                            logger.info("✅ Configuration restored from gist")
-                            return backup_data
-                        else:
-                            logger.error("❌ No configuration found in gist")
-                            return None
-                    else:
-                        error_text = await resp.text()
-                        logger.error(f"❌ GitHub API error: {resp.status} - {error_text}")
-                        return None
+                files = await self._fetch_gist_files(session, gist_id)
+            
+            if not files or INDEX_FILE not in files:
+                logger.error("❌ No configuration found in gist")
+                return None
+            
+            index = json.loads(files[INDEX_FILE])
+            if 'parts' not in index:
+                # Single-file backup from before the split format
+                return index
+            
+            for part in index['parts']:
+                content = files.get(part['file'])
+                if content is None or _content_hash(content) != part['sha256']:
+                    logger.error(f"❌ Backup file {part['file']} is missing or does not match the index")
+                    return None
+            
+            self._remote_hashes = {name: _content_hash(content) for name, content in files.items()}
+            logger.info("✅ Configuration restored from gist")
+            return dict(index, config=join_backup(index, files))
                         
         except Exception as e:
             logger.error(f"❌ GitHub restore error: {e}")
             return None
     
     async def list_backups(self) -> list:
-        """List available backups"""
+        """List available backups across every page of the user's gists"""
         try:
             if not self.github_token:
                 return []
             
+            if self._list_cache and time.monotonic() - self._list_cache[0] < self.list_cache_ttl:
+                CACHE_REQUESTS.labels('gist_list', 'hit').inc()
+                return self._list_cache[1]
+            CACHE_REQUESTS.labels('gist_list', 'miss').inc()
+            
+            backups = []
             async with aiohttp.ClientSession() as session:
-                headers = {
-                    'Authorization': f'token {self.github_token}',
-                    'Accept': 'application/vnd.github.v3+json'
-                }
-                
-                # Get all gists
-                url = 'https://api.github.com/gists'
-                
-                async with session.get(url, headers=headers) as resp:
-                    if resp.status == 200:
-                        gists = await resp.json()
-                        
-                        # Filter Stream Artifact backups
-                        backups = []
-                        for gist in gists:
-                            if 'stream-artifact-config.json' in gist.get('files', {}):
-                                backups.append({
-                                    'id': gist['id'],
-                                    'description': gist['description'],
-                                    'created_at': gist['created_at'],
-                                    'updated_at': gist['updated_at']
-                                })
-                        
-                        return backups
-                    else:
-                        logger.error(f"❌ Failed to list gists: {resp.status}")
-                        return []
+                url = f'{self.api_url}/gists?per_page=100'
+                while url:
+                    # Unchanged pages answer 304 and do not count against the rate limit
+                    headers = self._headers()
+                    cached = self._list_etags.get(url)
+                    if cached:
+                        headers['If-None-Match'] = cached[0]
+                    
+                    async with session.get(url, headers=headers) as resp:
+                        if resp.status == 304 and cached:
+                            gists = cached[1]
+                        elif resp.status == 200:
+                            gists = await resp.json()
+                            if resp.headers.get('ETag'):
+                                self._list_etags[url] = (resp.headers['ETag'], gists)
+                        else:
+                            logger.error(f"❌ Failed to list gists: {resp.status}")
+                            return []
+                        next_link = resp.links.get('next')
+                    
+                    # Filter Stream Artifact backups
+                    for gist in gists:
+                        if INDEX_FILE in gist.get('files', {}):
+                            backups.append({
+                                'id': gist['id'],
+                                'description': gist['description'],
+                                'created_at': gist['created_at'],
+                                'updated_at': gist['updated_at']
+                            })
+                    
+                    url = str(next_link['url']) if next_link else None
+            
+            self._list_cache = (time.monotonic(), backups)
+            return backups
                         
         except Exception as e:
             logger.error(f"❌ List backups error: {e}")
@@ -217,15 +370,14 @@ class CloudBackupService:
                 return False
             
             async with aiohttp.ClientSession() as session:
-                headers = {
-                    'Authorization': f'token {self.github_token}',
-                    'Accept': 'application/vnd.github.v3+json'
-                }
-                
-                url = f'https://api.github.com/gists/{gist_id}'
+                url = f'{self.api_url}/gists/{gist_id}'
                 
-                async with session.delete(url, headers=headers) as resp:
+                async with session.delete(url, headers=self._headers()) as resp:
                     if resp.status == 204:
+                        self._list_cache = None
+                        if gist_id == self.backup_gist_id:
+                            self.backup_gist_id = None
+                            self._remote_hashes = None
                         logger.info(f"✅ Backup deleted: {gist_id}")
                         return True
                     else:
@@ -246,40 +398,71 @@ class CloudBackupService:
             'service': 'GitHub Gists',
             'configured': self.is_configured(),
             'gist_id': self.backup_gist_id,
-            'last_backup': self.config.get('cloud.last_backup_time')
+            'last_backup': self.config.get('backup.last_cloud_backup')
         }
 
 
 class LocalBackupService:
-    """Local backup service for bot configurations"""
+    """Local backup service for bot configurations
+    
+    Backups live in a content-addressed BackupStore: unchanged configuration
+    is never stored twice, listing reads only the manifest, and retention is
+    a manifest update followed by garbage collection of unused chunks.
+    """
     
-    def __init__(self, config):
+    def __init__(self, config, compression: str = 'zlib'):
         self.config = config
         self.backup_dir = config.data_dir / "backups"
         self.backup_dir.mkdir(exist_ok=True)
+        self.store = BackupStore(self.backup_dir / "store", compression)
         
+        # Chunking and compression run here (None: the loop's default pool)
+        self.executor = None
+        self.last_backup_size = 0
+        
+        self._import_legacy_backups()
         logger.info("💾 Local backup service initialized")
     
+    @staticmethod
+    def _payload(config_data: Dict) -> bytes:
+        """Canonical serialization, so equal configurations hash equal"""
+        return json.dumps(config_data, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    
+    def _import_legacy_backups(self):
+        """Move backup_*.json files from before the store into it"""
+        legacy_files = sorted(self.backup_dir.glob("backup_*.json"), key=lambda x: x.stat().st_mtime)
+        for backup_file in legacy_files:
+            try:
+                with open(backup_file, 'r', encoding='utf-8') as f:
+                    backup_data = json.load(f)
+                
+                self.store.put(backup_file.stem, self._payload(backup_data['config']),
+                               timestamp=backup_data.get('timestamp'), version=backup_data.get('version'))
+                backup_file.unlink()
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to import legacy backup {backup_file.name}: {e}")
+        
+        if legacy_files:
+            logger.info(f"💾 Imported {len(legacy_files)} legacy backups into the backup store")
+    
     async def backup_configuration(self, config_data: Dict) -> bool:
         """Backup configuration locally"""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = self.backup_dir / f"backup_{timestamp}.json"
-            
-            backup_data = {
-                'timestamp': datetime.now().isoformat(),
-                'version': '1.0.0',
-                'application': 'Stream Artifact',
-                'config': config_data
-            }
+            backup_id = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+            entry = await asyncio.get_running_loop().run_in_executor(
+                self.executor, lambda: self.store.put(backup_id, self._payload(config_data),
+                                                      timestamp=datetime.now().isoformat(), version='1.0.0')
+            )
+            self.last_backup_size = entry['stored'] if entry else 0
             
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                json.dump(backup_data, f, indent=2)
+            if entry is None:
+                logger.debug("💾 Configuration unchanged since the last backup")
+                return True
             
             # Keep only last 10 backups
             await self._cleanup_old_backups()
             
-            logger.info(f"✅ Configuration backed up locally: {backup_file.name}")
+            logger.info(f"✅ Configuration backed up locally: {backup_id} ({entry['stored']} new bytes)")
             return True
             
         except Exception as e:
@@ -289,30 +472,16 @@ class LocalBackupService:
     async def restore_configuration(self, backup_file: str = None) -> Optional[Dict]:
         """Restore configuration from local backup"""
         try:
-            if backup_file:
-                backup_path = self.backup_dir / backup_file
-            else:
-                # Get latest backup
-                backup_files = list(self.backup_dir.glob("backup_*.json"))
-                if not backup_files:
-                    logger.warning("⚠️ No local backups found")
-                    return None
-                
-                backup_path = max(backup_files, key=lambda x: x.stat().st_mtime)
+            # Older callers pass the legacy file name
+            backup_id = backup_file[:-len(".json")] if backup_file and backup_file.endswith(".json") else backup_file
             
-            if backup_path.exists():
-                with open(backup_path, 'r', encoding='utf-8') as f:
-                    backup_data = json.load(f)
-                
-                if 'config' in backup_data:
-                    logger.info(f"✅ Configuration restored from: {backup_path.name}")
-                    return backup_data['config']
-                else:
-                    logger.error("❌ Invalid backup file format")
-                    return None
-            else:
-                logger.warning(f"⚠️ Backup file not found: {backup_path}")
+            payload = self.store.get(backup_id)
+            if payload is None:
+                logger.warning(f"⚠️ Backup not found: {backup_file}" if backup_file else "⚠️ No local backups found")
                 return None
+            
+            logger.info(f"✅ Configuration restored from: {self.store.find(backup_id)['id']}")
+            return json.loads(payload)
                 
         except Exception as e:
             logger.error(f"❌ Local restore error: {e}")
@@ -321,24 +490,12 @@ class LocalBackupService:
     async def list_backups(self) -> list:
         """List available local backups"""
         try:
-            backup_files = list(self.backup_dir.glob("backup_*.json"))
-            backups = []
-            
-            for backup_file in sorted(backup_files, key=lambda x: x.stat().st_mtime, reverse=True):
-                try:
-                    with open(backup_file, 'r', encoding='utf-8') as f:
-                        backup_data = json.load(f)
-                    
-                    backups.append({
-                        'file': backup_file.name,
-                        'timestamp': backup_data.get('timestamp'),
-                        'size': backup_file.stat().st_size,
-                        'created': datetime.fromtimestamp(backup_file.stat().st_mtime).isoformat()
-                    })
-                except Exception as e:
-                    logger.warning(f"⚠️ Failed to read backup {backup_file}: {e}")
-            
-            return backups
+            return [{
+                'file': entry['id'],
+                'timestamp': entry.get('timestamp'),
+                'size': entry['size'],
+                'created': entry.get('timestamp')
+            } for entry in reversed(self.store.backups)]
             
         except Exception as e:
             logger.error(f"❌ List local backups error: {e}")
@@ -347,9 +504,7 @@ class LocalBackupService:
     async def delete_backup(self, backup_file: str) -> bool:
         """Delete a local backup"""
         try:
-            backup_path = self.backup_dir / backup_file
-            if backup_path.exists():
-                backup_path.unlink()
+            if self.store.remove([backup_file]):
                 logger.info(f"✅ Local backup deleted: {backup_file}")
                 return True
             else:
@@ -363,16 +518,12 @@ class LocalBackupService:
     async def _cleanup_old_backups(self, keep_count: int = 10):
         """Keep only the most recent backups"""
         try:
-            backup_files = sorted(
-                self.backup_dir.glob("backup_*.json"),
-                key=lambda x: x.stat().st_mtime,
-                reverse=True
-            )
-            
-            # Delete old backups
-            for old_backup in backup_files[keep_count:]:
-                old_backup.unlink()
-                logger.info(f"🗑️ Deleted old backup: {old_backup.name}")
+            old_backups = self.store.backups[:-keep_count]
+            if old_backups:
+                await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.store.remove, [entry['id'] for entry in old_backups]
+                )
+                logger.info(f"🗑️ Deleted {len(old_backups)} old backups")
                 
         except Exception as e:
             logger.error(f"❌ Cleanup old backups error: {e}")
@@ -383,10 +534,9 @@ class LocalBackupService:
     
     def get_backup_info(self) -> Dict:
         """Get backup service information"""
-        backup_count = len(list(self.backup_dir.glob("backup_*.json")))
         return {
             'service': 'Local Storage',
             'configured': self.is_configured(),
             'backup_directory': str(self.backup_dir),
-            'backup_count': backup_count
+            'backup_count': len(self.store.backups)
         }
@@ -6,10 +6,13 @@ Handles settings, persistence, and user preferences
 import json
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, asdict, fields
+from operator import attrgetter
 import logging
 
+from .config_writer import ConfigWriter
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,6 +35,8 @@ class AIConfig:
     memory_depth: int = 10
     random_reply_chance: float = 0.05
     max_response_length: int = 480
+    elevenlabs_api_key: str = ""
+    rawg_api_key: str = ""
 
 
 @dataclass
@@ -46,17 +51,135 @@ class UIConfig:
     glow_intensity: float = 0.3
 
 
+@dataclass
+class BackupConfig:
+    """Backup configuration"""
+    database_enabled: bool = True
+    database_interval: int = 3600  # seconds between database snapshots
+    database_full_every: int = 24  # snapshots per chain before a new full one
+    database_keep_chains: int = 2
+    database_verify: bool = True
+    backup_type: str = "local"  # 'local' or 'github'
+    github_token: str = ""
+    gist_id: str = ""
+    last_cloud_backup: str = ""
+    config_debounce: float = 5.0  # seconds of quiet after a save before backing up
+
+
+@dataclass
+class MonitoringConfig:
+    """Runtime diagnostics configuration"""
+    metrics_enabled: bool = False  # serve Prometheus metrics over HTTP
+    metrics_host: str = "localhost"
+    metrics_port: int = 9464
+    trace_sample_rate: float = 0.0  # share of chat messages traced (0 disables tracing)
+    loop_lag_budget_ms: int = 250  # warn when the event loop falls this far behind
+    slow_callback_ms: int = 100  # capture the blocking stack once a callback runs this long
+    log_console: bool = True  # also print logs to the console (they always go to logs/stream_artifact.log)
+
+
 @dataclass
 class AppConfig:
     """Main application configuration"""
     twitch: TwitchConfig
     ai: AIConfig
     ui: UIConfig
+    backup: BackupConfig
+    monitoring: MonitoringConfig
     
     def __init__(self):
         self.twitch = TwitchConfig()
         self.ai = AIConfig()
         self.ui = UIConfig()
+        self.backup = BackupConfig()
+        self.monitoring = MonitoringConfig()
+
+
+# Top-level sections of config.json
+SECTIONS = {
+    'twitch': TwitchConfig,
+    'ai': AIConfig,
+    'ui': UIConfig,
+    'backup': BackupConfig,
+    'monitoring': MonitoringConfig,
+}
+
+
+@dataclass(frozen=True)
+class ConfigChange:
+    """One setting that changed"""
+    section: str
+    key: str
+    old: Any
+    new: Any
+    
+    @property
+    def path(self) -> str:
+        return f"{self.section}.{self.key}"
+
+
+def diff_config(old: AppConfig, new: AppConfig) -> Tuple[ConfigChange, ...]:
+    """Changed fields between two AppConfig instances"""
+    changes = []
+    for section in SECTIONS:
+        old_section, new_section = getattr(old, section), getattr(new, section)
+        for field in fields(new_section):
+            old_value, new_value = getattr(old_section, field.name), getattr(new_section, field.name)
+            if old_value != new_value:
+                changes.append(ConfigChange(section, field.name, old_value, new_value))
+    return tuple(changes)
+
+
+def check_value(path: str, expected: type, value: Any) -> Any:
+    """value if it fits the setting's type (ints widen to float); ValueError otherwise"""
+    if expected is float:
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+    else:
+        valid = isinstance(value, expected) and (expected is bool or not isinstance(value, bool))
+    if not valid:
+        raise ValueError(f"{path} must be {expected.__name__}, got {type(value).__name__}")
+    return float(value) if expected is float else value
+
+
+class ConfigPath:
+    """A 'section.key' setting compiled against the schema
+    
+    The path is validated once, when compiled; reading it afterwards is a
+    single attrgetter call on the AppConfig.
+    """
+    
+    __slots__ = ('path', 'section', 'key', 'type', 'read')
+    
+    def __init__(self, path: str):
+        section, _, key = path.partition('.')
+        types = {field.name: field.type for field in fields(SECTIONS[section])} if section in SECTIONS else {}
+        if key not in types:
+            raise KeyError(f"unknown setting: {path}")
+        
+        self.path = path
+        self.section = section
+        self.key = key
+        self.type = types[key]
+        self.read = attrgetter(path)
+    
+    def set(self, app_config: AppConfig, value: Any) -> Tuple[Any, Any]:
+        """Validate and assign value; returns (old, new)"""
+        value = check_value(self.path, self.type, value)
+        section = getattr(app_config, self.section)
+        old = getattr(section, self.key)
+        setattr(section, self.key, value)
+        return old, value
+
+
+_PATHS: Dict[str, ConfigPath] = {}
+
+
+def compile_path(path: str) -> ConfigPath:
+    """Cached ConfigPath of a dot-path; KeyError for paths outside the schema"""
+    accessor = _PATHS.get(path)
+    if accessor is None:
+        accessor = _PATHS[path] = ConfigPath(path)
+    return accessor
 
 
 class Config:
@@ -67,9 +190,18 @@ class Config:
         self.config_file = self.config_dir / "config.json"
         self.config = AppConfig()
         
+        # Called with no arguments after every successful save
+        self._save_listeners: List[Callable[[], None]] = []
+        
+        # Dot-path -> callbacks taking a ConfigChange
+        self._subscriptions: Dict[str, List[Callable[[ConfigChange], None]]] = {}
+        
         # Ensure config directory exists
         self.config_dir.mkdir(exist_ok=True)
         
+        # Saves are written atomically on a background thread
+        self.writer = ConfigWriter(self.config_file, on_written=self._notify_save_listeners)
+        
         # Load existing config
         self.load()
     
@@ -80,13 +212,10 @@ class Config:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                 
-                # Update config with loaded data
-                if 'twitch' in data:
-                    self.config.twitch = TwitchConfig(**data['twitch'])
-                if 'ai' in data:
-                    self.config.ai = AIConfig(**data['ai'])
-                if 'ui' in data:
-                    self.config.ui = UIConfig(**data['ui'])
+                # Update config with loaded data; a bad setting must not
+                # cost the user every other one (the next save would
+                # replace the whole file with defaults)
+                self.config = self.parse(data, strict=False)
                 
                 logger.info("⚙️ Configuration loaded successfully")
             else:
@@ -95,56 +224,160 @@ class Config:
         except Exception as e:
             logger.error(f"❌ Failed to load configuration: {e}")
             logger.info("⚙️ Using default configuration")
-    
-    def save(self) -> None:
-        """Save configuration to file"""
-        try:
-            config_dict = {
-                'twitch': asdict(self.config.twitch),
-                'ai': asdict(self.config.ai),
-                'ui': asdict(self.config.ui)
-            }
             
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config_dict, f, indent=4)
+            # Keep the unreadable file: the next save replaces config.json
+            try:
+                unreadable = self.config_file.with_name(self.config_file.name + ".invalid")
+                os.replace(self.config_file, unreadable)
+                logger.warning(f"⚠️ Moved the unreadable configuration to {unreadable}")
+            except OSError:
+                pass
+    
+    @staticmethod
+    def parse(data: Dict[str, Any], strict: bool = True) -> AppConfig:
+        """Validate config.json data against the section dataclasses
+        
+        Missing sections and keys keep their defaults. Unknown ones and
+        values of the wrong type raise ValueError, or with strict=False are
+        logged and skipped (whole numbers written as floats are accepted).
+        """
+        if not isinstance(data, dict):
+            raise ValueError("configuration must be a JSON object")
+        
+        def reject(problem: str) -> None:
+            if strict:
+                raise ValueError(problem)
+            logger.warning(f"⚠️ Ignoring invalid configuration: {problem}")
+        
+        config = AppConfig()
+        for section, values in data.items():
+            if section not in SECTIONS:
+                reject(f"unknown section: {section}")
+                continue
+            if not isinstance(values, dict):
+                reject(f"section {section} must be an object")
+                continue
             
-            logger.info("💾 Configuration saved successfully")
+            checked = {}
+            for key, value in values.items():
+                try:
+                    accessor = compile_path(f"{section}.{key}")
+                except KeyError:
+                    reject(f"unknown setting: {section}.{key}")
+                    continue
+                if not strict and accessor.type is int and isinstance(value, float) and value.is_integer():
+                    value = int(value)
+                try:
+                    checked[key] = check_value(accessor.path, accessor.type, value)
+                except ValueError as e:
+                    reject(str(e))
             
+            setattr(config, section, SECTIONS[section](**checked))
+        return config
+    
+    @property
+    def twitch(self) -> TwitchConfig:
+        return self.config.twitch
+    
+    @property
+    def ai(self) -> AIConfig:
+        return self.config.ai
+    
+    @property
+    def ui(self) -> UIConfig:
+        return self.config.ui
+    
+    @property
+    def backup(self) -> BackupConfig:
+        return self.config.backup
+    
+    @property
+    def monitoring(self) -> MonitoringConfig:
+        return self.config.monitoring
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Configuration as plain JSON-serializable sections"""
+        return {
+            'twitch': asdict(self.config.twitch),
+            'ai': asdict(self.config.ai),
+            'ui': asdict(self.config.ui),
+            'backup': asdict(self.config.backup),
+            'monitoring': asdict(self.config.monitoring)
+        }
+    
+    def add_save_listener(self, callback: Callable[[], None]) -> None:
+        """Call callback after every successful save (on the writer thread)"""
+        self._save_listeners.append(callback)
+    
+    def save(self) -> None:
+        """Save configuration to file
+        
+        Returns immediately: the file is replaced atomically on a background
+        thread once saves have been quiet briefly, and not at all if the
+        content is unchanged. Call flush() to wait for the write.
+        """
+        try:
+            data = json.dumps(self.to_dict(), indent=4).encode('utf-8')
         except Exception as e:
             logger.error(f"❌ Failed to save configuration: {e}")
+            return
+        
+        self.writer.submit(data)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write a pending save now; False if it did not finish within timeout"""
+        return self.writer.flush(timeout)
+    
+    def _notify_save_listeners(self) -> None:
+        for callback in self._save_listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"❌ Configuration save listener failed: {e}")
     
     def get(self, key: str, default: Any = None) -> Any:
-        """Get a configuration value by dot-notation key"""
+        """Get a configuration value by dot-notation key ('ai.model') or a whole section ('ai')"""
+        if key in SECTIONS:
+            return getattr(self.config, key)
         try:
-            keys = key.split('.')
-            value = self.config
-            
-            for k in keys:
-                value = getattr(value, k)
-            
-            return value
-        except (AttributeError, KeyError):
+            return compile_path(key).read(self.config)
+        except KeyError:
             return default
     
     def set(self, key: str, value: Any) -> None:
-        """Set a configuration value by dot-notation key"""
-        try:
-            keys = key.split('.')
-            obj = self.config
-            
-            # Navigate to the parent object
-            for k in keys[:-1]:
-                obj = getattr(obj, k)
-            
-            # Set the value
-            setattr(obj, keys[-1], value)
-            
-        except (AttributeError, KeyError) as e:
-            logger.error(f"❌ Failed to set config value {key}: {e}")
+        """Set a configuration value by dot-notation key
+        
+        Raises KeyError for a key outside the schema and ValueError for a
+        value of the wrong type. Subscribers of the key are notified.
+        """
+        accessor = compile_path(key)
+        old, new = accessor.set(self.config, value)
+        if old != new:
+            self.notify((ConfigChange(accessor.section, accessor.key, old, new),))
+    
+    def subscribe(self, key: str, callback: Callable[[ConfigChange], None]) -> None:
+        """Call callback with every change of a setting, on the thread making the change"""
+        compile_path(key)
+        self._subscriptions.setdefault(key, []).append(callback)
+    
+    def unsubscribe(self, key: str, callback: Callable[[ConfigChange], None]) -> None:
+        callbacks = self._subscriptions.get(key, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+    
+    def notify(self, changes) -> None:
+        """Deliver changes made by set(), a reset or a reload to their subscribers"""
+        for change in changes:
+            for callback in list(self._subscriptions.get(change.path, ())):
+                try:
+                    callback(change)
+                except Exception as e:
+                    logger.error(f"❌ Subscriber of {change.path} failed: {e}")
     
     def reset_to_defaults(self) -> None:
         """Reset configuration to default values"""
-        self.config = AppConfig()
+        old, self.config = self.config, AppConfig()
+        self.notify(diff_config(old, self.config))
         logger.info("🔄 Configuration reset to defaults")
     
     @property
@@ -157,6 +390,11 @@ class Config:
         """Get the database file path"""
         return self.config_dir / "stream_artifact.db"
     
+    @property
+    def database_backup_dir(self) -> Path:
+        """Get the database snapshot directory path"""
+        return self.config_dir / "backups" / "database"
+    
     @property
     def logs_dir(self) -> Path:
         """Get the logs directory path"""
@@ -0,0 +1,228 @@
+"""
+Configuration Watcher for Stream Artifact
+Hot-reloads config.json and publishes typed change events to subscribers
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import inspect
+import json
+import os
+import struct
+import sys
+import time
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+from .config import ConfigChange, diff_config
+
+logger = logging.getLogger(__name__)
+
+# inotify flags (linux/inotify.h)
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+@dataclass(frozen=True)
+class ConfigChangeEvent:
+    """Every setting changed by one reload"""
+    changes: Tuple[ConfigChange, ...]
+
+    @property
+    def sections(self) -> set:
+        return {change.section for change in self.changes}
+
+    @property
+    def paths(self) -> set:
+        return {change.path for change in self.changes}
+
+    def get(self, path: str) -> Optional[ConfigChange]:
+        """The change of one dot-path setting, if it changed"""
+        return next((change for change in self.changes if change.path == path), None)
+
+
+class _Inotify:
+    """Minimal inotify binding over libc (Linux only)"""
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+        if libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    def read_names(self) -> List[str]:
+        """File names of the pending events"""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names, offset = [], 0
+        while offset < len(data):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            start = offset + INOTIFY_EVENT.size
+            names.append(data[start:start + length].rstrip(b"\0").decode(errors="replace"))
+            offset = start + length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ConfigWatcher:
+    """Reloads config.json when it changes on disk
+
+    On Linux the config directory is watched with inotify on the event loop;
+    elsewhere the file's mtime and size are polled every poll_interval
+    seconds. A change is parsed and validated against the config dataclasses
+    (an invalid file is logged and ignored), diffed against the running
+    configuration and, if anything differs, applied and published as one
+    ConfigChangeEvent to the subscribers of the affected sections. Files the
+    app wrote itself are recognized by their digest and not reloaded, so
+    set() calls made after the last save are never reverted.
+    """
+
+    def __init__(self, config, poll_interval: float = 1.0, settle: float = 0.05):
+        self.config = config
+        self.poll_interval = poll_interval
+        self.settle = settle
+        self.backend: Optional[str] = None
+        self.reloads = 0
+
+        self._subscribers: List[Tuple[Callable, Optional[Tuple[str, ...]]]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inotify: Optional[_Inotify] = None
+        self._poll_task: Optional[asyncio.Task] = None
+        self._pending: Optional[asyncio.TimerHandle] = None
+        self._signature = self._file_signature()
+
+    def subscribe(self, callback: Callable[[ConfigChangeEvent], Any], sections=None) -> None:
+        """Call callback (plain or async) with every event touching one of the sections (all if None)"""
+        if isinstance(sections, str):
+            sections = (sections,)
+        self._subscribers.append((callback, tuple(sections) if sections else None))
+
+    def unsubscribe(self, callback: Callable) -> None:
+        self._subscribers = [(subscriber, sections) for subscriber, sections in self._subscribers
+                             if subscriber != callback]
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None, use_inotify: bool = True) -> None:
+        """Start watching on the event loop"""
+        self._loop = loop or asyncio.get_running_loop()
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(self.config.config_file.parent)
+                self._loop.add_reader(self._inotify.fd, self._on_inotify)
+                self.backend = "inotify"
+            except (OSError, AttributeError, NotImplementedError) as e:
+                logger.debug(f"inotify unavailable, polling instead: {e}")
+                self._inotify = None
+
+        if self._inotify is None:
+            self._poll_task = self._loop.create_task(self._poll())
+            self.backend = "polling"
+
+        logger.info(f"👀 Watching {self.config.config_file.name} for changes ({self.backend})")
+
+    def stop(self) -> None:
+        if self._inotify is not None:
+            self._loop.remove_reader(self._inotify.fd)
+            self._inotify.close()
+            self._inotify = None
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.config.config_file.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def _on_inotify(self) -> None:
+        if self.config.config_file.name in self._inotify.read_names():
+            self._file_changed(time.perf_counter())
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            self._file_changed(time.perf_counter())
+
+    def _file_changed(self, detected: float) -> None:
+        """Schedule a reload once writes to the file have settled"""
+        signature = self._file_signature()
+        if signature is None or signature == self._signature:
+            return
+        if self._pending is not None:
+            self._pending.cancel()
+        self._pending = self._loop.call_later(self.settle, self._start_reload, detected)
+
+    def _start_reload(self, detected: float) -> None:
+        self._pending = None
+        self._loop.create_task(self.reload(detected))
+
+    async def reload(self, detected: Optional[float] = None) -> Optional[ConfigChangeEvent]:
+        """Load, validate and apply the file; publish and return the event if anything changed"""
+        start = detected if detected is not None else time.perf_counter()
+        self._signature = self._file_signature()
+        try:
+            with open(self.config.config_file, 'rb') as f:
+                raw = f.read()
+        except OSError as e:
+            logger.error(f"❌ Could not read configuration: {e}")
+            return None
+
+        # The app's own save (or the content loaded at startup)
+        if self.config.writer.is_current(raw):
+            return None
+
+        try:
+            new_config = self.config.parse(json.loads(raw))
+        except Exception as e:
+            logger.error(f"❌ Ignoring invalid configuration change: {e}")
+            return None
+        self.config.writer.adopt(raw)
+
+        changes = diff_config(self.config.config, new_config)
+        if not changes:
+            return None
+
+        self.config.config = new_config
+        self.config.notify(changes)
+        event = ConfigChangeEvent(changes)
+        reconfigured = await self.publish(event)
+        self.reloads += 1
+
+        logger.info(f"🔄 Configuration reloaded in {(time.perf_counter() - start) * 1000:.1f} ms: "
+                    f"{', '.join(sorted(event.paths))} changed, {reconfigured} components reconfigured")
+        return event
+
+    async def publish(self, event: ConfigChangeEvent) -> int:
+        """Deliver an event to the interested subscribers; returns how many were called"""
+        called = 0
+        for callback, sections in list(self._subscribers):
+            if sections is not None and not event.sections.intersection(sections):
+                continue
+            try:
+                result = callback(event)
+                if inspect.isawaitable(result):
+                    await result
+                called += 1
+            except Exception as e:
+                logger.error(f"❌ Configuration subscriber {getattr(callback, '__qualname__', callback)} failed: {e}")
+        return called
@@ -0,0 +1,167 @@
+"""
+Configuration Writer for Stream Artifact
+Atomic, coalesced and off-thread persistence of config.json
+"""
+
+import atexit
+import hashlib
+import os
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Replace path with data so readers see either the old or the new file, never a mix"""
+    path = Path(path)
+    partial = path.with_name(path.name + ".partial")
+    with open(partial, 'wb') as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(partial, path)
+
+    # Make the rename itself durable
+    if hasattr(os, 'O_DIRECTORY'):
+        directory = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+
+class ConfigWriter:
+    """Writes serialized configuration on a background thread
+
+    submit() only records the newest content and returns; the writer thread
+    writes it once submissions have been quiet for debounce seconds (or
+    max_delay after the first one), so a burst of saves becomes one write.
+    Content whose SHA-256 matches what is already on disk is not written.
+    on_written is called on the writer thread after every actual write.
+    Pending content is flushed at interpreter exit.
+    """
+
+    def __init__(self, path: Path, on_written: Optional[Callable[[], None]] = None,
+                 debounce: float = 0.2, max_delay: float = 2.0):
+        self.path = Path(path)
+        self.on_written = on_written
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.writes = 0
+        self.skipped = 0
+
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._pending: Optional[bytes] = None
+        self._pending_since = 0.0
+        self._due = 0.0
+        self._submitted = 0
+        self._written = 0
+        self._thread: Optional[threading.Thread] = None
+        self._signature = self._file_signature()
+        self._digest = self._file_digest()
+
+        atexit.register(self.flush)
+
+    def _file_signature(self) -> Optional[tuple]:
+        try:
+            stat = self.path.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def _file_digest(self) -> Optional[str]:
+        try:
+            return hashlib.sha256(self.path.read_bytes()).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    def submit(self, data: bytes) -> None:
+        """Queue data to be written (safe from any thread)"""
+        with self._condition:
+            now = time.monotonic()
+            if self._pending is None:
+                self._pending_since = now
+            self._pending = data
+            self._submitted += 1
+            # Quiet period, but never postpone past max_delay after the first save
+            self._due = min(now + self.debounce, self._pending_since + self.max_delay)
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="config-writer", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _take(self):
+        """Pending (sequence, data) and clear it; called with the condition held"""
+        taken = (self._submitted, self._pending)
+        self._pending = None
+        return taken
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                delay = self._due - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                sequence, data = self._take()
+            self._write(sequence, data)
+
+    def _write(self, sequence: int, data: bytes) -> bool:
+        """Write data unless newer content was written already or it is unchanged"""
+        with self._write_lock:
+            if sequence <= self._written:
+                return False
+            self._written = sequence
+
+            digest = hashlib.sha256(data).hexdigest()
+            # Trust the remembered digest only while nobody else touched the file
+            if digest == self._digest and self._file_signature() == self._signature:
+                self.skipped += 1
+                return False
+
+            try:
+                atomic_write(self.path, data)
+            except Exception as e:
+                logger.error(f"❌ Failed to save configuration: {e}")
+                return False
+
+            self._digest = digest
+            self._signature = self._file_signature()
+            self.writes += 1
+
+        logger.info("💾 Configuration saved successfully")
+        if self.on_written:
+            self.on_written()
+        return True
+
+    def is_current(self, data: bytes) -> bool:
+        """Whether data is the content this writer last wrote (or adopted), waiting out a write in progress"""
+        with self._write_lock:
+            return hashlib.sha256(data).hexdigest() == self._digest
+
+    def adopt(self, data: bytes) -> None:
+        """Record data, just read from the file, as its current content (after a reload)"""
+        with self._write_lock:
+            self._digest = hashlib.sha256(data).hexdigest()
+            self._signature = self._file_signature()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write pending content now on the calling thread; False if a write did not finish in time"""
+        with self._condition:
+            sequence, data = self._take()
+        if data is not None:
+            self._write(sequence, data)
+
+        # Wait for a write the background thread may have in progress
+        if not self._write_lock.acquire(timeout=-1 if timeout is None else timeout):
+            return False
+        self._write_lock.release()
+        return True
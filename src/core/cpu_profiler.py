@@ -0,0 +1,201 @@
+"""
+CPU Profiler for Stream Artifact
+On-demand sampling of the event loop and Tk threads, with asyncio callback timings
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(code) -> str:
+    """A flamegraph frame name: no semicolons, stable across samples"""
+    name = getattr(code, 'co_qualname', code.co_name)
+    return f"{name} ({Path(code.co_filename).name}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _describe_callback(handle) -> str:
+    """What an event loop callback runs: the task's coroutine, or the callback itself"""
+    callback = handle._callback
+    owner = getattr(callback, '__self__', None)
+    if isinstance(owner, asyncio.Future) and hasattr(owner, 'get_coro'):
+        coro = owner.get_coro()
+        return f"task {getattr(coro, '__qualname__', type(coro).__name__)}"
+    return getattr(callback, '__qualname__', None) or repr(callback)
+
+
+class CallbackTimer:
+    """Times every asyncio callback while installed
+
+    Wraps asyncio.Handle._run, which every event loop calls for each ready
+    callback and task step, so the time a handler kept the loop busy is
+    recorded per coroutine or callback.
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, List[float]] = {}
+        self._original = None
+
+    def install(self) -> None:
+        if self._original is not None:
+            return
+        original = self._original = asyncio.events.Handle._run
+        stats = self.stats
+
+        def timed_run(handle):
+            start = time.perf_counter()
+            try:
+                return original(handle)
+            finally:
+                elapsed = time.perf_counter() - start
+                name = _describe_callback(handle)
+                entry = stats.get(name)
+                if entry is None:
+                    stats[name] = [1, elapsed, elapsed]
+                else:
+                    entry[0] += 1
+                    entry[1] += elapsed
+                    if elapsed > entry[2]:
+                        entry[2] = elapsed
+
+        asyncio.events.Handle._run = timed_run
+
+    def uninstall(self) -> None:
+        if self._original is not None:
+            asyncio.events.Handle._run = self._original
+            self._original = None
+
+    def summary(self, limit: int = 15) -> Dict[str, List[Dict]]:
+        """Callbacks with the most total time and with the longest single run"""
+        rows = [{'callback': name, 'calls': int(calls), 'total_ms': round(total * 1000, 3),
+                 'max_ms': round(longest * 1000, 3)}
+                for name, (calls, total, longest) in list(self.stats.items())]
+        return {
+            'slowest_callbacks': sorted(rows, key=lambda row: row['total_ms'], reverse=True)[:limit],
+            'longest_blocking': sorted(rows, key=lambda row: row['max_ms'], reverse=True)[:limit],
+        }
+
+
+@dataclass
+class ProfileReport:
+    """Files and headline numbers of one profiling window"""
+    collapsed_path: Path
+    summary_path: Path
+    seconds: float
+    samples: int
+    hot_functions: List[Tuple[str, int]] = field(default_factory=list)
+    task_summary: Dict[str, List[Dict]] = field(default_factory=dict)
+
+
+class SamplingProfiler:
+    """Samples the stacks of chosen threads for a fixed window
+
+    A background thread reads sys._current_frames() every interval seconds
+    and counts each thread's stack, so the profiled threads run unmodified.
+    The result is written as collapsed stacks (one 'thread;frame;frame
+    count' line per stack, readable by flamegraph.pl and speedscope) and a
+    JSON summary of the hottest functions and asyncio callbacks.
+    """
+
+    def __init__(self, threads: Dict[str, int], output_dir: Path, interval: float = 0.01):
+        self.threads = dict(threads)
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self.last_report: Optional[ProfileReport] = None
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, on_done: Optional[Callable[[ProfileReport], None]] = None) -> bool:
+        """Profile for seconds in the background; False if a window is already running"""
+        if self.running:
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(seconds, on_done), name="cpu-profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"🔥 Profiling {', '.join(self.threads)} for {seconds:.0f}s")
+        return True
+
+    def stop(self) -> None:
+        """End the current window early (the report is still written)"""
+        self._stop.set()
+
+    def _run(self, seconds: float, on_done) -> None:
+        stacks: Counter = Counter()
+        names = {ident: name for name, ident in self.threads.items()}
+        labels_by_code: Dict[object, str] = {}
+        timer = CallbackTimer()
+        timer.install()
+        samples = 0
+        start = time.perf_counter()
+        deadline = start + seconds
+        try:
+            while not self._stop.is_set() and time.perf_counter() < deadline:
+                frames = sys._current_frames()
+                for ident, name in names.items():
+                    frame = frames.get(ident)
+                    if frame is None:
+                        continue
+                    labels = []
+                    while frame is not None:
+                        code = frame.f_code
+                        label = labels_by_code.get(code)
+                        if label is None:
+                            label = labels_by_code[code] = _frame_label(code)
+                        labels.append(label)
+                        frame = frame.f_back
+                    labels.append(name)
+                    stacks[";".join(reversed(labels))] += 1
+                samples += 1
+                self._stop.wait(self.interval)
+        finally:
+            timer.uninstall()
+
+        report = self._write_report(stacks, timer.summary(), time.perf_counter() - start, samples)
+        self.last_report = report
+        logger.info(f"🔥 Profile written to {report.collapsed_path} ({samples} samples)")
+        if on_done:
+            on_done(report)
+
+    def _write_report(self, stacks: Counter, task_summary: Dict, seconds: float, samples: int) -> ProfileReport:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        collapsed_path = self.output_dir / f"{stem}.collapsed"
+        summary_path = self.output_dir / f"{stem}.json"
+
+        with open(collapsed_path, 'w', encoding='utf-8') as handle:
+            for stack, count in stacks.most_common():
+                handle.write(f"{stack} {count}\n")
+
+        # Self time: the innermost frame of each sample
+        leaves: Counter = Counter()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        hot_functions = leaves.most_common(20)
+
+        summary = {
+            'seconds': round(seconds, 3),
+            'interval': self.interval,
+            'samples': samples,
+            'threads': list(self.threads),
+            'hot_functions': [{'function': name, 'samples': count} for name, count in hot_functions],
+            **task_summary,
+        }
+        with open(summary_path, 'w', encoding='utf-8') as handle:
+            json.dump(summary, handle, indent=2)
+
+        return ProfileReport(collapsed_path, summary_path, seconds, samples, hot_functions, task_summary)
@@ -7,18 +7,87 @@ import aiosqlite
 import sqlite3
 import asyncio
 import json
+import re
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import logging
 
+from .metrics import metrics
+from .badges import MODERATOR, SUBSCRIBER, VIP, mask_to_badges, split_message_metadata
+from .migrations import MigrationRunner, SEARCH_HISTORY_VERSION, SEARCH_INDEXES
+from .partitions import LEGACY_PARTITION, PartitionStore, partition_key, partition_schema
+
 logger = logging.getLogger(__name__)
 
+SEARCH_ORDERS = ('rank', 'recent')
+
+# Placeholder for the current partition's messages table in queued writes;
+# resolved when the batch is written, so month rollover needs no requeueing
+CURRENT_MESSAGES = "{current_messages}"
+
+WRITE_SECONDS = metrics.histogram('stream_artifact_db_write_batch_seconds',
+                                  'Time to write and commit one batch of queued writes')
+WRITE_BATCH_SIZE = metrics.histogram('stream_artifact_db_write_batch_size', 'Statements per committed batch',
+                                     buckets=(1, 5, 10, 25, 50, 100, 200, 500, 1000))
+WRITES = metrics.counter('stream_artifact_db_writes_total', 'Queued write statements committed')
+WRITE_FAILURES = metrics.counter('stream_artifact_db_write_failures_total', 'Write batches that failed')
+WRITE_QUEUE_DEPTH = metrics.gauge('stream_artifact_db_write_queue_depth', 'Queued writes not yet committed')
+
+
+def _utcnow() -> datetime:
+    """Current UTC time (SQLite's CURRENT_TIMESTAMP is UTC as well)"""
+    return datetime.utcnow()
+
+
+def _fts_query(query: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix"""
+    words = re.findall(r"\w+", query)
+    if not words:
+        return ""
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+
+def _time_bound(value) -> Optional[str]:
+    """Format a datetime bound like SQLite's CURRENT_TIMESTAMP"""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value
+
+
+def _message_values(metadata: Optional[Dict]) -> Tuple[Optional[str], int, Optional[str]]:
+    """Typed column values for message metadata: (display_name, badge mask, extras JSON)"""
+    if not metadata:
+        return None, 0, None
+    display_name, mask, extras = split_message_metadata(metadata)
+    return display_name, mask, json.dumps(extras) if extras else None
+
+
+def _message_metadata(display_name: Optional[str], mask: int, extras: Optional[str]) -> Dict:
+    """Rebuild the metadata dict a message was stored with"""
+    metadata = {
+        'display_name': display_name,
+        'is_subscriber': bool(mask & SUBSCRIBER),
+        'is_vip': bool(mask & VIP),
+        'is_mod': bool(mask & MODERATOR),
+        'badges': mask_to_badges(mask),
+    }
+    
+    if extras and extras != '{}':
+        extras = json.loads(extras)
+        # Badges without a bit, or the full list on rows not yet backfilled
+        metadata['badges'] += [badge for badge in extras.pop('badges', []) if badge not in metadata['badges']]
+        metadata.update(extras)
+    
+    return metadata
+
 
 class Database:
     """Database manager for Stream Artifact"""
     
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(self, db_path: Optional[Path] = None, defer_init: bool = False):
         if db_path is None:
             # Default path in user's home directory
             config_dir = Path.home() / ".stream_artifact"
@@ -28,129 +97,326 @@ class Database:
         self.db_path = db_path
         self.connection: Optional[aiosqlite.Connection] = None
         
+        # Monthly message partitions in a directory next to the main file
+        self.partitions = PartitionStore.for_database(db_path)
+        self.current_partition: Optional[str] = None
+        self._attached: Dict[str, Path] = {}
+        self._partition_lock = asyncio.Lock()
+        
+        # Schema creation state (may run on a background thread)
+        self._ready = threading.Event()
+        self._init_error: Optional[Exception] = None
+        self._init_thread: Optional[threading.Thread] = None
+        
+        # Batched write path (created lazily on the event loop)
+        self._connect_lock = asyncio.Lock()
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self.write_batch_size = 200
+        WRITE_QUEUE_DEPTH.set_function(lambda: self.pending_writes)
+        
+        # Set once the FTS5 indexes cover the history; searches fall back to LIKE until then
+        self.fts_enabled = False
+        self.schema_version = 0
+        self.search_rank_window = 10000
+        
         # Initialize database
-        self._init_database()
+        if defer_init:
+            self.start_background_init()
+        else:
+            self._init_database()
+            self._ready.set()
+    
+    def start_background_init(self):
+        """Run schema initialization on a background thread"""
+        if self._ready.is_set() or self._init_thread is not None:
+            return
+        
+        def run_init():
+            try:
+                self._init_database(defer_online=True)
+            except Exception as e:
+                self._init_error = e
+                return
+            finally:
+                self._ready.set()
+            
+            # Online migrations (e.g. index builds) finish while the bot runs
+            try:
+                self._init_database()
+            except Exception as e:
+                logger.error(f"❌ Background migrations failed: {e}")
+        
+        self._init_thread = threading.Thread(target=run_init, name="db-init", daemon=True)
+        self._init_thread.start()
+    
+    async def wait_ready(self):
+        """Wait until schema initialization has finished"""
+        if not self._ready.is_set():
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._ready.wait)
+        
+        if self._init_error:
+            raise self._init_error
     
-    def _init_database(self):
-        """Initialize the database with required tables"""
+    def _init_database(self, defer_online: bool = False):
+        """Bring the schema up to date by applying pending migrations"""
         try:
-            # Use synchronous connection for initialization
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
-            # Users table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    display_name TEXT,
-                    user_id TEXT UNIQUE,
-                    first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    message_count INTEGER DEFAULT 0,
-                    is_subscriber BOOLEAN DEFAULT FALSE,
-                    is_vip BOOLEAN DEFAULT FALSE,
-                    is_moderator BOOLEAN DEFAULT FALSE,
-                    is_regular BOOLEAN DEFAULT FALSE,
-                    points INTEGER DEFAULT 0,
-                    metadata TEXT DEFAULT '{}'
-                )
-            """)
-            
-            # Messages table for chat history
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    channel TEXT NOT NULL,
-                    message_type TEXT DEFAULT 'chat',
-                    metadata TEXT DEFAULT '{}'
-                )
-            """)
-            
-            # AI Memory table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS ai_memory (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT NOT NULL,
-                    context TEXT NOT NULL,
-                    response TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    relevance_score REAL DEFAULT 1.0,
-                    memory_type TEXT DEFAULT 'conversation',
-                    metadata TEXT DEFAULT '{}'
-                )
-            """)
-            
-            # Commands table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS commands (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    command TEXT UNIQUE NOT NULL,
-                    response TEXT NOT NULL,
-                    usage_count INTEGER DEFAULT 0,
-                    is_enabled BOOLEAN DEFAULT TRUE,
-                    permission_level TEXT DEFAULT 'everyone',
-                    cooldown INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Stream events table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS stream_events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    event_type TEXT NOT NULL,
-                    username TEXT,
-                    data TEXT DEFAULT '{}',
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    processed BOOLEAN DEFAULT FALSE
-                )
-            """)
-            
-            # Topics table for conversation tracking
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS topics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    topic TEXT NOT NULL,
-                    frequency INTEGER DEFAULT 1,
-                    last_mentioned TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    related_users TEXT DEFAULT '[]',
-                    sentiment REAL DEFAULT 0.0
-                )
-            """)
-            
-            # Create indexes for performance
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages(timestamp)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_messages_username ON messages(username)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_ai_memory_username ON ai_memory(username)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_ai_memory_timestamp ON ai_memory(timestamp)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_stream_events_timestamp ON stream_events(timestamp)")
-            
-            conn.commit()
-            conn.close()
-            
-            logger.info("🗄️ Database initialized successfully")
+            # Use synchronous connection for initialization; a long timeout
+            # lets online migrations wait out the bot's write batches
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            
+            try:
+                # WAL lets the UI read while the bot writes
+                conn.execute("PRAGMA journal_mode=WAL")
+                
+                runner = MigrationRunner(conn)
+                runner.migrate(defer_online=defer_online)
+                self.schema_version = runner.current_version
+                
+                tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+                self.fts_enabled = (all(index in tables for index in SEARCH_INDEXES)
+                                    and SEARCH_HISTORY_VERSION in runner.applied_versions())
+            finally:
+                conn.close()
+            
+            logger.info(f"🗄️ Database initialized successfully (schema version {self.schema_version})")
             
         except Exception as e:
             logger.error(f"❌ Database initialization failed: {e}")
             raise
     
+    async def rebuild_search_index(self) -> None:
+        """Rebuild and optimize the full-text indexes from their content tables"""
+        await self.connect()
+        
+        if not self.fts_enabled:
+            logger.warning("⚠️ Full-text search unavailable, nothing to rebuild")
+            return
+        
+        await self._rotate_partitions()
+        targets = [('main', index) for index in SEARCH_INDEXES]
+        targets += [(partition_schema(key), 'messages_fts') for key in self._attached]
+        
+        for schema, index in targets:
+            start = time.perf_counter()
+            await self.connection.execute(f"INSERT INTO {schema}.{index}({index}) VALUES ('rebuild')")
+            await self.connection.execute(f"INSERT INTO {schema}.{index}({index}) VALUES ('optimize')")
+            await self.connection.commit()
+            logger.info(f"🔎 Rebuilt search index {schema}.{index} in {time.perf_counter() - start:.2f}s")
+    
     async def connect(self):
         """Connect to the database (async)"""
         if self.connection is None:
-            self.connection = await aiosqlite.connect(str(self.db_path))
-            self.connection.row_factory = aiosqlite.Row
+            async with self._connect_lock:
+                if self.connection is None:
+                    await self.wait_ready()
+                    connection = await aiosqlite.connect(str(self.db_path), timeout=30)
+                    connection.row_factory = aiosqlite.Row
+                    self.connection = connection
     
     async def disconnect(self):
         """Disconnect from the database"""
         if self.connection:
             await self.connection.close()
             self.connection = None
+        
+        self._attached.clear()
+        self.current_partition = None
+    
+    async def _rotate_partitions(self) -> str:
+        """Make sure this month's partition is attached; returns its schema name"""
+        key = partition_key(_utcnow())
+        if key != self.current_partition:
+            async with self._partition_lock:
+                if key != self.current_partition:
+                    await self._open_partitions(key)
+        return partition_schema(key)
+    
+    async def _open_partitions(self, key: str) -> None:
+        """Attach the live partitions, creating key's and archiving those past the live window"""
+        await self.connect()
+        store = self.partitions
+        
+        # Every live month is attached before creating a new one so its ids
+        # continue after theirs; months past the live window are archived below
+        for live_key in store.live_keys():
+            if live_key != key:
+                await self._attach(live_key, store.path(live_key))
+        
+        if not store.path(key).exists():
+            last_id = await self._last_message_id()
+            await asyncio.to_thread(store.create, key, last_id)
+        await self._attach(key, store.path(key))
+        self.current_partition = key
+        
+        for old_key in store.live_keys()[store.live_partitions:]:
+            if old_key == key:
+                continue
+            try:
+                await self._detach(old_key)
+                await asyncio.to_thread(store.archive, old_key)
+            except Exception as e:
+                logger.error(f"❌ Failed to archive message partition {old_key}: {e}")
+    
+    async def _attach(self, key: str, path: Path) -> str:
+        """Attach a partition file under its schema name"""
+        schema = partition_schema(key)
+        if key not in self._attached:
+            await self.connection.execute(f"ATTACH DATABASE ? AS {schema}", (str(path),))
+            self._attached[key] = path
+        return schema
+    
+    async def _detach(self, key: str) -> None:
+        """Detach a partition if attached"""
+        if self._attached.pop(key, None) is not None:
+            await self.connection.execute(f"DETACH DATABASE {partition_schema(key)}")
+    
+    async def _last_message_id(self) -> int:
+        """Highest message id in the main table and every attached partition"""
+        last_id = 0
+        for schema in ['main'] + [partition_schema(key) for key in self._attached]:
+            cursor = await self.connection.execute(f"SELECT MAX(id) FROM {schema}.messages")
+            last_id = max(last_id, (await cursor.fetchone())[0] or 0)
+        return last_id
+    
+    def _live_schemas(self) -> List[str]:
+        """Schemas of the attached live partitions, newest first, then the legacy table"""
+        live = [key for key in sorted(self._attached, reverse=True) if self._attached[key].parent == self.partitions.directory]
+        return [partition_schema(key) for key in live] + [partition_schema(LEGACY_PARTITION)]
+    
+    async def close(self) -> None:
+        """Checkpoint the WAL and disconnect"""
+        if self._writer_task:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+        
+        if self.connection:
+            try:
+                # Refresh planner statistics for indexes that need it (cheap)
+                await self.connection.execute("PRAGMA optimize")
+                await self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except Exception as e:
+                logger.warning(f"⚠️ WAL checkpoint failed: {e}")
+        
+        await self.disconnect()
+        self.partitions.clear_restored()
+        logger.info("🗄️ Database closed")
+    
+    def _queue_write(self, sql: str, params: Tuple) -> None:
+        """Queue a write statement for the batched writer (event loop only)"""
+        if self._write_queue is None:
+            self._write_queue = asyncio.Queue()
+        
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.get_running_loop().create_task(self._write_loop())
+        
+        self._write_queue.put_nowait((sql, params))
+    
+    def queue_callback(self, callback: Callable[[Optional[str]], None]) -> None:
+        """Call callback once every write queued before it has been committed
+        
+        It receives None, or the error if that batch failed.
+        """
+        self._queue_write(None, callback)
+    
+    async def _write_loop(self):
+        """Write queued statements in batches with a single commit each"""
+        while True:
+            batch = [await self._write_queue.get()]
+            while len(batch) < self.write_batch_size and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+            
+            statements = [item for item in batch if item[0] is not None]
+            error = None
+            start = time.perf_counter()
+            try:
+                if statements:
+                    await self._write_batch(statements)
+                    WRITE_SECONDS.observe(time.perf_counter() - start)
+                    WRITE_BATCH_SIZE.observe(len(statements))
+                    WRITES.inc(len(statements))
+            except Exception as e:
+                error = str(e)
+                WRITE_FAILURES.inc()
+                logger.error(f"❌ Failed to write batch of {len(statements)} statements: {e}")
+            finally:
+                for sql, callback in batch:
+                    if sql is None:
+                        try:
+                            callback(error)
+                        except Exception as e:
+                            logger.error(f"❌ Write callback failed: {e}")
+                for _ in batch:
+                    self._write_queue.task_done()
+    
+    async def _write_batch(self, batch: List[Tuple[str, Tuple]]) -> None:
+        """Execute a batch, grouping consecutive identical statements"""
+        await self.connect()
+        messages_table = f"{await self._rotate_partitions()}.messages"
+        
+        group_sql, group_params = None, []
+        for sql, params in batch:
+            sql = sql.replace(CURRENT_MESSAGES, messages_table)
+            if sql != group_sql and group_params:
+                await self.connection.executemany(group_sql, group_params)
+                group_params = []
+            group_sql = sql
+            group_params.append(params)
+        
+        if group_params:
+            await self.connection.executemany(group_sql, group_params)
+        
+        await self.connection.commit()
+    
+    @property
+    def pending_writes(self) -> int:
+        """Number of queued writes not yet committed"""
+        return self._write_queue.qsize() if self._write_queue else 0
+    
+    async def flush(self, timeout: Optional[float] = None) -> int:
+        """Wait for queued writes to commit; returns the number dropped on timeout"""
+        if self._write_queue is None:
+            return 0
+        
+        try:
+            await asyncio.wait_for(self._write_queue.join(), timeout)
+            return 0
+        except asyncio.TimeoutError:
+            dropped = 0
+            while not self._write_queue.empty():
+                self._write_queue.get_nowait()
+                self._write_queue.task_done()
+                dropped += 1
+            
+            logger.warning(f"⚠️ Dropped {dropped} queued database writes")
+            return dropped
+    
+    def queue_user(self, username: str, display_name: str = None, user_id: str = None,
+                   is_subscriber: bool = False, is_vip: bool = False, is_moderator: bool = False) -> None:
+        """Queue an add/update of a user for the batched writer"""
+        self._queue_write("""
+            INSERT OR REPLACE INTO users 
+            (username, display_name, user_id, last_seen, is_subscriber, is_vip, is_moderator)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?, ?, ?)
+        """, (username, display_name or username, user_id, is_subscriber, is_vip, is_moderator))
+    
+    def queue_message(self, username: str, content: str, channel: str,
+                      message_type: str = 'chat', metadata: Dict = None) -> None:
+        """Queue a message for the batched writer"""
+        self._queue_write(f"""
+            INSERT INTO {CURRENT_MESSAGES} (username, content, channel, message_type, display_name, badges, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (username, content, channel, message_type, *_message_values(metadata)))
+        
+        self._queue_write("""
+            UPDATE users SET message_count = message_count + 1, last_seen = CURRENT_TIMESTAMP
+            WHERE username = ?
+        """, (username,))
     
     async def add_user(self, username: str, display_name: str = None, user_id: str = None,
                       is_subscriber: bool = False, is_vip: bool = False, is_moderator: bool = False) -> None:
@@ -175,12 +441,11 @@ class Database:
         await self.connect()
         
         try:
-            metadata_json = json.dumps(metadata or {})
-            
-            await self.connection.execute("""
-                INSERT INTO messages (username, content, channel, message_type, metadata)
-                VALUES (?, ?, ?, ?, ?)
-            """, (username, content, channel, message_type, metadata_json))
+            schema = await self._rotate_partitions()
+            await self.connection.execute(f"""
+                INSERT INTO {schema}.messages (username, content, channel, message_type, display_name, badges, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (username, content, channel, message_type, *_message_values(metadata)))
             
             # Update user message count
             await self.connection.execute("""
@@ -212,30 +477,48 @@ class Database:
         except Exception as e:
             logger.error(f"❌ Failed to add AI memory for {username}: {e}")
     
-    async def get_recent_messages(self, channel: str, limit: int = 50) -> List[Dict]:
-        """Get recent messages from a channel"""
+    async def get_recent_messages(self, channel: str, limit: int = 50,
+                                  include_metadata: bool = False) -> List[Dict]:
+        """Get recent messages from a channel
+        
+        Display name and the badge bitmask (see badges.py) come from typed
+        columns; the full metadata dict, which may need JSON parsing, is only
+        built when requested.
+        """
         await self.connect()
         
         try:
-            cursor = await self.connection.execute("""
-                SELECT username, content, timestamp, message_type, metadata
-                FROM messages
-                WHERE channel = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            """, (channel, limit))
-            
-            rows = await cursor.fetchall()
+            await self._rotate_partitions()
+            
+            # Usually the current partition alone has enough rows
+            rows = []
+            for schema in self._live_schemas():
+                cursor = await self.connection.execute(f"""
+                    SELECT username, content, timestamp, message_type, display_name, badges
+                           {", metadata" if include_metadata else ""}
+                    FROM {schema}.messages
+                    WHERE channel = ?
+                    ORDER BY timestamp DESC
+                    LIMIT ?
+                """, (channel, limit - len(rows)))
+                
+                rows += await cursor.fetchall()
+                if len(rows) >= limit:
+                    break
             
             messages = []
             for row in rows:
-                messages.append({
+                message = {
                     'username': row['username'],
                     'content': row['content'],
                     'timestamp': row['timestamp'],
                     'message_type': row['message_type'],
-                    'metadata': json.loads(row['metadata'] or '{}')
-                })
+                    'display_name': row['display_name'] or row['username'],
+                    'badges': row['badges']
+                }
+                if include_metadata:
+                    message['metadata'] = _message_metadata(row['display_name'], row['badges'], row['metadata'])
+                messages.append(message)
             
             return messages
             
@@ -243,13 +526,174 @@ class Database:
             logger.error(f"❌ Failed to get recent messages: {e}")
             return []
     
-    async def get_user_memory(self, username: str, limit: int = 10) -> List[Dict]:
-        """Get AI memory for a specific user"""
+    async def _search(self, index: str, select: str, query: str, filters: Dict[str, Any],
+                      since, until, limit: int, offset: int, order: str, schema: str = "main") -> List[Any]:
+        """Full-text search over one content table with filters, time bounds and paging"""
+        table, columns = SEARCH_INDEXES[index]
+        conditions = []
+        params: List[Any] = []
+        
+        for column, value in filters.items():
+            if value:
+                conditions.append(f"t.{column} = ?")
+                params.append(value)
+        if since:
+            conditions.append("t.timestamp >= ?")
+            params.append(_time_bound(since))
+        if until:
+            conditions.append("t.timestamp < ?")
+            params.append(_time_bound(until))
+        
+        match = _fts_query(query)
+        if match and self.fts_enabled:
+            source = f"{schema}.{index} f JOIN {schema}.{table} t ON t.id = f.rowid"
+            conditions.insert(0, f"f.{index} MATCH ?")
+            params.insert(0, match)
+            if order == 'rank':
+                # Very common terms match a large part of history; rank only
+                # the newest search_rank_window matches instead of all of them
+                cursor = await self.connection.execute(
+                    f"SELECT rowid FROM {schema}.{index} f WHERE f.{index} MATCH ? "
+                    f"ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+                    (match, self.search_rank_window - 1)
+                )
+                cutoff = await cursor.fetchone()
+                if cutoff:
+                    conditions.insert(1, "f.rowid >= ?")
+                    params.insert(1, cutoff[0])
+                rank = "f.rank"
+                order_by = "f.rank"
+            else:
+                # FTS5 walks its doclists backwards for rowid DESC, no sort needed
+                rank = "0.0"
+                order_by = "f.rowid DESC"
+        else:
+            # No usable terms, or no FTS5: plain filters plus LIKE per word
+            source = f"{schema}.{table} t"
+            rank = "0.0"
+            for word in re.findall(r"\w+", query):
+                conditions.append("(" + " OR ".join(f"t.{column} LIKE ?" for column in columns) + ")")
+                params.extend([f"%{word}%"] * len(columns))
+            order_by = "t.id DESC"
+        
+        where = " AND ".join(conditions) or "1"
+        
+        cursor = await self.connection.execute(f"""
+            SELECT {select}, {rank} AS rank
+            FROM {source}
+            WHERE {where}
+            ORDER BY {order_by}
+            LIMIT ? OFFSET ?
+        """, (*params, limit, offset))
+        
+        return await cursor.fetchall()
+    
+    async def search_messages(self, query: str, channel: str = None, username: str = None,
+                              since=None, until=None, limit: int = 50, offset: int = 0,
+                              order: str = 'rank', include_archived: bool = False) -> List[Dict]:
+        """Search chat history by full text
+        
+        Every word of the query must match (the last one as a prefix). Results
+        are ordered by relevance or, with order='recent', newest first;
+        since/until bound the message timestamp and limit/offset page through
+        the results. Archived partitions are decompressed and searched when
+        since reaches back into them or include_archived is set.
+        """
+        if order not in SEARCH_ORDERS:
+            raise ValueError(f"Unknown search order: {order}")
+        
         await self.connect()
         
         try:
-            cursor = await self.connection.execute("""
-                SELECT context, response, timestamp, relevance_score, memory_type, metadata
+            await self._rotate_partitions()
+            since, until = _time_bound(since), _time_bound(until)
+            
+            archived = []
+            if include_archived or since:
+                archived = self.partitions.overlapping(self.partitions.archived_keys(), since, until)
+            live = self._live_schemas()
+            
+            wanted = offset + limit
+            rows = []
+            for schema_or_key in live + archived:
+                if schema_or_key in archived:
+                    path = await asyncio.to_thread(self.partitions.restore, schema_or_key)
+                    schema = await self._attach(schema_or_key, path)
+                else:
+                    schema = schema_or_key
+                
+                try:
+                    rows += await self._search(
+                        'messages_fts', "t.id, t.username, t.content, t.timestamp, t.channel, t.message_type",
+                        query, {'channel': channel, 'username': username}, since, until,
+                        wanted if order == 'rank' else wanted - len(rows), 0, order, schema
+                    )
+                finally:
+                    if schema_or_key in archived:
+                        await self._detach(schema_or_key)
+                
+                # Partitions are searched newest first
+                if order == 'recent' and len(rows) >= wanted:
+                    break
+            
+            if order == 'rank':
+                rows.sort(key=lambda row: row['rank'])
+            rows = rows[offset:wanted]
+            
+            return [{
+                'id': row['id'],
+                'username': row['username'],
+                'content': row['content'],
+                'timestamp': row['timestamp'],
+                'channel': row['channel'],
+                'message_type': row['message_type'],
+                'rank': row['rank']
+            } for row in rows]
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to search messages: {e}")
+            return []
+    
+    async def search_memory(self, query: str, username: str = None, memory_type: str = None,
+                            since=None, until=None, limit: int = 20, offset: int = 0,
+                            order: str = 'rank') -> List[Dict]:
+        """Search AI memory contexts and responses by full text (see search_messages)"""
+        if order not in SEARCH_ORDERS:
+            raise ValueError(f"Unknown search order: {order}")
+        
+        await self.connect()
+        
+        try:
+            rows = await self._search(
+                'ai_memory_fts',
+                "t.id, t.username, t.context, t.response, t.timestamp, t.relevance_score, t.memory_type",
+                query, {'username': username, 'memory_type': memory_type}, since, until, limit, offset, order
+            )
+            
+            return [{
+                'id': row['id'],
+                'username': row['username'],
+                'context': row['context'],
+                'response': row['response'],
+                'timestamp': row['timestamp'],
+                'relevance_score': row['relevance_score'],
+                'memory_type': row['memory_type'],
+                'rank': row['rank']
+            } for row in rows]
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to search memory: {e}")
+            return []
+    
+    async def get_user_memory(self, username: str, limit: int = 10,
+                              include_metadata: bool = False) -> List[Dict]:
+        """Get AI memory for a specific user (metadata JSON is parsed only when requested)"""
+        await self.connect()
+        
+        try:
+            cursor = await self.connection.execute(f"""
+                SELECT context, response, timestamp, relevance_score, memory_type
+                       {", metadata" if include_metadata else ""}
                 FROM ai_memory
                 WHERE username = ?
                 ORDER BY timestamp DESC
@@ -260,14 +704,16 @@ class Database:
             
             memory = []
             for row in rows:
-                memory.append({
+                entry = {
                     'context': row['context'],
                     'response': row['response'],
                     'timestamp': row['timestamp'],
                     'relevance_score': row['relevance_score'],
-                    'memory_type': row['memory_type'],
-                    'metadata': json.loads(row['metadata'] or '{}')
-                })
+                    'memory_type': row['memory_type']
+                }
+                if include_metadata:
+                    entry['metadata'] = json.loads(row['metadata'] or '{}')
+                memory.append(entry)
             
             return memory
             
@@ -312,11 +758,18 @@ class Database:
         await self.connect()
         
         try:
-            cutoff_date = datetime.now() - timedelta(days=days)
+            cutoff_date = _time_bound(_utcnow() - timedelta(days=days))
+            
+            # Retention drops whole monthly partitions
+            await self._rotate_partitions()
+            for key in self.partitions.expired(cutoff_date):
+                if key != self.current_partition:
+                    await self._detach(key)
+                    await asyncio.to_thread(self.partitions.drop, key)
             
-            # Clean old messages
+            # Messages from before partitioning are still pruned row by row
             await self.connection.execute("""
-                DELETE FROM messages WHERE timestamp < ?
+                DELETE FROM main.messages WHERE timestamp < ?
             """, (cutoff_date,))
             
             # Clean old AI memory with low relevance
@@ -0,0 +1,350 @@
+"""
+Database Backups for Stream Artifact
+Online, compressed, checksummed SQLite snapshots with page-level deltas
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+import time
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .partitions import PartitionStore
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"SADBSNAP1"
+PAGE_RECORD = struct.Struct(">I")
+
+# Per-page fingerprints kept next to each snapshot to find changed pages
+PAGE_DIGEST_SIZE = 16
+
+
+class _BackupRestarted(Exception):
+    """The source kept changing under a paged backup"""
+
+
+def _page_digest(page: bytes) -> bytes:
+    return hashlib.blake2b(page, digest_size=PAGE_DIGEST_SIZE).digest()
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _page_size(path: Path) -> int:
+    """Page size from the SQLite file header"""
+    with open(path, 'rb') as handle:
+        handle.seek(16)
+        size = struct.unpack(">H", handle.read(2))[0]
+    return 65536 if size == 1 else size
+
+
+@dataclass
+class Snapshot:
+    """One entry of a backup chain's manifest"""
+    id: str
+    kind: str  # 'full' or 'delta'
+    base: Optional[str]
+    created: str
+    page_size: int
+    page_count: int
+    changed_pages: int
+    db_sha256: str
+    file: str
+    file_sha256: str
+    file_size: int
+    seconds: float
+
+    @property
+    def megabytes_per_second(self) -> float:
+        """Source bytes snapshotted per second"""
+        return self.page_size * self.page_count / 1024 / 1024 / self.seconds if self.seconds else 0.0
+
+
+class DatabaseBackup:
+    """Snapshot chain of one SQLite file
+
+    The live database is copied with the online backup API in steps of
+    pages_per_step pages from one pinned WAL read snapshot, so the bot keeps
+    committing while the copy runs. The copy is then compared page by page with the previous
+    snapshot: a full snapshot stores every page, a delta only the changed
+    ones, both gzip-compressed. Every snapshot records the SHA-256 of the
+    database it represents and of its own file, so a restore can be
+    verified end to end.
+    """
+
+    def __init__(self, db_path: Path, backup_dir: Path, pages_per_step: int = 1024,
+                 step_pause: float = 0.001, full_every: int = 24, keep_chains: int = 2,
+                 max_restarts: int = 3):
+        self.db_path = Path(db_path)
+        self.backup_dir = Path(backup_dir)
+        self.pages_per_step = pages_per_step
+        self.step_pause = step_pause
+        self.full_every = full_every
+        self.keep_chains = keep_chains
+        self.max_restarts = max_restarts
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.backup_dir / "manifest.json"
+
+    def snapshots(self) -> List[Snapshot]:
+        """Snapshots in the manifest, oldest first"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as handle:
+                return [Snapshot(**entry) for entry in json.load(handle)]
+        except FileNotFoundError:
+            return []
+
+    def _save_manifest(self, snapshots: List[Snapshot]) -> None:
+        partial = self.manifest_path.with_suffix(".partial")
+        with open(partial, 'w', encoding='utf-8') as handle:
+            json.dump([asdict(snapshot) for snapshot in snapshots], handle, indent=2)
+        os.replace(partial, self.manifest_path)
+
+    def _copy(self, target: Path) -> None:
+        """Online copy of the live database, page step by page step"""
+        source = sqlite3.connect(str(self.db_path), timeout=30)
+        destination = sqlite3.connect(str(target))
+        try:
+            remaining_seen = [None, 0]
+
+            def progress(status, remaining, total):
+                # A write from another connection restarts the copy; give
+                # up on stepping if that keeps happening
+                if remaining_seen[0] is not None and remaining > remaining_seen[0]:
+                    remaining_seen[1] += 1
+                    if remaining_seen[1] > self.max_restarts:
+                        raise _BackupRestarted()
+                remaining_seen[0] = remaining
+                if self.step_pause:
+                    time.sleep(self.step_pause)
+
+            # Holding a read transaction pins one WAL snapshot across the steps,
+            # so the bot's commits neither wait for the copy nor restart it
+            source.execute("BEGIN")
+            source.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            try:
+                source.backup(destination, pages=self.pages_per_step, progress=progress)
+            except _BackupRestarted:
+                # One step reads a consistent WAL snapshot without blocking writers
+                logger.warning(f"⚠️ {self.db_path.name} kept changing during a paged backup, copying in one step")
+                source.backup(destination, pages=-1)
+        finally:
+            destination.close()
+            source.close()
+
+    def snapshot(self, full: bool = False) -> Snapshot:
+        """Take a snapshot; a delta unless full, or the chain is long enough for a new full one"""
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        start = time.perf_counter()
+        snapshots = self.snapshots()
+
+        previous = snapshots[-1] if snapshots else None
+        chain_length = 0
+        for snapshot in reversed(snapshots):
+            chain_length += 1
+            if snapshot.kind == 'full':
+                break
+        kind = 'full' if full or previous is None or chain_length >= self.full_every else 'delta'
+
+        previous_digests = b""
+        if kind == 'delta':
+            try:
+                previous_digests = (self.backup_dir / f"{previous.id}.pages").read_bytes()
+            except FileNotFoundError:
+                kind = 'full'
+
+        snapshot_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        file_name = f"{snapshot_id}.{kind}.gz"
+
+        with tempfile.TemporaryDirectory(dir=self.backup_dir) as tmp:
+            copy_path = Path(tmp) / "copy.db"
+            self._copy(copy_path)
+
+            page_size = _page_size(copy_path)
+            db_digest = hashlib.sha256()
+            digests = bytearray()
+            changed = 0
+
+            partial = self.backup_dir / f"{file_name}.partial"
+            with open(copy_path, 'rb') as source, gzip.open(partial, 'wb', compresslevel=3) as target:
+                target.write(SNAPSHOT_MAGIC)
+                page_number = 0
+                for page in iter(lambda: source.read(page_size), b""):
+                    db_digest.update(page)
+                    digest = _page_digest(page)
+                    digests += digest
+
+                    offset = page_number * PAGE_DIGEST_SIZE
+                    if kind == 'full' or previous_digests[offset:offset + PAGE_DIGEST_SIZE] != digest:
+                        target.write(PAGE_RECORD.pack(page_number))
+                        target.write(page)
+                        changed += 1
+                    page_number += 1
+
+            os.replace(partial, self.backup_dir / file_name)
+            (self.backup_dir / f"{snapshot_id}.pages").write_bytes(bytes(digests))
+
+        snapshot = Snapshot(
+            id=snapshot_id,
+            kind=kind,
+            base=previous.id if kind == 'delta' else None,
+            created=datetime.now().isoformat(),
+            page_size=page_size,
+            page_count=page_number,
+            changed_pages=changed,
+            db_sha256=db_digest.hexdigest(),
+            file=file_name,
+            file_sha256=_file_sha256(self.backup_dir / file_name),
+            file_size=(self.backup_dir / file_name).stat().st_size,
+            seconds=time.perf_counter() - start,
+        )
+        snapshots.append(snapshot)
+        self._save_manifest(self._apply_retention(snapshots))
+
+        logger.info(f"💾 {self.db_path.name} {kind} snapshot: {changed}/{page_number} pages, "
+                    f"{snapshot.file_size / 1024 / 1024:.1f} MB written, "
+                    f"{snapshot.megabytes_per_second:.0f} MB/s")
+        return snapshot
+
+    def _apply_retention(self, snapshots: List[Snapshot]) -> List[Snapshot]:
+        """Drop whole chains older than the newest keep_chains full snapshots"""
+        fulls = [index for index, snapshot in enumerate(snapshots) if snapshot.kind == 'full']
+        if len(fulls) <= self.keep_chains:
+            return snapshots
+
+        cut = fulls[-self.keep_chains]
+        for snapshot in snapshots[:cut]:
+            for path in (self.backup_dir / snapshot.file, self.backup_dir / f"{snapshot.id}.pages"):
+                if path.exists():
+                    path.unlink()
+        logger.info(f"🗑️ Removed {cut} old {self.db_path.name} snapshots")
+        return snapshots[cut:]
+
+    def chain(self, snapshot_id: Optional[str] = None) -> List[Snapshot]:
+        """Snapshots needed to rebuild one (the latest by default), full snapshot first"""
+        by_id = {snapshot.id: snapshot for snapshot in self.snapshots()}
+        if not by_id:
+            raise FileNotFoundError(f"No snapshots of {self.db_path.name} in {self.backup_dir}")
+
+        snapshot = by_id[snapshot_id] if snapshot_id else self.snapshots()[-1]
+        chain = [snapshot]
+        while chain[-1].base:
+            chain.append(by_id[chain[-1].base])
+        return list(reversed(chain))
+
+    def restore(self, target: Path, snapshot_id: Optional[str] = None) -> Snapshot:
+        """Rebuild a snapshot into target and verify it; raises ValueError on any mismatch"""
+        chain = self.chain(snapshot_id)
+        snapshot = chain[-1]
+        target = Path(target)
+
+        partial = target.with_name(target.name + ".partial")
+        with open(partial, 'wb') as output:
+            for link in chain:
+                path = self.backup_dir / link.file
+                if _file_sha256(path) != link.file_sha256:
+                    raise ValueError(f"Snapshot file {link.file} is corrupt (checksum mismatch)")
+
+                with gzip.open(path, 'rb') as source:
+                    if source.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                        raise ValueError(f"{link.file} is not a database snapshot")
+                    while True:
+                        header = source.read(PAGE_RECORD.size)
+                        if not header:
+                            break
+                        page_number, = PAGE_RECORD.unpack(header)
+                        output.seek(page_number * link.page_size)
+                        output.write(source.read(link.page_size))
+            output.truncate(snapshot.page_size * snapshot.page_count)
+
+        if _file_sha256(partial) != snapshot.db_sha256:
+            partial.unlink()
+            raise ValueError(f"Restored database does not match snapshot {snapshot.id}")
+
+        conn = sqlite3.connect(str(partial))
+        try:
+            result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            conn.close()
+        if result != "ok":
+            partial.unlink()
+            raise ValueError(f"Restored snapshot {snapshot.id} fails integrity check: {result}")
+
+        os.replace(partial, target)
+        return snapshot
+
+    def verify(self, snapshot_id: Optional[str] = None) -> bool:
+        """Restore a snapshot into a scratch file and check it"""
+        try:
+            with tempfile.TemporaryDirectory(dir=self.backup_dir) as tmp:
+                self.restore(Path(tmp) / "verify.db", snapshot_id)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Backup verification failed for {self.db_path.name}: {e}")
+            return False
+
+
+class DatabaseBackupJob:
+    """Background snapshots of the main database and its message partitions
+
+    Each live database file gets its own snapshot chain under backup_dir;
+    archived partitions are already compressed and never change, so they
+    are copied once.
+    """
+
+    def __init__(self, db_path: Path, backup_dir: Path, verify: bool = True, **options):
+        self.db_path = Path(db_path)
+        self.backup_dir = Path(backup_dir)
+        self.verify = verify
+        self.options = options
+        self.partitions = PartitionStore.for_database(self.db_path)
+        self.last_results: Dict[str, Snapshot] = {}
+        self.last_run_seconds = 0.0
+
+    def backup_for(self, path: Path) -> DatabaseBackup:
+        """Snapshot chain of one database file"""
+        return DatabaseBackup(path, self.backup_dir / Path(path).stem, **self.options)
+
+    def run(self) -> Dict[str, Snapshot]:
+        """Snapshot every live database file (blocking; call from a worker thread)"""
+        start = time.perf_counter()
+        results = {}
+        paths = [self.db_path] + [self.partitions.path(key) for key in self.partitions.live_keys()]
+        for path in paths:
+            backup = self.backup_for(path)
+            snapshot = backup.snapshot()
+            if self.verify and not backup.verify(snapshot.id):
+                raise ValueError(f"Snapshot {snapshot.id} of {path.name} failed verification")
+            results[path.name] = snapshot
+
+        archive_dir = self.backup_dir / "archive"
+        for key in self.partitions.archived_keys():
+            source = self.partitions.archive_path(key)
+            if not (archive_dir / source.name).exists():
+                archive_dir.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(source, archive_dir / source.name)
+
+        self.last_run_seconds = time.perf_counter() - start
+        self.last_results = results
+        total = sum(snapshot.page_size * snapshot.page_count for snapshot in results.values())
+        written = sum(snapshot.file_size for snapshot in results.values())
+        logger.info(f"💾 Database backup: {total / 1024 / 1024:.1f} MB in {self.last_run_seconds:.1f}s "
+                    f"({total / 1024 / 1024 / max(self.last_run_seconds, 1e-9):.0f} MB/s), "
+                    f"{written / 1024 / 1024:.1f} MB written")
+        return results
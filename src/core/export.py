@@ -0,0 +1,251 @@
+"""
+Chat History Export for Stream Artifact
+Streams tables into compressed columnar chunk files for offline analytics
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .partitions import PartitionStore
+
+logger = logging.getLogger(__name__)
+
+EXPORT_TABLES = ('messages', 'users', 'stream_events', 'ai_memory')
+
+# Incremental export progress lives next to the chunk files
+STATE_FILE = "export_state.json"
+
+FORMAT_SUFFIXES = {
+    'parquet': ".parquet",
+    'npz': ".npz",
+    'jsonz': ".json.gz",
+}
+
+
+def available_formats() -> List[str]:
+    """Export formats usable in this environment, best first"""
+    formats = []
+    try:
+        import pyarrow.parquet  # noqa: F401
+        formats.append('parquet')
+    except ImportError:
+        pass
+    try:
+        import numpy  # noqa: F401
+        formats.append('npz')
+    except ImportError:
+        pass
+    formats.append('jsonz')
+    return formats
+
+
+def _column_kind(declared_type: str) -> str:
+    """Storage kind of a column from its declared SQLite type"""
+    declared_type = declared_type.upper()
+    if 'INT' in declared_type or 'BOOL' in declared_type:
+        return 'int'
+    if 'REAL' in declared_type or 'FLOA' in declared_type or 'DOUB' in declared_type:
+        return 'float'
+    return 'text'
+
+
+def _write_parquet(path: Path, columns: Dict[str, list], kinds: Dict[str, str]) -> None:
+    import pyarrow
+    import pyarrow.parquet
+
+    types = {'int': pyarrow.int64(), 'float': pyarrow.float64(), 'text': pyarrow.string()}
+    table = pyarrow.table({name: pyarrow.array(values, type=types[kinds[name]]) for name, values in columns.items()})
+    pyarrow.parquet.write_table(table, path, compression='zstd')
+
+
+def _write_npz(path: Path, columns: Dict[str, list], kinds: Dict[str, str]) -> None:
+    import numpy
+
+    # Fixed-width arrays only (no pickled objects); NULLs get a mask array
+    arrays = {}
+    for name, values in columns.items():
+        nulls = [value is None for value in values]
+        if any(nulls):
+            arrays[f"{name}__null"] = numpy.array(nulls, dtype=bool)
+        if kinds[name] == 'int':
+            arrays[name] = numpy.array([0 if value is None else int(value) for value in values], dtype=numpy.int64)
+        elif kinds[name] == 'float':
+            arrays[name] = numpy.array([numpy.nan if value is None else value for value in values], dtype=numpy.float64)
+        else:
+            arrays[name] = numpy.array(['' if value is None else str(value) for value in values], dtype=str)
+
+    with open(path, 'wb') as handle:
+        numpy.savez_compressed(handle, **arrays)
+
+
+def _write_jsonz(path: Path, columns: Dict[str, list], kinds: Dict[str, str]) -> None:
+    # Pure-Python fallback: one JSON object of column arrays, gzip-compressed
+    with gzip.open(path, 'wt', encoding='utf-8', compresslevel=6) as handle:
+        json.dump({'kinds': kinds, 'columns': columns}, handle, ensure_ascii=False, separators=(',', ':'))
+
+
+WRITERS = {
+    'parquet': _write_parquet,
+    'npz': _write_npz,
+    'jsonz': _write_jsonz,
+}
+
+
+def read_chunk(path: Path) -> Dict[str, list]:
+    """Columns of one exported chunk file as Python lists"""
+    path = Path(path)
+    if path.name.endswith(FORMAT_SUFFIXES['jsonz']):
+        with gzip.open(path, 'rt', encoding='utf-8') as handle:
+            return json.load(handle)['columns']
+
+    if path.suffix == FORMAT_SUFFIXES['npz']:
+        import numpy
+        with numpy.load(path) as data:
+            columns = {name: data[name].tolist() for name in data.files if not name.endswith("__null")}
+            for name in data.files:
+                if name.endswith("__null"):
+                    column = columns[name[:-len("__null")]]
+                    for index in numpy.flatnonzero(data[name]):
+                        column[index] = None
+            return columns
+
+    import pyarrow.parquet
+    return pyarrow.parquet.read_table(path).to_pydict()
+
+
+@dataclass
+class ExportResult:
+    """What one export run wrote"""
+    format: str
+    rows: Dict[str, int] = field(default_factory=dict)
+    files: List[Path] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total_rows / self.seconds if self.seconds else 0.0
+
+
+class HistoryExporter:
+    """Streaming, incremental export of the chat database
+
+    Each table is read in id order with fetchmany, so memory use is bounded
+    by chunk_rows. Every chunk becomes one compressed file named after its
+    id range, and the last exported id per table is saved after each chunk;
+    the next run continues from there. Messages are read from the main
+    table and every monthly partition (archived ones are decompressed into
+    a temporary directory).
+    """
+
+    def __init__(self, db_path: Path, output_dir: Path, format: Optional[str] = None,
+                 chunk_rows: int = 50000):
+        formats = available_formats()
+        if format is None:
+            format = formats[0]
+        if format not in formats:
+            raise ValueError(f"Export format {format!r} unavailable (have: {', '.join(formats)})")
+
+        self.db_path = Path(db_path)
+        self.output_dir = Path(output_dir)
+        self.format = format
+        self.chunk_rows = chunk_rows
+        self.partitions = PartitionStore.for_database(self.db_path)
+
+    @property
+    def state_path(self) -> Path:
+        return self.output_dir / STATE_FILE
+
+    def load_state(self) -> Dict[str, Any]:
+        """Last exported id per table and the archived partitions already done"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {'last_ids': {}, 'archived_partitions': []}
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        partial = self.state_path.with_suffix(".partial")
+        with open(partial, 'w', encoding='utf-8') as handle:
+            json.dump(state, handle, indent=2)
+        os.replace(partial, self.state_path)
+
+    def export(self, tables=EXPORT_TABLES, full: bool = False) -> ExportResult:
+        """Export rows added since the previous run (or everything with full=True)"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        state = {'last_ids': {}, 'archived_partitions': []} if full else self.load_state()
+        result = ExportResult(format=self.format)
+        start = time.perf_counter()
+
+        with tempfile.TemporaryDirectory() as restore_dir:
+            for table in tables:
+                result.rows[table] = 0
+                for source_path, archived_key in self._sources(table, state, Path(restore_dir)):
+                    self._export_source(source_path, table, state, result)
+                    if archived_key:
+                        # Archived months are closed, never read them again
+                        state['archived_partitions'].append(archived_key)
+                        self._save_state(state)
+
+        result.seconds = time.perf_counter() - start
+        logger.info(f"📦 Exported {result.total_rows:,} rows as {self.format} in {result.seconds:.1f}s "
+                    f"({result.rows_per_second:,.0f} rows/s)")
+        return result
+
+    def _sources(self, table: str, state: Dict[str, Any], restore_dir: Path) -> Iterator[Tuple[Path, Optional[str]]]:
+        """Database files holding the table: (path, archived partition key or None)"""
+        yield self.db_path, None
+        if table != 'messages':
+            return
+
+        # Oldest first so ids come out in order
+        for key in reversed(self.partitions.archived_keys()):
+            if key not in state['archived_partitions']:
+                yield self.partitions.restore(key, restore_dir), key
+        for key in reversed(self.partitions.live_keys()):
+            yield self.partitions.path(key), None
+
+    def _export_source(self, path: Path, table: str, state: Dict[str, Any], result: ExportResult) -> None:
+        """Stream one table of one database file into chunk files"""
+        # Read-only, so a running bot's writes are never blocked by the export
+        conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+            if not info:
+                return
+            names = [row[1] for row in info]
+            kinds = {row[1]: _column_kind(row[2]) for row in info}
+
+            last_id = state['last_ids'].get(table, 0)
+            cursor = conn.execute(f"SELECT {', '.join(names)} FROM {table} WHERE id > ? ORDER BY id", (last_id,))
+            while True:
+                rows = cursor.fetchmany(self.chunk_rows)
+                if not rows:
+                    break
+
+                columns = dict(zip(names, map(list, zip(*rows))))
+                first_id, last_id = columns['id'][0], columns['id'][-1]
+                chunk_path = self.output_dir / table / f"{table}-{first_id:012d}-{last_id:012d}{FORMAT_SUFFIXES[self.format]}"
+                chunk_path.parent.mkdir(exist_ok=True)
+
+                partial = chunk_path.with_name(chunk_path.name + ".partial")
+                WRITERS[self.format](partial, columns, kinds)
+                os.replace(partial, chunk_path)
+
+                state['last_ids'][table] = last_id
+                self._save_state(state)
+                result.rows[table] += len(rows)
+                result.files.append(chunk_path)
+        finally:
+            conn.close()
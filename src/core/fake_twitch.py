@@ -0,0 +1,480 @@
+"""
+Fake Twitch Chat Server for Stream Artifact
+A local stand-in for Twitch's IRC/TMI service, for offline load and reconnection tests
+"""
+
+import asyncio
+import time
+import uuid
+import zlib
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+from aiohttp import WSMsgType, web
+
+from .chat_replay import ChatLine, Raid, synthetic_chat
+
+logger = logging.getLogger(__name__)
+
+HOST = "tmi.twitch.tv"
+
+WELCOME = [
+    "001 {nick} :Welcome, GLHF!",
+    "002 {nick} :Your host is tmi.twitch.tv",
+    "003 {nick} :This server is rather new",
+    "004 {nick} :-",
+    "375 {nick} :-",
+    "372 {nick} :You are in a maze of twisty passages, all alike.",
+    "376 {nick} :>",
+]
+
+
+def escape_tag(value: str) -> str:
+    """IRCv3 tag value escaping"""
+    return (value.replace("\\", "\\\\").replace(";", "\\:").replace(" ", "\\s")
+            .replace("\r", "\\r").replace("\n", "\\n"))
+
+
+def user_id(name: str) -> str:
+    """Stable numeric user id for a login"""
+    return str(zlib.crc32(name.encode('utf-8')) % 900_000_000 + 100_000_000)
+
+
+def format_privmsg(channel: str, user: str, text: str, badges: Sequence[str] = ()) -> str:
+    """A chat line as Twitch sends it with the tags capability"""
+    tags = [
+        ("badge-info", ""),
+        ("badges", ",".join(f"{badge}/1" for badge in badges)),
+        ("color", ""),
+        ("display-name", user),
+        ("emotes", ""),
+        ("first-msg", "0"),
+        ("flags", ""),
+        ("id", str(uuid.uuid4())),
+        ("mod", "1" if 'moderator' in badges else "0"),
+        ("returning-chatter", "0"),
+        ("room-id", user_id(channel)),
+        ("subscriber", "1" if 'subscriber' in badges else "0"),
+        ("tmi-sent-ts", str(int(time.time() * 1000))),
+        ("turbo", "0"),
+        ("user-id", user_id(user)),
+        ("user-type", "mod" if 'moderator' in badges else ""),
+    ]
+    if 'vip' in badges:
+        tags.append(("vip", "1"))
+    tag_text = ";".join(f"{key}={escape_tag(value)}" for key, value in tags)
+    return f"@{tag_text} :{user}!{user}@{user}.{HOST} PRIVMSG #{channel} :{text}"
+
+
+def format_raid(channel: str, raider: str, viewers: int) -> str:
+    """The USERNOTICE Twitch sends when another channel raids"""
+    tags = [
+        ("badge-info", ""), ("badges", ""), ("color", ""), ("display-name", raider), ("emotes", ""),
+        ("flags", ""), ("id", str(uuid.uuid4())), ("login", raider), ("mod", "0"), ("msg-id", "raid"),
+        ("msg-param-displayName", raider), ("msg-param-login", raider), ("msg-param-viewerCount", str(viewers)),
+        ("room-id", user_id(channel)), ("subscriber", "0"),
+        ("system-msg", f"{viewers} raiders from {raider} have joined!"),
+        ("tmi-sent-ts", str(int(time.time() * 1000))), ("user-id", user_id(raider)), ("user-type", ""),
+    ]
+    tag_text = ";".join(f"{key}={escape_tag(value)}" for key, value in tags)
+    return f"@{tag_text} :{HOST} USERNOTICE #{channel}"
+
+
+@dataclass
+class ReceivedMessage:
+    """A PRIVMSG the server accepted from a client"""
+    nick: str
+    channel: str
+    text: str
+    at: float
+
+
+class Session:
+    """One client connection (raw TCP or WebSocket)"""
+
+    def __init__(self, server: "FakeTwitchServer", write: Callable[[str], Any], close: Callable[[], Any],
+                 socket: Optional[asyncio.BaseTransport], transport: str):
+        self.server = server
+        self._write = write
+        self._close = close
+        self._socket = socket
+        self.transport = transport
+        self.nick: Optional[str] = None
+        self.password: Optional[str] = None
+        self.capabilities: Set[str] = set()
+        self.channels: Set[str] = set()
+        self.sent_times: deque = deque()
+        self.last_sent: Dict[str, tuple] = {}
+        self.last_pong = time.monotonic()
+        self.closed = False
+
+    async def send(self, *lines: str) -> None:
+        """Write lines (one frame on WebSocket, as Twitch batches them)"""
+        if self.closed or not lines:
+            return
+        try:
+            await self._write("".join(f"{line}\r\n" for line in lines))
+        except (ConnectionError, RuntimeError):
+            await self.close()
+
+    async def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self._close()
+        except (ConnectionError, RuntimeError):
+            pass
+        self.server._forget(self)
+
+    def drop(self) -> None:
+        """Cut the connection without a goodbye (no close frame), like a network failure"""
+        if self.closed:
+            return
+        self.closed = True
+        if self._socket is not None:
+            self._socket.abort()
+        self.server._forget(self)
+
+
+class FakeTwitchServer:
+    """Local Twitch chat over raw TCP IRC and WebSocket, with IRCv3 tags
+
+    Speaks enough of TMI for twitchio and other IRC clients: PASS/NICK
+    login with the welcome numerics, CAP REQ acknowledgements, JOIN/PART
+    with NAMES, USERSTATE and ROOMSTATE, PING/PONG both ways, and PRIVMSG
+    from clients, which are recorded in received. More than rate_limit
+    messages per rate_window seconds, or a repeat of the previous message
+    within that window, get Twitch's msg_ratelimit / msg_duplicate NOTICE
+    instead. say(), raid(), disconnect_all() and play(Scenario) drive the
+    chat side. tokens, when given, are the only passwords accepted.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, ws_port: int = 0, rate_limit: int = 20,
+                 rate_window: float = 30.0, ping_interval: float = 0.0, ping_timeout: float = 10.0,
+                 tokens: Optional[Iterable[str]] = None):
+        self.host = host
+        self.port = port
+        self.ws_port = ws_port
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.tokens = {token.replace("oauth:", "") for token in tokens} if tokens is not None else None
+
+        self.sessions: List[Session] = []
+        self.received: List[ReceivedMessage] = []
+        self.rate_limited = 0
+        self.duplicates = 0
+        self.connections = 0
+        self.logins = 0
+        self.pongs = 0
+
+        self._tcp_server: Optional[asyncio.AbstractServer] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._pinger: Optional[asyncio.Task] = None
+        self._changed: Optional[asyncio.Condition] = None
+
+    @property
+    def ws_url(self) -> str:
+        """WebSocket URL for twitchio's connection (see benchmarks/bench_twitch_e2e.py)"""
+        return f"ws://{self.host}:{self.ws_port}/"
+
+    async def start(self) -> None:
+        """Listen for TCP and WebSocket clients (port 0 picks a free port)"""
+        self._changed = asyncio.Condition()
+        self._tcp_server = await asyncio.start_server(self._serve_tcp, self.host, self.port)
+        self.port = self._tcp_server.sockets[0].getsockname()[1]
+
+        app = web.Application()
+        app.router.add_get('/', self._serve_ws)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.ws_port).start()
+        self.ws_port = self._runner.addresses[0][1]
+
+        if self.ping_interval:
+            self._pinger = asyncio.get_running_loop().create_task(self._ping_clients())
+        logger.info(f"🧪 Fake Twitch chat on irc://{self.host}:{self.port} and {self.ws_url}")
+
+    async def stop(self) -> None:
+        if self._pinger:
+            self._pinger.cancel()
+        await self.disconnect_all()
+        if self._tcp_server:
+            self._tcp_server.close()
+            await self._tcp_server.wait_closed()
+        if self._runner:
+            await self._runner.cleanup()
+
+    # Client connections
+
+    async def _serve_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def write(data: str):
+            writer.write(data.encode('utf-8'))
+            await writer.drain()
+
+        async def close():
+            writer.close()
+
+        session = self._open(write, close, writer.transport, "tcp")
+        try:
+            while not session.closed:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                await self._handle_line(session, raw.decode('utf-8', errors='replace'))
+        except ConnectionError:
+            pass
+        finally:
+            await session.close()
+
+    async def _serve_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        session = self._open(ws.send_str, ws.close, request.transport, "websocket")
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    break
+                for line in msg.data.split("\r\n"):
+                    await self._handle_line(session, line)
+        finally:
+            await session.close()
+        return ws
+
+    def _open(self, write, close, socket, transport: str) -> Session:
+        session = Session(self, write, close, socket, transport)
+        self.sessions.append(session)
+        self.connections += 1
+        return session
+
+    def _forget(self, session: Session) -> None:
+        if session in self.sessions:
+            self.sessions.remove(session)
+        self._notify()
+
+    # Protocol
+
+    async def _handle_line(self, session: Session, line: str) -> None:
+        line = line.strip()
+        if line.startswith("@"):
+            # Client tags (e.g. reply-parent-msg-id) are accepted and ignored
+            line = line.partition(" ")[2]
+        if not line:
+            return
+        command, _, rest = line.partition(" ")
+        command = command.upper()
+
+        if command == "PASS":
+            session.password = rest.replace("oauth:", "", 1)
+        elif command == "NICK":
+            await self._login(session, rest.strip().lower())
+        elif command == "CAP":
+            capabilities = rest.partition(":")[2]
+            session.capabilities.update(capabilities.split())
+            await session.send(f":{HOST} CAP * ACK :{capabilities}")
+        elif command == "PING":
+            await session.send(f":{HOST} PONG {HOST} :{rest.lstrip(':') or HOST}")
+        elif command == "PONG":
+            session.last_pong = time.monotonic()
+            self.pongs += 1
+        elif session.nick is None:
+            return
+        elif command == "JOIN":
+            for channel in rest.replace("#", "").lower().split(","):
+                await self._join(session, channel.strip())
+        elif command == "PART":
+            for channel in rest.replace("#", "").lower().split(","):
+                session.channels.discard(channel.strip())
+                await session.send(f":{session.nick}!{session.nick}@{session.nick}.{HOST} PART #{channel.strip()}")
+        elif command == "PRIVMSG":
+            target, _, text = rest.partition(" :")
+            await self._privmsg(session, target.lstrip("#").lower(), text)
+        elif command == "QUIT":
+            await session.close()
+
+    async def _login(self, session: Session, nick: str) -> None:
+        if self.tokens is not None and session.password not in self.tokens:
+            await session.send(f":{HOST} NOTICE * :Login unsuccessful")
+            await session.close()
+            return
+        session.nick = nick
+        self.logins += 1
+        await session.send(*(f":{HOST} {line.format(nick=nick)}" for line in WELCOME))
+        self._notify()
+
+    async def _join(self, session: Session, channel: str) -> None:
+        nick = session.nick
+        session.channels.add(channel)
+        await session.send(
+            f":{nick}!{nick}@{nick}.{HOST} JOIN #{channel}",
+            f":{nick}.{HOST} 353 {nick} = #{channel} :{nick}",
+            f":{nick}.{HOST} 366 {nick} #{channel} :End of /NAMES list",
+            f"@badge-info=;badges=;color=;display-name={nick};emote-sets=0;mod=0;subscriber=0;user-type= "
+            f":{HOST} USERSTATE #{channel}",
+            f"@emote-only=0;followers-only=-1;r9k=0;room-id={user_id(channel)};slow=0;subs-only=0 "
+            f":{HOST} ROOMSTATE #{channel}",
+        )
+        self._notify()
+
+    async def _privmsg(self, session: Session, channel: str, text: str) -> None:
+        now = time.monotonic()
+        while session.sent_times and now - session.sent_times[0] >= self.rate_window:
+            session.sent_times.popleft()
+
+        if len(session.sent_times) >= self.rate_limit:
+            self.rate_limited += 1
+            await session.send(f"@msg-id=msg_ratelimit :{HOST} NOTICE #{channel} "
+                               f":Your message was not sent because you are sending messages too quickly.")
+            return
+
+        previous = session.last_sent.get(channel)
+        if previous and previous[0] == text and now - previous[1] < self.rate_window:
+            self.duplicates += 1
+            await session.send(f"@msg-id=msg_duplicate :{HOST} NOTICE #{channel} "
+                               f":Your message was not sent because it is identical to the previous one "
+                               f"you sent, less than 30 seconds ago.")
+            return
+
+        session.sent_times.append(now)
+        session.last_sent[channel] = (text, now)
+        self.received.append(ReceivedMessage(session.nick, channel, text, time.time()))
+        self._notify()
+
+    async def _ping_clients(self) -> None:
+        """Ping clients like Twitch does and drop those that stop answering"""
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            for session in list(self.sessions):
+                if time.monotonic() - session.last_pong > self.ping_interval + self.ping_timeout:
+                    logger.info(f"🧪 {session.nick} stopped answering PINGs, disconnecting")
+                    session.drop()
+                else:
+                    await session.send(f"PING :{HOST}")
+
+    # Chat side
+
+    async def say(self, channel: str, user: str, text: str, badges: Sequence[str] = ()) -> None:
+        """A viewer writes in channel"""
+        await self.broadcast(channel, [format_privmsg(channel, user, text, badges)])
+
+    async def raid(self, channel: str, raider: str, viewers: int) -> None:
+        await self.broadcast(channel, [format_raid(channel, raider, viewers)])
+
+    async def broadcast(self, channel: str, lines: Sequence[str]) -> None:
+        """Send lines to every client in channel"""
+        for session in list(self.sessions):
+            if channel in session.channels:
+                await session.send(*lines)
+
+    async def disconnect_all(self) -> None:
+        """Drop every connection without warning"""
+        for session in list(self.sessions):
+            session.drop()
+
+    async def reconnect_all(self) -> None:
+        """Ask clients to reconnect (Twitch's RECONNECT before maintenance), then drop them"""
+        for session in list(self.sessions):
+            await session.send(f":{HOST} RECONNECT")
+            session.drop()
+
+    async def wait_for(self, predicate: Callable[[], bool], timeout: float = 10.0) -> None:
+        """Wait until predicate() holds; asyncio.TimeoutError otherwise"""
+        async def wait():
+            async with self._changed:
+                await self._changed.wait_for(predicate)
+        await asyncio.wait_for(wait(), timeout)
+
+    async def wait_for_join(self, channel: str, timeout: float = 10.0) -> None:
+        await self.wait_for(lambda: any(channel in session.channels for session in self.sessions), timeout)
+
+    def _notify(self) -> None:
+        if self._changed is None:
+            return
+
+        async def notify():
+            async with self._changed:
+                self._changed.notify_all()
+
+        asyncio.get_running_loop().create_task(notify())
+
+    async def play(self, scenario: "Scenario", speed: float = 1.0) -> None:
+        """Run a scenario's steps at their times (speed 2 plays twice as fast)"""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        steps = sorted(scenario.steps, key=lambda step: step.at)
+        index = 0
+        while index < len(steps):
+            due = start + steps[index].at / speed
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            # Everything due by now goes out together, chat batched per frame
+            now = loop.time()
+            lines = []
+            while index < len(steps) and start + steps[index].at / speed <= now:
+                step = steps[index]
+                index += 1
+                if step.action == 'chat':
+                    line = step.payload
+                    lines.append(format_privmsg(scenario.channel, line.user, line.text, line.badges))
+                    continue
+                await self.broadcast(scenario.channel, lines)
+                lines = []
+                if step.action == 'raid':
+                    await self.raid(scenario.channel, *step.payload)
+                elif step.action == 'disconnect':
+                    await self.disconnect_all()
+                elif step.action == 'reconnect':
+                    await self.reconnect_all()
+            await self.broadcast(scenario.channel, lines)
+
+
+@dataclass
+class ScenarioStep:
+    at: float
+    action: str  # 'chat', 'raid', 'disconnect' or 'reconnect'
+    payload: Any = None
+
+
+class Scenario:
+    """A scripted stretch of chat for FakeTwitchServer.play
+
+    Steps are added with chainable methods, e.g.
+    Scenario("chan").chat(lines).raid(10, "bigstreamer", 3000).disconnect(20)
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.steps: List[ScenarioStep] = []
+
+    @classmethod
+    def synthetic(cls, channel: str, duration: float, rate: float, seed: int = 0, **options) -> "Scenario":
+        """Chat from chat_replay.synthetic_chat (users, zipf, command_share, ...)"""
+        return cls(channel).chat(synthetic_chat(duration, rate, seed=seed, **options))
+
+    def chat(self, lines: Iterable[ChatLine]) -> "Scenario":
+        self.steps.extend(ScenarioStep(line.at, 'chat', line) for line in lines)
+        return self
+
+    def raid(self, at: float, raider: str, chatters: int, seconds: float = 5.0, seed: int = 0) -> "Scenario":
+        """The raid notice, then chatters new viewers each writing once within seconds"""
+        self.steps.append(ScenarioStep(at, 'raid', (raider, chatters)))
+        lines = synthetic_chat(0, 0, raids=[Raid(at, chatters, seconds)], seed=seed)
+        return self.chat(ChatLine(line.at, f"{raider}_{line.user}", line.text, line.badges) for line in lines)
+
+    def disconnect(self, at: float) -> "Scenario":
+        self.steps.append(ScenarioStep(at, 'disconnect'))
+        return self
+
+    def reconnect(self, at: float) -> "Scenario":
+        self.steps.append(ScenarioStep(at, 'reconnect'))
+        return self
+
+    @property
+    def chat_lines(self) -> int:
+        return sum(step.action == 'chat' for step in self.steps)
@@ -0,0 +1,107 @@
+"""
+Lifecycle Management for Stream Artifact
+Coordinates ordered, deadline-bound shutdown of all subsystems
+"""
+
+import asyncio
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A shutdown step receives its time budget in seconds and may return the
+# number of queued items it had to drop
+ShutdownStep = Callable[[float], Awaitable[Optional[int]]]
+
+
+@dataclass
+class ShutdownReport:
+    """Outcome of a coordinated shutdown"""
+    completed: List[str] = field(default_factory=list)
+    timed_out: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    dropped: Dict[str, int] = field(default_factory=dict)
+    duration: float = 0.0
+
+    @property
+    def clean(self) -> bool:
+        """Whether every step finished without dropping anything"""
+        return not (self.timed_out or self.failed or any(self.dropped.values()))
+
+    def summary(self) -> str:
+        """Human readable one-line summary"""
+        parts = [f"{len(self.completed)} steps in {self.duration:.2f}s"]
+        if self.timed_out:
+            parts.append(f"timed out: {', '.join(self.timed_out)}")
+        if self.failed:
+            parts.append(f"failed: {', '.join(self.failed)}")
+        dropped = {name: count for name, count in self.dropped.items() if count}
+        if dropped:
+            parts.append("dropped: " + ", ".join(f"{name}={count}" for name, count in dropped.items()))
+        return " | ".join(parts)
+
+
+class LifecycleManager:
+    """Runs registered shutdown steps in order within an overall deadline
+
+    min_step_time is set aside for every step still to run (less if the
+    steps would not fit the deadline otherwise), so a hanging drain cannot
+    starve the steps that close resources and the whole shutdown stays
+    within the deadline. A step is told a budget step_margin seconds
+    shorter than the guard around it, so its own timeouts fire first and it
+    can still count what it dropped and stop its workers before the guard
+    cancels it.
+    """
+
+    def __init__(self, deadline: float = 10.0, min_step_time: float = 1.0, step_margin: float = 0.25):
+        self.deadline = deadline
+        self.min_step_time = min_step_time
+        self.step_margin = step_margin
+        self.steps: List[Tuple[str, ShutdownStep]] = []
+        self.is_shutting_down = False
+        self.report: Optional[ShutdownReport] = None
+
+    def register(self, name: str, step: ShutdownStep):
+        """Register a shutdown step; steps run in registration order"""
+        self.steps.append((name, step))
+
+    async def shutdown(self) -> ShutdownReport:
+        """Run every shutdown step, sharing the deadline between them"""
+        if self.is_shutting_down:
+            return self.report or ShutdownReport()
+
+        self.is_shutting_down = True
+        report = ShutdownReport()
+        start = time.monotonic()
+
+        reserve = min(self.min_step_time, self.deadline / max(len(self.steps), 1))
+        for position, (name, step) in enumerate(self.steps):
+            # Closing resources must still happen after draining ran out of
+            # time, so the later steps' share is never handed out
+            later = len(self.steps) - position - 1
+            remaining = max(self.deadline - (time.monotonic() - start) - reserve * later, reserve)
+            budget = remaining - min(self.step_margin, remaining / 2)
+
+            try:
+                dropped = await asyncio.wait_for(step(budget), remaining)
+                report.completed.append(name)
+                if dropped is not None:
+                    report.dropped[name] = dropped
+            except asyncio.TimeoutError:
+                report.timed_out.append(name)
+                logger.warning(f"⚠️ Shutdown step timed out: {name}")
+            except Exception as e:
+                report.failed[name] = str(e)
+                logger.error(f"❌ Shutdown step failed: {name}: {e}")
+
+        report.duration = time.monotonic() - start
+        self.report = report
+
+        if report.clean:
+            logger.info(f"🧹 Shutdown completed: {report.summary()}")
+        else:
+            logger.warning(f"⚠️ Shutdown completed with losses: {report.summary()}")
+
+        return report
@@ -0,0 +1,182 @@
+"""
+Logging Pipeline for Stream Artifact
+Hot threads only enqueue log records; a background thread formats and writes them
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+FILE_FORMAT = "%(asctime)s %(levelname)-8s %(name)s: %(message)s"
+
+_STOP = object()
+
+
+class EnqueueHandler(logging.Handler):
+    """Puts records on a queue untouched
+
+    Unlike logging.handlers.QueueHandler it neither formats the message nor
+    takes the handler lock, so a log call on the event loop or Tk thread
+    costs a queue put. Records are formatted later on the pipeline thread;
+    this code base logs pre-built f-strings, so that sees the same text.
+    """
+
+    def __init__(self, records: queue.SimpleQueue):
+        super().__init__()
+        self.records = records
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        self.records.put_nowait(record)
+        return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.put_nowait(record)
+
+
+class DuplicateSuppressor:
+    """Rate-limits identical records during error storms
+
+    Records at min_level or above with the same logger, level and message
+    pass burst times per window seconds; the rest are counted and reported
+    in one summary record when the window closes.
+    """
+
+    def __init__(self, window: float = 10.0, burst: int = 5, min_level: int = logging.WARNING):
+        self.window = window
+        self.burst = burst
+        self.min_level = min_level
+        self.suppressed = 0
+        # key -> [window start, records seen, a record of the key]
+        self._windows: Dict[Tuple, List] = {}
+
+    def allow(self, record: logging.LogRecord, now: float) -> Tuple[bool, List[logging.LogRecord]]:
+        """Whether to write record, and summaries of windows that closed"""
+        if record.levelno < self.min_level:
+            return True, []
+        key = (record.name, record.levelno, record.msg)
+        entry = self._windows.get(key)
+        summaries = []
+        if entry is not None and now - entry[0] >= self.window:
+            summary = self._summary(entry)
+            if summary is not None:
+                summaries.append(summary)
+            entry = None
+        if entry is None:
+            self._windows[key] = [now, 1, record]
+            return True, summaries
+        entry[1] += 1
+        if entry[1] <= self.burst:
+            return True, summaries
+        self.suppressed += 1
+        return False, summaries
+
+    def expire(self, now: float, everything: bool = False) -> List[logging.LogRecord]:
+        """Summaries of windows that closed by now (all windows if everything)"""
+        summaries = []
+        for key, entry in list(self._windows.items()):
+            if everything or now - entry[0] >= self.window:
+                del self._windows[key]
+                summary = self._summary(entry)
+                if summary is not None:
+                    summaries.append(summary)
+        return summaries
+
+    def _summary(self, entry: List) -> Optional[logging.LogRecord]:
+        _, seen, record = entry
+        repeats = seen - self.burst
+        if repeats <= 0:
+            return None
+        message = record.getMessage()
+        return logging.LogRecord(record.name, record.levelno, record.pathname, record.lineno,
+                                 f"🔁 Suppressed {repeats} more of: {message}", None, None)
+
+
+class LogPipeline:
+    """Background writer for the records an EnqueueHandler collects
+
+    The pipeline thread applies duplicate suppression and hands each record
+    to the sinks (rotating file, console), which do all formatting.
+    """
+
+    def __init__(self, suppressor: Optional[DuplicateSuppressor] = None):
+        self.records: queue.SimpleQueue = queue.SimpleQueue()
+        self.handler = EnqueueHandler(self.records)
+        self.suppressor = suppressor or DuplicateSuppressor()
+        self.console: Optional[logging.Handler] = None
+        self.file: Optional[logging.Handler] = None
+        self._sinks: Tuple[logging.Handler, ...] = ()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write every queued record and close the sinks"""
+        if self._thread is None:
+            return
+        self.records.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        for sink in self._sinks:
+            sink.close()
+
+    def set_console(self, handler: Optional[logging.Handler]) -> None:
+        """Console sink, or None to log to the file only"""
+        self.console = handler
+        self._update_sinks()
+
+    def attach_file(self, path: Path, max_bytes: int = 5 * 1024 * 1024, backups: int = 3) -> None:
+        """Also write records to a rotating file at path"""
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+        handler.setFormatter(logging.Formatter(FILE_FORMAT))
+        old, self.file = self.file, handler
+        self._update_sinks()
+        if old is not None:
+            old.close()
+
+    def _update_sinks(self) -> None:
+        # Swapped as one tuple so the writer thread never sees a half-built list
+        self._sinks = tuple(sink for sink in (self.file, self.console) if sink is not None)
+
+    def _run(self) -> None:
+        last_sweep = time.monotonic()
+        while True:
+            try:
+                record = self.records.get(timeout=1.0)
+            except queue.Empty:
+                record = None
+            if record is _STOP:
+                break
+
+            now = time.monotonic()
+            if record is not None:
+                allowed, summaries = self.suppressor.allow(record, now)
+                for summary in summaries:
+                    self._write(summary)
+                if allowed:
+                    self._write(record)
+            if now - last_sweep >= 1.0:
+                last_sweep = now
+                for summary in self.suppressor.expire(now):
+                    self._write(summary)
+
+        for summary in self.suppressor.expire(time.monotonic(), everything=True):
+            self._write(summary)
+
+    def _write(self, record: logging.LogRecord) -> None:
+        for sink in self._sinks:
+            if record.levelno >= sink.level:
+                sink.handle(record)
+
+
+# Process-wide pipeline behind the root logger (see app.configure_logging)
+pipeline = LogPipeline()
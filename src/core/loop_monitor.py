@@ -0,0 +1,142 @@
+"""
+Event Loop Monitor for Stream Artifact
+Measures asyncio scheduling lag and captures the stack of whatever blocks the loop
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+LAG_SECONDS = metrics.histogram('stream_artifact_event_loop_lag_seconds',
+                                'How late the event loop ran a timer it was due to run',
+                                buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+STALLS = metrics.counter('stream_artifact_event_loop_stalls_total', 'Times the event loop lag exceeded its budget')
+
+
+@dataclass
+class LagEvent:
+    """The event loop fell behind by more than the budget"""
+    lag: float
+    stack: Optional[str]  # the loop thread's stack while it was blocked, if captured
+    timestamp: float
+
+    @property
+    def culprit(self) -> str:
+        """Innermost frame of the captured stack"""
+        if not self.stack:
+            return "unknown"
+        lines = [line.strip() for line in self.stack.strip().splitlines() if line.strip().startswith("File ")]
+        return lines[-1] if lines else "unknown"
+
+
+class LoopMonitor:
+    """Watches the event loop for synchronous work that delays every coroutine
+
+    A heartbeat task sleeps interval seconds and records how late it wakes
+    up. A watchdog thread notices when the heartbeat is overdue by
+    capture_after seconds and captures the loop thread's stack at that
+    moment, i.e. inside the call that is blocking, so the report names the
+    culprit; asyncio's own debug-mode slow callback log only names the
+    callback afterwards and slows every callback down. Lag above lag_budget
+    is counted and kept in events; at most every warn_every seconds it is
+    also logged and delivered to subscribers on the loop thread.
+    """
+
+    def __init__(self, interval: float = 0.1, lag_budget: float = 0.25, capture_after: float = 0.1,
+                 warn_every: float = 10.0):
+        self.interval = interval
+        self.lag_budget = lag_budget
+        self.capture_after = capture_after
+        self.warn_every = warn_every
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.events: List[LagEvent] = []
+
+        self._subscribers: List[Callable[[LagEvent], None]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread: Optional[int] = None
+        self._beat = 0.0
+        self._captured: Optional[tuple] = None  # (beat, stack)
+        self._last_warning = 0.0
+
+    def subscribe(self, callback: Callable[[LagEvent], None]) -> None:
+        """Call callback with lag warnings (on the event loop thread)"""
+        self._subscribers.append(callback)
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Start the heartbeat on loop and the watchdog thread"""
+        self._loop = loop or asyncio.get_running_loop()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        while True:
+            self._beat = time.monotonic()
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            LAG_SECONDS.observe(lag)
+            if lag > self.lag_budget:
+                self._report(lag)
+
+    def _watch(self) -> None:
+        """Capture the loop thread's stack while the heartbeat is overdue"""
+        while not self._stop.wait(self.capture_after / 2):
+            beat = self._beat
+            if not beat or self._loop_thread is None:
+                continue
+            if time.monotonic() - beat < self.interval + self.capture_after:
+                continue
+            if self._captured is not None and self._captured[0] == beat:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                self._captured = (beat, "".join(traceback.format_stack(frame)))
+
+    def _report(self, lag: float) -> None:
+        stack = None
+        if self._captured is not None and self._captured[0] == self._beat:
+            stack = self._captured[1]
+        event = LagEvent(lag, stack, time.time())
+        self.events = (self.events + [event])[-50:]
+        STALLS.inc()
+
+        now = time.monotonic()
+        if now - self._last_warning < self.warn_every:
+            return
+        self._last_warning = now
+        logger.warning(f"🐢 Event loop blocked for {lag * 1000:.0f} ms in {event.culprit}")
+        if stack:
+            logger.debug(f"Blocking stack:\n{stack}")
+
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"❌ Loop lag subscriber failed: {e}")
@@ -0,0 +1,262 @@
+"""
+Metrics Registry for Stream Artifact
+Counters, gauges and histograms rendered in the Prometheus text format
+"""
+
+import math
+import threading
+import logging
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; suits everything from a SQLite commit to an OpenRouter call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Cells:
+    """Per-thread value arrays
+
+    Every thread updates only its own array, so updates need no lock; a
+    scrape adds the arrays up. The lock only guards registering a thread's
+    first array.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._arrays: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def mine(self) -> List[float]:
+        try:
+            return self._local.array
+        except AttributeError:
+            array = self._local.array = [0.0] * self._size
+            with self._lock:
+                self._arrays.append(array)
+            return array
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            arrays = list(self._arrays)
+        return [sum(values) for values in zip(*arrays)] if arrays else [0.0] * self._size
+
+
+class CounterChild:
+    """One labelled series of a counter"""
+
+    __slots__ = ('_cells',)
+
+    def __init__(self):
+        self._cells = _Cells(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._cells.mine()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+
+class GaugeChild:
+    """One labelled series of a gauge; set from one thread, or read from a function at scrape time"""
+
+    __slots__ = ('_value', '_function')
+
+    def __init__(self):
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._value -= amount
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """Report function() on every scrape instead of a stored value"""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            try:
+                return float(self._function())
+            except Exception:
+                return math.nan
+        return self._value
+
+
+class HistogramChild:
+    """One labelled series of a histogram"""
+
+    __slots__ = ('_bounds', '_cells')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        # One cell per bucket, the overflow (+Inf) bucket, then the sum
+        self._cells = _Cells(len(bounds) + 2)
+
+    def observe(self, value: float) -> None:
+        cells = self._cells.mine()
+        cells[bisect_left(self._bounds, value)] += 1
+        cells[-1] += value
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """(cumulative bucket counts, count, sum)"""
+        totals = self._cells.totals()
+        cumulative, running = [], 0.0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, running, totals[-1]
+
+
+class _Metric:
+    """A metric family: its children by label values"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+        if not self.labelnames:
+            # Unlabelled metrics act as their only child
+            default = self.labels()
+            for method in ('inc', 'dec', 'set', 'set_function', 'observe'):
+                if hasattr(default, method):
+                    setattr(self, method, getattr(default, method))
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **labels):
+        """The child for label values; hot paths should keep the returned child"""
+        if labels:
+            values = tuple(str(labels[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(value) for value in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}")
+
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _label_text(self, values: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation, quotes=False)}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child) -> List[str]:
+        return [f"{self.name}{self._label_text(values)} {_format(child.value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return CounterChild()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return GaugeChild()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return HistogramChild(self.buckets)
+
+    def _render_child(self, values, child) -> List[str]:
+        cumulative, count, total = child.snapshot()
+        lines = []
+        for bound, running in zip(self.buckets + (math.inf,), cumulative):
+            le = 'le="' + _format(bound) + '"'
+            lines.append(f"{self.name}_bucket{self._label_text(values, le)} {_format(running)}")
+        lines.append(f"{self.name}_sum{self._label_text(values)} {_format(total)}")
+        lines.append(f"{self.name}_count{self._label_text(values)} {_format(count)}")
+        return lines
+
+
+def _escape(text: str, quotes: bool = True) -> str:
+    text = text.replace("\\", "\\\\").replace("\n", "\\n")
+    return text.replace('"', '\\"') if quotes else text
+
+
+def _format(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """Every metric of the process, by name"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames, **options):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **options)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered differently")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            families = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in families:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
@@ -0,0 +1,89 @@
+"""
+Metrics Server for Stream Artifact
+Serves the metrics registry to Prometheus over HTTP
+"""
+
+import json
+import logging
+from typing import Awaitable, Callable, Optional
+
+from aiohttp import web
+
+from .metrics import MetricsRegistry, metrics
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics_handler(registry: MetricsRegistry = metrics):
+    """aiohttp handler rendering registry"""
+    async def handle(request):
+        return web.Response(body=registry.render().encode('utf-8'), headers={'Content-Type': CONTENT_TYPE})
+    return handle
+
+
+class MetricsServer:
+    """Small HTTP server exposing GET /metrics
+
+    Given a profile coroutine (seconds -> ProfileReport), it also serves
+    POST /debug/profile?seconds=N, which profiles the bot for N seconds and
+    answers with the report's summary.
+    """
+
+    MAX_PROFILE_SECONDS = 300
+
+    def __init__(self, registry: MetricsRegistry = metrics, host: str = "localhost", port: int = 9464,
+                 profile: Optional[Callable[[float], Awaitable]] = None):
+        self.host = host
+        self.port = port
+        self.profile = profile
+        self.app = web.Application()
+        self.app.router.add_get('/metrics', metrics_handler(registry))
+        if profile is not None:
+            self.app.router.add_post('/debug/profile', self._handle_profile)
+        self.runner = None
+        self.site = None
+
+    async def _handle_profile(self, request):
+        try:
+            seconds = float(request.query.get('seconds', 30))
+        except ValueError:
+            raise web.HTTPBadRequest(text="seconds must be a number")
+        if not 0 < seconds <= self.MAX_PROFILE_SECONDS:
+            raise web.HTTPBadRequest(text=f"seconds must be between 0 and {self.MAX_PROFILE_SECONDS}")
+
+        try:
+            report = await self.profile(seconds)
+        except RuntimeError as e:
+            raise web.HTTPConflict(text=str(e))
+
+        with open(report.summary_path, 'r', encoding='utf-8') as handle:
+            summary = json.load(handle)
+        summary['collapsed_path'] = str(report.collapsed_path)
+        summary['summary_path'] = str(report.summary_path)
+        return web.json_response(summary)
+
+    async def start(self):
+        """Start serving metrics"""
+        try:
+            self.runner = web.AppRunner(self.app, access_log=None)
+            await self.runner.setup()
+
+            self.site = web.TCPSite(self.runner, self.host, self.port)
+            await self.site.start()
+
+            logger.info(f"📈 Metrics available on http://{self.host}:{self.port}/metrics")
+
+        except Exception as e:
+            logger.error(f"❌ Failed to start metrics server: {e}")
+            raise
+
+    async def stop(self):
+        """Stop serving metrics"""
+        try:
+            if self.runner:
+                await self.runner.cleanup()
+            logger.info("🛑 Metrics server stopped")
+        except Exception as e:
+            logger.error(f"❌ Error stopping metrics server: {e}")
@@ -0,0 +1,412 @@
+"""
+Schema Migrations for Stream Artifact
+Versioned, ordered schema changes applied to new and existing databases
+"""
+
+import json
+import sqlite3
+import tempfile
+import time
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Set, Tuple
+
+from .badges import split_message_metadata
+
+logger = logging.getLogger(__name__)
+
+# Indexes for the hot queries. Composite where a query filters on one column
+# and orders by another, so SQLite never sorts; covering where the selected
+# columns are small enough to duplicate
+INDEXES = {
+    'idx_messages_timestamp': "messages(timestamp)",
+    'idx_messages_username': "messages(username)",
+    'idx_messages_channel_timestamp': "messages(channel, timestamp)",
+    'idx_ai_memory_username_timestamp': "ai_memory(username, timestamp)",
+    'idx_ai_memory_timestamp_relevance': "ai_memory(timestamp, relevance_score)",
+    'idx_stream_events_timestamp': "stream_events(timestamp)",
+}
+
+# Superseded by the indexes above (or by the UNIQUE constraint on
+# users.username); dropped from existing databases to keep writes cheap
+DROPPED_INDEXES = ('idx_ai_memory_username', 'idx_ai_memory_timestamp', 'idx_users_username')
+
+# FTS5 index name -> (content table, indexed columns); external-content
+# tables so the text is stored only once
+SEARCH_INDEXES = {
+    'messages_fts': ('messages', ('content',)),
+    'ai_memory_fts': ('ai_memory', ('context', 'response')),
+}
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A numbered schema change
+
+    Regular migrations run inside one transaction together with their
+    schema_version row. Online migrations run in autocommit mode so each
+    statement is its own short transaction and the bot's writes can
+    interleave; they must therefore be safe to re-run after a crash. They
+    may also be deferred until after later regular migrations, so they
+    should only build derived data (indexes, backfills).
+    """
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+    online: bool = False
+
+
+def _initial_schema(conn: sqlite3.Connection) -> None:
+    """Tables of the original schema (already present on pre-migration databases)"""
+    # Users table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            display_name TEXT,
+            user_id TEXT UNIQUE,
+            first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            message_count INTEGER DEFAULT 0,
+            is_subscriber BOOLEAN DEFAULT FALSE,
+            is_vip BOOLEAN DEFAULT FALSE,
+            is_moderator BOOLEAN DEFAULT FALSE,
+            is_regular BOOLEAN DEFAULT FALSE,
+            points INTEGER DEFAULT 0,
+            metadata TEXT DEFAULT '{}'
+        )
+    """)
+    
+    # Messages table for chat history
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            content TEXT NOT NULL,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            channel TEXT NOT NULL,
+            message_type TEXT DEFAULT 'chat',
+            metadata TEXT DEFAULT '{}'
+        )
+    """)
+    
+    # AI Memory table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ai_memory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            context TEXT NOT NULL,
+            response TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            relevance_score REAL DEFAULT 1.0,
+            memory_type TEXT DEFAULT 'conversation',
+            metadata TEXT DEFAULT '{}'
+        )
+    """)
+    
+    # Commands table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS commands (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            command TEXT UNIQUE NOT NULL,
+            response TEXT NOT NULL,
+            usage_count INTEGER DEFAULT 0,
+            is_enabled BOOLEAN DEFAULT TRUE,
+            permission_level TEXT DEFAULT 'everyone',
+            cooldown INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
+    # Stream events table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS stream_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_type TEXT NOT NULL,
+            username TEXT,
+            data TEXT DEFAULT '{}',
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            processed BOOLEAN DEFAULT FALSE
+        )
+    """)
+    
+    # Topics table for conversation tracking
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS topics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            topic TEXT NOT NULL,
+            frequency INTEGER DEFAULT 1,
+            last_mentioned TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            related_users TEXT DEFAULT '[]',
+            sentiment REAL DEFAULT 0.0
+        )
+    """)
+
+
+def _hot_query_indexes(conn: sqlite3.Connection) -> None:
+    """Composite indexes for the hot read paths"""
+    for name in DROPPED_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    for name, definition in INDEXES.items():
+        start = time.perf_counter()
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+        logger.debug(f"Built index {name} in {time.perf_counter() - start:.2f}s")
+
+
+def create_search_index(conn: sqlite3.Connection, index: str, schema: str = "main", rebuild: bool = True) -> bool:
+    """Create one FTS5 index and its sync triggers in the given schema
+    
+    Returns False when SQLite was built without FTS5. Existing rows are
+    indexed when the index is new, unless rebuild is False (the caller
+    indexes them later, see _index_search_history).
+    """
+    table, columns = SEARCH_INDEXES[index]
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    
+    existing = conn.execute(
+        f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (index,)
+    ).fetchone()
+    
+    try:
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {schema}.{index} USING fts5(
+                {column_list}, content='{table}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"⚠️ Full-text search unavailable, falling back to LIKE: {e}")
+        return False
+    
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {schema}.{index}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {index}(rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {schema}.{index}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {index}({index}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {schema}.{index}_update AFTER UPDATE OF {column_list} ON {table} BEGIN
+            INSERT INTO {index}({index}, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {index}(rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+    """)
+    
+    # Existing history has to be indexed once
+    if rebuild and not existing:
+        conn.execute(f"INSERT INTO {schema}.{index}({index}) VALUES ('rebuild')")
+    return True
+
+
+def _full_text_search(conn: sqlite3.Connection) -> None:
+    """FTS5 indexes over messages and AI memory, kept in sync by triggers
+    
+    Only new rows are indexed here; existing history is indexed by the
+    online migration after it, so upgrading a large database stays fast.
+    """
+    for index in SEARCH_INDEXES:
+        if not create_search_index(conn, index, rebuild=False):
+            return
+
+
+def _index_search_history(conn: sqlite3.Connection) -> None:
+    """Index the rows that existed before the FTS5 indexes were created
+    
+    A 'rebuild' re-reads the whole content table, so it is safe to re-run;
+    the bot's writes wait for each index's rebuild statement.
+    """
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for index in SEARCH_INDEXES:
+        if index in tables:
+            start = time.perf_counter()
+            conn.execute(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
+            logger.debug(f"Indexed history for {index} in {time.perf_counter() - start:.2f}s")
+
+
+def _message_metadata_columns(conn: sqlite3.Connection) -> None:
+    """Typed columns for the per-message fields that used to live in the JSON metadata"""
+    conn.execute("ALTER TABLE messages ADD COLUMN display_name TEXT")
+    conn.execute("ALTER TABLE messages ADD COLUMN badges INTEGER NOT NULL DEFAULT 0")
+
+
+def _backfill_message_metadata(conn: sqlite3.Connection, chunk: int = 20000) -> None:
+    """Move promoted fields out of existing JSON metadata, one short transaction per chunk"""
+    low, high = conn.execute("SELECT MIN(id), MAX(id) FROM messages").fetchone()
+    if low is None:
+        return
+    
+    for start in range(low, high + 1, chunk):
+        rows = conn.execute("""
+            SELECT id, metadata FROM messages
+            WHERE id >= ? AND id < ? AND metadata IS NOT NULL AND metadata != '{}'
+        """, (start, start + chunk)).fetchall()
+        
+        updates = []
+        for message_id, metadata in rows:
+            try:
+                display_name, mask, extras = split_message_metadata(json.loads(metadata))
+            except (ValueError, TypeError, AttributeError):
+                continue
+            updates.append((display_name, mask, json.dumps(extras) if extras else None, message_id))
+        
+        # Re-running is harmless: the moved fields are no longer in the JSON
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("""
+            UPDATE messages SET display_name = COALESCE(?, display_name), badges = badges | ?, metadata = ?
+            WHERE id = ?
+        """, updates)
+        conn.execute("COMMIT")
+
+
+# Every schema change, in order. Never edit or renumber a released
+# migration; append a new one instead.
+MIGRATIONS: Tuple[Migration, ...] = (
+    Migration(1, "initial schema", _initial_schema),
+    Migration(2, "hot query indexes", _hot_query_indexes, online=True),
+    Migration(3, "full-text search", _full_text_search),
+    Migration(4, "message metadata columns", _message_metadata_columns),
+    Migration(5, "backfill message metadata columns", _backfill_message_metadata, online=True),
+    Migration(6, "index history for full-text search", _index_search_history, online=True),
+)
+
+# Searches use the FTS5 indexes only once this migration has indexed the history
+SEARCH_HISTORY_VERSION = 6
+
+
+class MigrationRunner:
+    """Applies pending migrations to a database and records them in schema_version"""
+    
+    def __init__(self, conn: sqlite3.Connection, migrations: Tuple[Migration, ...] = MIGRATIONS):
+        # Transactions are managed explicitly
+        conn.isolation_level = None
+        self.conn = conn
+        self.migrations = tuple(sorted(migrations, key=lambda migration: migration.version))
+        
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                duration_ms REAL
+            )
+        """)
+    
+    @property
+    def current_version(self) -> int:
+        """Version up to which every migration is applied (0 for a new database)
+        
+        A deferred online migration holds this back even when later regular
+        migrations are applied; pending() lists what is left.
+        """
+        applied = self.applied_versions()
+        version = 0
+        for migration in self.migrations:
+            if migration.version not in applied:
+                break
+            version = migration.version
+        return version
+    
+    def applied_versions(self) -> Set[int]:
+        """Versions recorded in schema_version"""
+        return {row[0] for row in self.conn.execute("SELECT version FROM schema_version")}
+    
+    def pending(self) -> List[Migration]:
+        """Migrations not applied yet, in order"""
+        applied = self.applied_versions()
+        return [migration for migration in self.migrations if migration.version not in applied]
+    
+    def migrate(self, defer_online: bool = False) -> List[Tuple[Migration, float]]:
+        """Apply pending migrations in order; returns (migration, seconds) for each
+        
+        With defer_online, only regular migrations are applied so the caller
+        can mark the database ready and run the online ones in the background.
+        """
+        applied = []
+        for migration in self.pending():
+            if defer_online and migration.online:
+                continue
+            
+            elapsed = self._apply(migration)
+            applied.append((migration, elapsed))
+            logger.info(f"🗄️ Applied migration {migration.version} ({migration.name}) in {elapsed:.2f}s")
+        
+        return applied
+    
+    def _apply(self, migration: Migration) -> float:
+        """Apply one migration and record it"""
+        start = time.perf_counter()
+        
+        if migration.online:
+            migration.apply(self.conn)
+            self._record(migration, time.perf_counter() - start)
+            return time.perf_counter() - start
+        
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            migration.apply(self.conn)
+            self._record(migration, time.perf_counter() - start)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            logger.error(f"❌ Migration {migration.version} ({migration.name}) failed, rolled back")
+            raise
+        
+        return time.perf_counter() - start
+    
+    def _record(self, migration: Migration, elapsed: float) -> None:
+        """Insert the schema_version row for a migration"""
+        self.conn.execute(
+            "INSERT INTO schema_version (version, name, duration_ms) VALUES (?, ?, ?)",
+            (migration.version, migration.name, elapsed * 1000)
+        )
+
+
+def dry_run(db_path: Path, migrations: Tuple[Migration, ...] = MIGRATIONS) -> Tuple[int, List[Tuple[Migration, float]]]:
+    """Time the pending migrations against a throwaway copy of the database
+    
+    Returns the copy's version before migrating and the per-migration timings.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        copy_path = Path(tmp) / "dry_run.db"
+        
+        if Path(db_path).exists():
+            source = sqlite3.connect(str(db_path))
+            target = sqlite3.connect(str(copy_path))
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+        
+        conn = sqlite3.connect(str(copy_path))
+        try:
+            runner = MigrationRunner(conn, migrations)
+            return runner.current_version, runner.migrate()
+        finally:
+            conn.close()
+
+
+def format_report(results: List[Tuple[Migration, float]], current_version: Optional[int] = None) -> str:
+    """Human readable migration timing report"""
+    lines = ["🗄️ Schema migrations"]
+    if current_version is not None:
+        lines.append(f"  Current version: {current_version}")
+    
+    if not results:
+        lines.append("  Up to date")
+    for migration, elapsed in results:
+        mode = "online" if migration.online else "blocking"
+        lines.append(f"  {migration.version:4d}  {elapsed * 1000:10.1f} ms  {mode:8}  {migration.name}")
+    
+    if results:
+        total = sum(elapsed for _, elapsed in results)
+        blocking = sum(elapsed for migration, elapsed in results if not migration.online)
+        lines.append(f"  Total {total:.2f}s, of which {blocking:.2f}s before the database is ready")
+    return "\n".join(lines)
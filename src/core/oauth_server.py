@@ -14,6 +14,8 @@ import secrets
 import hashlib
 import base64
 
+from .metrics_server import metrics_handler
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,6 +42,7 @@ class OAuthServer:
         self.app.router.add_get('/auth/openrouter', self._handle_openrouter_callback)
         self.app.router.add_get('/success', self._handle_success)
         self.app.router.add_get('/error', self._handle_error)
+        self.app.router.add_get('/metrics', metrics_handler())
         
         # Serve static files for OAuth pages
         self.app.router.add_static('/', path='assets/oauth', name='oauth')
@@ -0,0 +1,208 @@
+"""
+Message Partitions for Stream Artifact
+Monthly chat history files that are archived compressed and dropped whole
+"""
+
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .metrics import metrics
+from .migrations import INDEXES, create_search_index
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = metrics.counter('stream_artifact_cache_requests_total', 'Cache lookups', ('cache', 'result'))
+_RESTORE_HITS = CACHE_REQUESTS.labels('partition_restore', 'hit')
+_RESTORE_MISSES = CACHE_REQUESTS.labels('partition_restore', 'miss')
+
+# Messages written before partitioning live in the main database's table
+LEGACY_PARTITION = "legacy"
+
+PARTITION_FILE = re.compile(r"^messages_(\d{4}_\d{2})\.db$")
+ARCHIVE_FILE = re.compile(r"^messages_(\d{4}_\d{2})\.db\.gz$")
+
+
+def partition_key(when: datetime) -> str:
+    """Partition holding messages written at the given UTC time"""
+    return when.strftime("%Y_%m")
+
+
+def partition_bounds(key: str) -> Tuple[str, str]:
+    """[start, end) of a partition as CURRENT_TIMESTAMP-style strings"""
+    year, month = (int(part) for part in key.split("_"))
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01 00:00:00", f"{next_year:04d}-{next_month:02d}-01 00:00:00"
+
+
+def partition_schema(key: str) -> str:
+    """Name a partition is attached under"""
+    return "main" if key == LEGACY_PARTITION else f"p_{key}"
+
+
+def create_partition_schema(conn: sqlite3.Connection, schema: str) -> None:
+    """Current messages table, its hot-query indexes and its search index
+
+    Partitions are created with the latest shape of the messages table; a
+    migration that changes that table has to upgrade partition files too.
+    """
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            content TEXT NOT NULL,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            channel TEXT NOT NULL,
+            message_type TEXT DEFAULT 'chat',
+            metadata TEXT DEFAULT '{{}}',
+            display_name TEXT,
+            badges INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+    for name, definition in INDEXES.items():
+        if definition.startswith("messages("):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {schema}.{name} ON {definition}")
+
+    create_search_index(conn, 'messages_fts', schema)
+
+
+class PartitionStore:
+    """Files of the monthly message partitions
+
+    The newest live_partitions months are plain SQLite files the bot keeps
+    attached. Older months are gzip-compressed into archive/ and restored
+    into restored/ only when a query asks for them. Retention deletes a
+    month's files instead of deleting rows.
+    """
+
+    def __init__(self, directory: Path, live_partitions: int = 3):
+        self.directory = Path(directory)
+        self.archive_dir = self.directory / "archive"
+        self.restore_dir = self.directory / "restored"
+        self.live_partitions = live_partitions
+
+    @classmethod
+    def for_database(cls, db_path: Path, **kwargs) -> "PartitionStore":
+        """Partition store that sits next to a database file"""
+        db_path = Path(db_path)
+        return cls(db_path.parent / f"{db_path.stem}_partitions", **kwargs)
+
+    def path(self, key: str) -> Path:
+        """Live file of a partition"""
+        return self.directory / f"messages_{key}.db"
+
+    def archive_path(self, key: str) -> Path:
+        """Compressed archive of a partition"""
+        return self.archive_dir / f"messages_{key}.db.gz"
+
+    def restored_path(self, key: str) -> Path:
+        """Decompressed copy of an archived partition"""
+        return self.restore_dir / f"messages_{key}.db"
+
+    @staticmethod
+    def _keys(directory: Path, pattern) -> List[str]:
+        """Partition keys of the matching files in a directory, newest first"""
+        if not directory.exists():
+            return []
+        keys = [match.group(1) for match in map(pattern.match, os.listdir(directory)) if match]
+        return sorted(keys, reverse=True)
+
+    def live_keys(self) -> List[str]:
+        """Live partitions, newest first"""
+        return self._keys(self.directory, PARTITION_FILE)
+
+    def archived_keys(self) -> List[str]:
+        """Archived partitions, newest first"""
+        return self._keys(self.archive_dir, ARCHIVE_FILE)
+
+    def create(self, key: str, last_id: int = 0) -> Path:
+        """Create a partition file; ids continue after last_id so they stay unique"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+
+        conn = sqlite3.connect(str(path))
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            create_partition_schema(conn, "main")
+            if last_id and not conn.execute("SELECT 1 FROM sqlite_sequence WHERE name = 'messages'").fetchone():
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('messages', ?)", (last_id,))
+            conn.commit()
+        finally:
+            conn.close()
+
+        logger.info(f"🗂️ Created message partition {key}")
+        return path
+
+    def archive(self, key: str) -> Path:
+        """Compress a live partition (which must be detached) and remove the live file"""
+        path = self.path(key)
+        archive_path = self.archive_path(key)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+
+        # Fold the WAL back in so the single file is complete
+        conn = sqlite3.connect(str(path))
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            conn.close()
+
+        partial = archive_path.with_suffix(".gz.partial")
+        with open(path, 'rb') as source, gzip.open(partial, 'wb') as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        os.replace(partial, archive_path)
+        path.unlink()
+
+        logger.info(f"🗜️ Archived message partition {key} "
+                    f"({archive_path.stat().st_size / 1024 / 1024:.1f} MB compressed)")
+        return archive_path
+
+    def restore(self, key: str, directory: Optional[Path] = None) -> Path:
+        """Decompress an archived partition for querying (cached until cleared)"""
+        restored = self.restored_path(key) if directory is None else Path(directory) / f"messages_{key}.db"
+        if restored.exists():
+            _RESTORE_HITS.inc()
+            return restored
+        _RESTORE_MISSES.inc()
+
+        restored.parent.mkdir(parents=True, exist_ok=True)
+        partial = restored.with_suffix(".partial")
+        with gzip.open(self.archive_path(key), 'rb') as source, open(partial, 'wb') as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        os.replace(partial, restored)
+        return restored
+
+    def clear_restored(self) -> None:
+        """Delete decompressed copies of archived partitions"""
+        if self.restore_dir.exists():
+            shutil.rmtree(self.restore_dir, ignore_errors=True)
+
+    def drop(self, key: str) -> None:
+        """Delete every file of a partition"""
+        for path in (self.path(key), self.archive_path(key), self.restored_path(key)):
+            for candidate in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+                if candidate.exists():
+                    candidate.unlink()
+        logger.info(f"🗑️ Dropped message partition {key}")
+
+    def expired(self, cutoff: str) -> List[str]:
+        """Partitions (live or archived) that end before the cutoff timestamp"""
+        keys = set(self.live_keys()) | set(self.archived_keys())
+        return sorted(key for key in keys if partition_bounds(key)[1] <= cutoff)
+
+    def overlapping(self, keys: List[str], since: Optional[str], until: Optional[str]) -> List[str]:
+        """The keys whose month intersects [since, until)"""
+        result = []
+        for key in keys:
+            start, end = partition_bounds(key)
+            if (since and end <= since) or (until and start >= until):
+                continue
+            result.append(key)
+        return result
@@ -0,0 +1,140 @@
+"""
+Startup Profiler for Stream Artifact
+Measures per-module import time and subsystem initialization during startup
+"""
+
+import builtins
+import importlib.util
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Environment variable / command line flag that switch profiling on
+PROFILE_ENV_VAR = "STREAM_ARTIFACT_PROFILE_STARTUP"
+PROFILE_FLAG = "--profile-startup"
+
+
+class StartupProfiler:
+    """Records import and init timings for the startup path"""
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = time.perf_counter()
+
+        # module name -> (cumulative seconds, self seconds)
+        self.import_times: Dict[str, Tuple[float, float]] = {}
+        self.stage_times: List[Tuple[str, float]] = []
+        self.marks: List[Tuple[str, float]] = []
+
+        self._original_import = None
+        self._thread_id: Optional[int] = None
+        self._child_time_stack: List[float] = []
+
+    def enable(self):
+        """Start recording imports made on the calling thread"""
+        if self.enabled:
+            return
+
+        self.enabled = True
+        self.started_at = time.perf_counter()
+        self._thread_id = threading.get_ident()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def disable(self):
+        """Stop recording imports"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """Replacement for builtins.__import__ that times first-time imports"""
+        if threading.get_ident() != self._thread_id:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        full_name = name
+        if level:
+            try:
+                package = (globals or {}).get('__package__') or ''
+                full_name = importlib.util.resolve_name('.' * level + name, package)
+            except (ImportError, ValueError):
+                pass
+
+        # Already loaded modules cost nothing worth reporting
+        if full_name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._child_time_stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            child_time = self._child_time_stack.pop()
+            if self._child_time_stack:
+                self._child_time_stack[-1] += elapsed
+            if full_name not in self.import_times:
+                self.import_times[full_name] = (elapsed, elapsed - child_time)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time an initialization stage"""
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_times.append((name, time.perf_counter() - start))
+
+    def mark(self, name: str):
+        """Record a milestone relative to profiler start"""
+        if self.enabled:
+            self.marks.append((name, time.perf_counter() - self.started_at))
+
+    def report(self, top: int = 15) -> str:
+        """Build a human readable startup report"""
+        lines = ["🚀 Startup profile"]
+
+        lines.append(f"  Slowest imports (top {top}, cumulative / self ms):")
+        slowest = sorted(self.import_times.items(), key=lambda item: item[1][0], reverse=True)
+        for module_name, (cumulative, self_time) in slowest[:top]:
+            lines.append(f"    {cumulative * 1000:8.1f} / {self_time * 1000:7.1f}  {module_name}")
+
+        if self.stage_times:
+            lines.append("  Init stages (ms):")
+            for name, elapsed in self.stage_times:
+                lines.append(f"    {elapsed * 1000:8.1f}  {name}")
+
+        if self.marks:
+            lines.append("  Milestones (ms since start):")
+            for name, elapsed in self.marks:
+                lines.append(f"    {elapsed * 1000:8.1f}  {name}")
+
+        return "\n".join(lines)
+
+    def log_report(self, top: int = 15):
+        """Write the startup report to the log and stop recording"""
+        if not self.enabled:
+            return
+
+        self.disable()
+        logger.info(self.report(top))
+
+
+def is_profiling_requested(argv: Optional[List[str]] = None) -> bool:
+    """Check whether startup profiling was requested"""
+    argv = sys.argv if argv is None else argv
+    return PROFILE_FLAG in argv or os.environ.get(PROFILE_ENV_VAR, "") not in ("", "0")
+
+
+# Shared profiler instance used across the startup path
+profiler = StartupProfiler()
@@ -0,0 +1,237 @@
+"""
+Tracing for Stream Artifact
+Sampled per-message spans, kept for the UI and exported to a rotating JSONL file
+"""
+
+import atexit
+import json
+import queue
+import threading
+import time
+import logging
+from collections import deque
+from contextvars import ContextVar
+from pathlib import Path
+from random import getrandbits, random
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# The span code is running in; asyncio copies it into tasks it creates
+_current: ContextVar[Optional["Span"]] = ContextVar("stream_artifact_span", default=None)
+
+
+class _NoopSpan:
+    """Stands in for a span that is not sampled; falsy, and every method does nothing"""
+
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def end(self, error: Optional[str] = None) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """One timed operation of a trace"""
+
+    __slots__ = ('tracer', 'trace_id', 'span_id', 'parent_id', 'name', 'attributes',
+                 'start', 'duration', 'error', '_started', '_token')
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: Optional[str], attributes: Dict):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = f"{getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = time.time()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        _current.reset(self._token)
+        self.end(f"{exc_type.__name__}: {exc}" if exc_type else None)
+        return False
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def end(self, error: Optional[str] = None) -> None:
+        """Finish the span (once); used directly for spans that end in another task"""
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._started
+        self.error = error
+        self.tracer._finish(self)
+
+    def to_dict(self) -> Dict:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'duration_ms': round(self.duration * 1000, 3),
+            'error': self.error,
+            'attributes': self.attributes,
+        }
+
+
+_STOP = object()
+
+
+class JsonlExporter:
+    """Appends finished spans to a JSON-lines file, rotating it at max_bytes
+
+    export() only queues the span. A background thread serializes and
+    writes spans, flushing whenever it has caught up, so the event loop
+    never waits for the disk.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 5 * 1024 * 1024, backups: int = 3):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.spans: queue.SimpleQueue = queue.SimpleQueue()
+        self._file = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def export(self, span: Span) -> None:
+        self.spans.put_nowait(span)
+        if self._thread is None:
+            self._start()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            span = self.spans.get()
+            if span is _STOP:
+                break
+            try:
+                self._write(span)
+                if self.spans.empty():
+                    self._file.flush()
+            except Exception as e:
+                logger.error(f"❌ Failed to export span: {e}")
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        if self._file.tell() + len(line) > self.max_bytes:
+            self._rotate()
+        self._file.write(line)
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{index}")
+            if older.exists():
+                older.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backups:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write every queued span and close the file"""
+        with self._lock:
+            if self._thread is None:
+                return
+            self.spans.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+
+class Tracer:
+    """Starts sampled traces and collects their spans
+
+    trace() decides once per chat message whether it is recorded; every
+    span() below an unsampled (or absent) trace is the shared no-op span,
+    so with sampling off tracing costs one comparison per message. Finished
+    spans go to the exporter and to a ring buffer the UI reads.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, exporter: Optional[JsonlExporter] = None, keep: int = 2000):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self.finished: deque = deque(maxlen=keep)
+
+    def configure(self, sample_rate: float, exporter: Optional[JsonlExporter] = None) -> None:
+        self.sample_rate = sample_rate
+        if exporter is not None:
+            if self.exporter is not None:
+                self.exporter.close()
+            self.exporter = exporter
+
+    def trace(self, name: str, **attributes):
+        """Root span of a new trace, or the no-op span when this one is not sampled"""
+        if self.sample_rate <= 0 or random() >= self.sample_rate:
+            return NOOP_SPAN
+        return Span(self, name, f"{getrandbits(64):016x}", None, attributes)
+
+    def span(self, name: str, parent: Optional[Span] = None, **attributes):
+        """Child of parent (the current span by default), or the no-op span outside a sampled trace"""
+        if parent is None:
+            parent = _current.get()
+            if parent is None:
+                return NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+    @staticmethod
+    def current() -> Optional[Span]:
+        """The span code is running in, to hand to work continued in another task"""
+        return _current.get()
+
+    def _finish(self, span: Span) -> None:
+        self.finished.append(span)
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+    def recent_traces(self, limit: int = 50) -> List[List[Span]]:
+        """Spans of the most recent traces, newest trace first, each ordered by start"""
+        traces: Dict[str, List[Span]] = {}
+        for span in reversed(list(self.finished)):
+            if span.trace_id not in traces:
+                if len(traces) == limit:
+                    continue
+                traces[span.trace_id] = []
+            traces[span.trace_id].append(span)
+        return [sorted(spans, key=lambda span: span.start) for spans in traces.values()]
+
+
+# Process-wide tracer; sampling is off until configured
+tracer = Tracer()
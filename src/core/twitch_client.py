@@ -5,6 +5,7 @@ Handles Twitch chat connection and message processing
 
 import asyncio
 import random
+import time
 import logging
 from typing import Optional, Dict, List, Callable
 from datetime import datetime, timedelta
@@ -12,13 +13,29 @@ from datetime import datetime, timedelta
 import twitchio
 from twitchio.ext import commands
 
+from .metrics import metrics
+from .tracing import tracer
+
 logger = logging.getLogger(__name__)
 
+MESSAGES_RECEIVED = metrics.counter('stream_artifact_chat_messages_received_total',
+                                    'Chat messages received', ('type',))
+MESSAGES_SENT = metrics.counter('stream_artifact_chat_messages_sent_total', 'Chat messages sent', ('type',))
+SEND_FAILURES = metrics.counter('stream_artifact_chat_send_failures_total', 'Chat messages that failed to send')
+SEND_QUEUE_SECONDS = metrics.histogram('stream_artifact_chat_send_queue_seconds',
+                                       'Time outbound messages waited for the send worker')
+SEND_SECONDS = metrics.histogram('stream_artifact_chat_send_seconds', 'Time to send one chat message')
+SEND_QUEUE_DEPTH = metrics.gauge('stream_artifact_chat_send_queue_depth', 'Outbound chat messages waiting')
+
+# Resolved once: event_message runs for every chat line
+_RECEIVED_CHAT = MESSAGES_RECEIVED.labels('chat')
+_RECEIVED_COMMAND = MESSAGES_RECEIVED.labels('command')
+
 
 class TwitchClient(commands.Bot):
     """Enhanced Twitch bot client with AI integration"""
     
-    def __init__(self, channel: str, token: str, ai_client, database=None):
+    def __init__(self, channel: str, token: str, ai_client, database=None, ui_bridge=None):
         # Initialize the bot
         super().__init__(
             token=token,
@@ -29,10 +46,24 @@ class TwitchClient(commands.Bot):
         self.target_channel = channel
         self.ai_client = ai_client
         self.database = database
+        self.ui_bridge = ui_bridge
         self.is_connected = False
+        self.accepting_messages = True
+        
+        # Outbound chat messages as (channel, text, message_type, queued_at), sent by _send_worker
         self.message_queue = asyncio.Queue()
+        SEND_QUEUE_DEPTH.set_function(self.message_queue.qsize)
+        self._send_task: Optional[asyncio.Task] = None
         self.last_ai_response = datetime.now() - timedelta(seconds=30)
         
+        # Read for every chat message, so kept as a plain attribute that
+        # follows the setting through a subscription
+        self._config = getattr(ai_client, 'config', None)
+        self.random_reply_chance = 0.0
+        if self._config is not None:
+            self.random_reply_chance = self._config.ai.random_reply_chance
+            self._config.subscribe('ai.random_reply_chance', self._on_reply_chance_changed)
+        
         # Command cooldowns
         self.command_cooldowns: Dict[str, datetime] = {}
         self.user_cooldowns: Dict[str, datetime] = {}
@@ -50,21 +81,48 @@ class TwitchClient(commands.Bot):
     async def event_ready(self):
         """Called when the bot is ready"""
         self.is_connected = True
+        
+        if self._send_task is None or self._send_task.done():
+            self._send_task = asyncio.get_running_loop().create_task(self._send_worker())
+        
         logger.info(f"🎮 Connected to Twitch as {self.nick}")
         logger.info(f"📺 Joining channel: {self.target_channel}")
     
     async def event_message(self, message):
         """Handle incoming messages"""
-        # Skip messages from the bot itself
-        if message.echo:
+        # Skip messages from the bot itself, and everything once shutdown began
+        if message.echo or not self.accepting_messages:
             return
         
+        # With tracing off not even a no-op span is entered
+        if not tracer.sample_rate:
+            await self._handle_message(message)
+            return
+        
+        with tracer.trace("chat.message", channel=message.channel.name, user=message.author.name):
+            await self._handle_message(message)
+    
+    async def _handle_message(self, message):
+        """Process one chat message (inside its trace, when sampled)"""
         # Update statistics
         self.stats['messages_received'] += 1
+        is_command = message.content.startswith('!')
+        (_RECEIVED_COMMAND if is_command else _RECEIVED_CHAT).inc()
         
-        # Store message in database
+        # Hand off to the UI (batched on the Tk thread)
+        if self.ui_bridge:
+            self.ui_bridge.post_message(
+                username=message.author.display_name or message.author.name,
+                message=message.content,
+                message_type='command' if is_command else 'chat',
+                user_badges=self._ui_badges(message.author)
+            )
+            self.ui_bridge.post_stats(dict(self.stats))
+        
+        # Store message in database (batched, does not block chat handling)
         if self.database:
-            await self.database.add_message(
+            persist = tracer.span("db.persist")
+            self.database.queue_message(
                 username=message.author.name,
                 content=message.content,
                 channel=message.channel.name,
@@ -74,13 +132,12 @@ class TwitchClient(commands.Bot):
                     'is_subscriber': message.author.is_subscriber,
                     'is_vip': message.author.is_vip,
                     'is_mod': message.author.is_mod,
-                    'badges': [badge.name for badge in message.author.badges] if message.author.badges else []
+                    'badges': list(message.author.badges) if message.author.badges else []
                 }
             )
-        
-        # Update user info
-        if self.database:
-            await self.database.add_user(
+            
+            # Update user info
+            self.database.queue_user(
                 username=message.author.name,
                 display_name=message.author.display_name,
                 user_id=str(message.author.id),
@@ -88,14 +145,24 @@ class TwitchClient(commands.Bot):
                 is_vip=message.author.is_vip,
                 is_moderator=message.author.is_mod
             )
+            
+            # The span ends when the batch holding these writes commits
+            if persist:
+                self.database.queue_callback(persist.end)
         
         # Handle commands
-        if message.content.startswith('!'):
+        if is_command:
             await self.handle_command(message)
         else:
             # Check for AI response opportunity
             await self.check_ai_response(message)
     
+    async def event_command_error(self, context, error):
+        """Commands are answered by handle_command; twitchio's own lookup misses are expected"""
+        if isinstance(error, commands.CommandNotFound):
+            return
+        logger.error(f"❌ Command error: {error}")
+    
     async def handle_command(self, message):
         """Handle bot commands"""
         command = message.content.lower().split()[0][1:]  # Remove '!' prefix
@@ -142,47 +209,38 @@ class TwitchClient(commands.Bot):
                 )
                 
                 if response:
-                    await message.channel.send(f"@{message.author.display_name} {response}")
+                    self.queue_send(f"@{message.author.display_name} {response}", message.channel.name, 'ai_response')
                     self.stats['ai_responses_sent'] += 1
                 else:
-                    await message.channel.send(f"@{message.author.display_name} Sorry, I'm having trouble thinking right now! 🤔")
+                    self.queue_send(f"@{message.author.display_name} Sorry, I'm having trouble thinking right now! 🤔", message.channel.name)
             else:
-                await message.channel.send(f"@{message.author.display_name} AI is not available right now!")
+                self.queue_send(f"@{message.author.display_name} AI is not available right now!", message.channel.name)
                 
         except Exception as e:
             logger.error(f"❌ Error handling AI command: {e}")
-            await message.channel.send(f"@{message.author.display_name} Oops! Something went wrong! 😅")
+            self.queue_send(f"@{message.author.display_name} Oops! Something went wrong! 😅", message.channel.name)
     
     async def handle_help_command(self, message):
         """Handle help command"""
         help_text = "🤖 Available commands: !ai <question>, !help, !stats, !uptime | I also respond naturally to chat!"
-        await message.channel.send(help_text)
+        self.queue_send(help_text, message.channel.name)
     
     async def handle_stats_command(self, message):
         """Handle stats command"""
         uptime = datetime.now() - self.stats['uptime']
         stats_text = f"📊 Messages: {self.stats['messages_received']} | AI Responses: {self.stats['ai_responses_sent']} | Commands: {self.stats['commands_processed']} | Uptime: {self.format_duration(uptime)}"
-        await message.channel.send(stats_text)
+        self.queue_send(stats_text, message.channel.name)
     
     async def handle_uptime_command(self, message):
         """Handle uptime command"""
         uptime = datetime.now() - self.stats['uptime']
-        await message.channel.send(f"⏱️ Bot uptime: {self.format_duration(uptime)}")
+        self.queue_send(f"⏱️ Bot uptime: {self.format_duration(uptime)}", message.channel.name)
     
     async def check_ai_response(self, message):
         """Check if bot should respond to regular chat"""
         try:
-            # Skip if AI client is not available
-            if not self.ai_client:
-                return
-            
-            # Get AI configuration
-            ai_config = self.ai_client.config.ai if hasattr(self.ai_client, 'config') else None
-            if not ai_config:
-                return
-            
-            # Check if random responses are enabled
-            if not hasattr(ai_config, 'random_reply_chance') or ai_config.random_reply_chance <= 0:
+            # Skip if AI client is not available or random responses are disabled
+            if not self.ai_client or self.random_reply_chance <= 0:
                 return
             
             # Check cooldown (prevent spam)
@@ -190,7 +248,7 @@ class TwitchClient(commands.Bot):
                 return
             
             # Random chance to respond
-            if random.random() < ai_config.random_reply_chance:
+            if random.random() < self.random_reply_chance:
                 response = await self.ai_client.get_response(
                     prompt=message.content,
                     username=message.author.name,
@@ -206,7 +264,7 @@ class TwitchClient(commands.Bot):
                 )
                 
                 if response:
-                    await message.channel.send(response)
+                    self.queue_send(response, message.channel.name, 'ai_response')
                     self.stats['ai_responses_sent'] += 1
                     self.last_ai_response = datetime.now()
                     
@@ -248,31 +306,114 @@ class TwitchClient(commands.Bot):
         else:
             return f"{seconds}s"
     
-    async def send_message(self, message: str, channel: str = None):
+    async def send_message(self, message: str, channel: str = None) -> bool:
         """Send a message to chat"""
         try:
             target_channel = channel or self.target_channel
             channel_obj = self.get_channel(target_channel)
             
             if channel_obj:
+                start = time.perf_counter()
                 await channel_obj.send(message)
+                SEND_SECONDS.observe(time.perf_counter() - start)
                 logger.info(f"📤 Sent message to {target_channel}: {message}")
+                return True
             else:
                 logger.error(f"❌ Channel {target_channel} not found")
                 
         except Exception as e:
             logger.error(f"❌ Failed to send message: {e}")
+        
+        SEND_FAILURES.inc()
+        return False
+    
+    def queue_send(self, message: str, channel: str = None, message_type: str = 'system'):
+        """Queue a message for the outbound send worker"""
+        if not self.accepting_messages:
+            logger.warning(f"⚠️ Shutting down, not sending: {message}")
+            return
+        
+        self.message_queue.put_nowait(
+            (channel or self.target_channel, message, message_type, time.perf_counter(), tracer.current())
+        )
+    
+    async def _send_worker(self):
+        """Send queued outbound messages in order"""
+        while True:
+            channel, message, message_type, queued_at, trace_parent = await self.message_queue.get()
+            try:
+                waited = time.perf_counter() - queued_at
+                SEND_QUEUE_SECONDS.observe(waited)
+                with tracer.span("chat.send", trace_parent, channel=channel, queued_ms=round(waited * 1000, 3)):
+                    sent = await self.send_message(message, channel)
+                if sent:
+                    MESSAGES_SENT.labels(message_type).inc()
+                
+                if self.ui_bridge:
+                    # Only what reached Twitch is shown as said by the bot
+                    if sent:
+                        self.ui_bridge.post_message(self.nick or 'StreamArtifact', message, message_type)
+                    else:
+                        self.ui_bridge.post_message('System', f"❌ Not sent to {channel}: {message}", 'system')
+                    self.ui_bridge.post_stats(dict(self.stats))
+            finally:
+                self.message_queue.task_done()
+    
+    @staticmethod
+    def _ui_badges(author) -> List[str]:
+        """Badge names understood by the chat window"""
+        badges = []
+        if author.is_subscriber:
+            badges.append('subscriber')
+        if author.is_vip:
+            badges.append('vip')
+        if author.is_mod:
+            badges.append('moderator')
+        return badges
+    
+    def stop_ingest(self):
+        """Stop handling incoming chat and queueing new outbound messages"""
+        self.accepting_messages = False
+        logger.info("🛑 Chat ingest stopped")
+    
+    async def drain_outbound(self, timeout: Optional[float] = None) -> int:
+        """Send queued messages; returns the number dropped on timeout"""
+        dropped = 0
+        
+        if self._send_task and not self._send_task.done():
+            try:
+                await asyncio.wait_for(self.message_queue.join(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._send_task.cancel()
+            await asyncio.gather(self._send_task, return_exceptions=True)
+        
+        while not self.message_queue.empty():
+            self.message_queue.get_nowait()
+            self.message_queue.task_done()
+            dropped += 1
+        
+        if dropped:
+            logger.warning(f"⚠️ Dropped {dropped} unsent chat messages")
+        
+        return dropped
     
     async def connect(self):
-        """Connect to Twitch"""
+        """Connect to Twitch (returns once logged in; chat is read in the background)"""
         try:
-            await self.start()
+            # Not self.start(): twitchio's start() calls connect() and would recurse
+            await super().connect()
         except Exception as e:
             logger.error(f"❌ Failed to connect to Twitch: {e}")
             raise
     
+    def _on_reply_chance_changed(self, change) -> None:
+        self.random_reply_chance = change.new
+    
     async def disconnect(self):
         """Disconnect from Twitch"""
+        if self._config is not None:
+            self._config.unsubscribe('ai.random_reply_chance', self._on_reply_chance_changed)
         try:
             await self.close()
             self.is_connected = False
@@ -280,6 +421,19 @@ class TwitchClient(commands.Bot):
         except Exception as e:
             logger.error(f"❌ Error disconnecting: {e}")
     
+    async def apply_config(self, event) -> None:
+        """Follow a reloaded configuration without reconnecting where possible"""
+        channel = event.get('twitch.channel')
+        if channel and channel.new and channel.new != self.target_channel:
+            if self.is_connected:
+                await self.part_channels([self.target_channel])
+                await self.join_channels([channel.new])
+            logger.info(f"📺 Switched channel: {self.target_channel} -> {channel.new}")
+            self.target_channel = channel.new
+        
+        if event.get('twitch.token') or event.get('twitch.username'):
+            logger.warning("⚠️ Twitch credentials changed; reconnect to use them")
+    
     def get_stats(self) -> Dict:
         """Get bot statistics"""
         uptime = datetime.now() - self.stats['uptime']
@@ -0,0 +1,143 @@
+"""
+Chat Index for Stream Artifact
+In-memory inverted indexes over the chat messages retained by the UI
+"""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+TOKEN_PATTERN = re.compile(r"@?\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; @mentions are indexed with and without the @"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        if token.startswith("@") and len(token) > 1:
+            tokens.append(token[1:])
+    return tokens
+
+
+class ChatIndex:
+    """Bounded message store with incremental user, type and token indexes
+
+    Every message gets an increasing sequence number and every posting list
+    is kept in sequence order, so evicting the oldest message only ever
+    pops from the left of the lists it appears in.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.messages: deque = deque()
+        self.first_seq = 0
+        self.next_seq = 0
+
+        self.by_user: Dict[str, deque] = {}
+        self.by_type: Dict[str, deque] = {}
+        self.by_token: Dict[str, deque] = {}
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def _keys(self, msg: Dict):
+        """(index, key) pairs a message is posted under"""
+        yield self.by_user, msg['username'].lower()
+        yield self.by_type, msg.get('type', 'chat')
+        for token in set(tokenize(msg['message'])):
+            yield self.by_token, token
+
+    def add(self, msg: Dict) -> int:
+        """Index a message, evicting the oldest when full; returns its sequence number"""
+        if len(self.messages) >= self.capacity:
+            self._evict_oldest()
+
+        seq = self.next_seq
+        self.next_seq += 1
+        msg['seq'] = seq
+        self.messages.append(msg)
+
+        for index, key in self._keys(msg):
+            postings = index.get(key)
+            if postings is None:
+                postings = index[key] = deque()
+            postings.append(seq)
+
+        return seq
+
+    def _evict_oldest(self):
+        """Drop the oldest message from the store and every posting list"""
+        msg = self.messages.popleft()
+        self.first_seq = msg['seq'] + 1
+
+        for index, key in self._keys(msg):
+            postings = index[key]
+            postings.popleft()
+            if not postings:
+                del index[key]
+
+    def clear(self):
+        """Remove all messages"""
+        self.messages.clear()
+        self.by_user.clear()
+        self.by_type.clear()
+        self.by_token.clear()
+        self.first_seq = self.next_seq
+
+    def get(self, seq: int) -> Optional[Dict]:
+        """Message by sequence number, if still retained"""
+        position = seq - self.first_seq
+        if 0 <= position < len(self.messages):
+            return self.messages[position]
+        return None
+
+    def search(self, query: str = "", username: str = None, message_type: str = None,
+               limit: int = None) -> List[Dict]:
+        """Messages matching every query token and the optional user/type, oldest first"""
+        postings = []
+        if username:
+            postings.append(self.by_user.get(username.lower(), ()))
+        if message_type:
+            postings.append(self.by_type.get(message_type, ()))
+        for token in set(tokenize(query)):
+            postings.append(self.by_token.get(token, ()))
+
+        if not postings:
+            seqs = range(self.first_seq, self.next_seq)
+        else:
+            seqs = self._intersect(postings)
+
+        results = [self.get(seq) for seq in seqs]
+        if limit is not None:
+            results = results[-limit:]
+        return results
+
+    def mentions(self, username: str) -> List[Dict]:
+        """Messages that @mention the given user"""
+        return self.search(f"@{username.lstrip('@')}")
+
+    def matches(self, msg: Dict, query: str = "", username: str = None, message_type: str = None) -> bool:
+        """Whether a single message satisfies a search"""
+        if username and msg['username'].lower() != username.lower():
+            return False
+        if message_type and msg.get('type', 'chat') != message_type:
+            return False
+        if query:
+            tokens = set(tokenize(msg['message']))
+            return all(token in tokens for token in tokenize(query))
+        return True
+
+    @staticmethod
+    def _intersect(postings: List[Iterable[int]]) -> List[int]:
+        """Intersect sorted posting lists, smallest first"""
+        postings = sorted(postings, key=len)
+        if not postings[0]:
+            return []
+
+        result = set(postings[0])
+        for other in postings[1:]:
+            result.intersection_update(other)
+            if not result:
+                return []
+        return sorted(result)
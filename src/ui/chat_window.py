@@ -6,15 +6,37 @@ Displays live chat with cyberpunk styling
 import tkinter as tk
 from tkinter import scrolledtext
 import customtkinter as ctk
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 import re
 import logging
 
 from .components.cyberpunk_widgets import CyberpunkFrame, CyberpunkTextbox, CyberpunkEntry, CyberpunkButton, CyberpunkLabel
+from .chat_index import ChatIndex
 
 logger = logging.getLogger(__name__)
 
+URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+
+BADGE_ICONS = {
+    "subscriber": "⭐",
+    "vip": "💎",
+    "moderator": "🔨"
+}
+
+# Message types rendered with a single style tag; anything else is chat
+STYLED_MESSAGE_TYPES = {"system", "ai_response", "command"}
+
+# Filter menu labels and the message type each one shows
+FILTER_OPTIONS = {
+    "All": None,
+    "Chat": "chat",
+    "Commands": "command",
+    "AI": "ai_response",
+    "System": "system"
+}
+
 
 class ChatWindow:
     """Chat window with cyberpunk styling and real-time updates"""
@@ -28,11 +50,30 @@ class ChatWindow:
         self.message_input = None
         self.send_button = None
         
-        # Chat state
-        self.messages = []
+        # Chat state: retained messages plus user/type/token indexes
         self.max_messages = 1000
+        self.index = ChatIndex(self.max_messages)
+        self.messages = self.index.messages
         self.auto_scroll = True
         
+        # Only this many lines are kept in the text widget
+        self.max_display_lines = 500
+        
+        # Widget line bookkeeping: seq of each displayed line (None for
+        # database history rows) and the absolute line number of each seq
+        self._displayed: deque = deque()
+        self._display_lines: Dict[int, int] = {}
+        self._first_line = 0
+        self._next_line = 0
+        
+        # Active search/filter ({'query', 'username', 'message_type'}) and mention highlight
+        self.active_filter: Optional[Dict] = None
+        self.highlighted_user: Optional[str] = None
+        
+        # Optional fall-through for older history:
+        # history_search(query, limit, callback) eventually calls callback(messages) on the Tk thread
+        self.history_search: Optional[Callable] = None
+        
         # Text formatting
         self.username_colors = [
             "#00d4ff", "#ff00ff", "#00ff41", "#ffaa00", 
@@ -113,6 +154,35 @@ class ChatWindow:
             border_color=self.colors['error_color']
         )
         clear_button.pack(side="right", padx=5, pady=5)
+        
+        # Message type filter
+        self.filter_var = tk.StringVar(value="All")
+        filter_menu = ctk.CTkOptionMenu(
+            header_frame,
+            values=list(FILTER_OPTIONS),
+            variable=self.filter_var,
+            command=lambda choice: self.filter_messages(FILTER_OPTIONS[choice] or "all"),
+            width=100,
+            height=28,
+            font=("Consolas", 10),
+            fg_color=self.colors['bg_primary'],
+            button_color=self.colors['accent_primary']
+        )
+        filter_menu.pack(side="right", padx=5, pady=5)
+        
+        # Search box (Enter searches, empty search shows live chat again)
+        self.search_input = CyberpunkEntry(
+            header_frame,
+            placeholder_text="🔍 Search chat...",
+            width=180,
+            height=28,
+            fg_color=self.colors['bg_primary'],
+            border_color=self.colors['border_color'],
+            text_color=self.colors['text_primary'],
+            font=("Consolas", 10)
+        )
+        self.search_input.pack(side="right", padx=5, pady=5)
+        self.search_input.bind("<Return>", lambda e: self.search_messages(self.search_input.get().strip()))
     
     def _create_chat_display(self):
         """Create the chat display area"""
@@ -215,6 +285,9 @@ class ChatWindow:
         self.chat_display.tag_configure("vip", foreground=self.colors['warning_color'])
         self.chat_display.tag_configure("moderator", foreground=self.colors['success_color'])
         
+        # Mention highlight
+        self.chat_display.tag_configure("mention", background=self.colors['bg_tertiary'])
+        
         # URL/link tags
         self.chat_display.tag_configure("url", foreground=self.colors['accent_primary'], underline=True)
         self.chat_display.tag_bind("url", "<Button-1>", self._open_url)
@@ -231,7 +304,8 @@ class ChatWindow:
         self.chat_display.configure(state=tk.NORMAL)
         self.chat_display.delete(1.0, tk.END)
         self.chat_display.configure(state=tk.DISABLED)
-        self.messages.clear()
+        self._reset_display()
+        self.index.clear()
         logger.info("Chat cleared")
     
     def _send_message(self):
@@ -272,116 +346,160 @@ class ChatWindow:
         
         # Extract URL (simplified)
         import webbrowser
-        urls = re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', line_text)
+        urls = URL_PATTERN.findall(line_text)
         if urls:
             webbrowser.open(urls[0])
     
     def add_message(self, username: str, message: str, timestamp: str = None, message_type: str = "chat", user_badges: List[str] = None):
         """Add a message to the chat display"""
+        self.add_messages([{
+            'username': username,
+            'message': message,
+            'timestamp': timestamp,
+            'type': message_type,
+            'badges': user_badges or []
+        }])
+    
+    def add_messages(self, messages: List[Dict]):
+        """Add a batch of messages with a single widget update and scroll"""
+        if not messages:
+            return
+        
         try:
-            # Create timestamp if not provided
-            if timestamp is None:
-                timestamp = datetime.now().strftime("%H:%M:%S")
-            
-            # Assign color to user if not already assigned
-            if username not in self.user_colors:
-                self.user_colors[username] = self.color_index % len(self.username_colors)
-                self.color_index += 1
-            
-            color_index = self.user_colors[username]
-            
-            # Enable text widget for editing
-            self.chat_display.configure(state=tk.NORMAL)
-            
-            # Insert timestamp
-            self.chat_display.insert(tk.END, f"[{timestamp}] ", "timestamp")
-            
-            # Insert username with styling
-            username_tag = f"username_{color_index}"
-            
-            # Add badges
-            if user_badges:
-                badge_text = ""
-                for badge in user_badges:
-                    if badge == "subscriber":
-                        badge_text += "⭐"
-                    elif badge == "vip":
-                        badge_text += "💎"
-                    elif badge == "moderator":
-                        badge_text += "🔨"
+            now = None
+            for msg in messages:
+                # Create timestamp if not provided
+                if msg.get('timestamp') is None:
+                    now = now or datetime.now().strftime("%H:%M:%S")
+                    msg['timestamp'] = now
                 
-                if badge_text:
-                    self.chat_display.insert(tk.END, f"{badge_text} ", "system")
-            
-            # Insert username
-            self.chat_display.insert(tk.END, f"{username}: ", username_tag)
-            
-            # Insert message with appropriate styling
-            if message_type == "system":
-                self.chat_display.insert(tk.END, f"{message}\n", "system")
-            elif message_type == "ai_response":
-                self.chat_display.insert(tk.END, f"{message}\n", "ai_response")
-            elif message_type == "command":
-                self.chat_display.insert(tk.END, f"{message}\n", "command")
-            else:
-                # Regular message - check for URLs
-                self._insert_message_with_urls(message)
-            
-            # Disable text widget
-            self.chat_display.configure(state=tk.DISABLED)
+                # Store and index message (evicts the oldest when full)
+                self.index.add(msg)
             
-            # Auto-scroll if enabled
-            if self.auto_scroll:
-                self.chat_display.see(tk.END)
+            # While filtering, only matching live messages are shown
+            if self.active_filter:
+                messages = [msg for msg in messages if self.index.matches(msg, **self.active_filter)]
             
-            # Store message
-            self.messages.append({
-                'username': username,
-                'message': message,
-                'timestamp': timestamp,
-                'type': message_type,
-                'badges': user_badges or []
-            })
-            
-            # Limit message history
-            if len(self.messages) > self.max_messages:
-                self.messages.pop(0)
-                # Clear some old messages from display
-                self._cleanup_old_messages()
+            self._render(messages)
             
         except Exception as e:
             logger.error(f"❌ Error adding message: {e}")
     
-    def _insert_message_with_urls(self, message: str):
-        """Insert message with URL highlighting"""
-        # Find URLs in the message
-        url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        urls = re.finditer(url_pattern, message)
+    def _render(self, messages: List[Dict], replace: bool = False):
+        """Render messages in one state toggle, one insert and one scroll"""
+        # Lines beyond the display window would be trimmed straight away,
+        # so only the newest ones are rendered
+        messages = messages[-self.max_display_lines:]
+        
+        chunks = []
+        for msg in messages:
+            self._format_message(msg, chunks)
+        
+        self.chat_display.configure(state=tk.NORMAL)
+        
+        if replace:
+            self.chat_display.delete("1.0", tk.END)
+            self._reset_display()
+        
+        if chunks:
+            self.chat_display.insert(tk.END, *chunks)
+        
+        for msg in messages:
+            seq = msg.get('seq')
+            if seq is not None:
+                self._display_lines[seq] = self._next_line
+            self._displayed.append(seq)
+            self._next_line += 1
+        
+        self._trim_display()
+        self.chat_display.configure(state=tk.DISABLED)
+        
+        if self.highlighted_user:
+            # Same tokens as index.mentions(), so "@bob" does not match "@bobcat"
+            mention = f"@{self.highlighted_user.lstrip('@')}"
+            for msg in messages:
+                if self.index.matches(msg, mention):
+                    self._tag_message_line(msg, "mention")
+        
+        # Auto-scroll if enabled
+        if self.auto_scroll:
+            self.chat_display.see(tk.END)
+    
+    def _format_message(self, msg: Dict, chunks: List):
+        """Append (text, tags) pairs for one message to chunks"""
+        username = msg['username']
+        message = msg['message'].replace("\n", " ")
+        message_type = msg.get('type', 'chat')
+        
+        # Assign color to user if not already assigned
+        color_index = self.user_colors.get(username)
+        if color_index is None:
+            color_index = self.color_index % len(self.username_colors)
+            self.user_colors[username] = color_index
+            self.color_index += 1
         
+        chunks.append(f"[{msg['timestamp']}] ")
+        chunks.append("timestamp")
+        
+        # Add badges
+        user_badges = msg.get('badges')
+        if user_badges:
+            badge_text = "".join(BADGE_ICONS.get(badge, "") for badge in user_badges)
+            if badge_text:
+                chunks.append(f"{badge_text} ")
+                chunks.append("system")
+        
+        # Username with styling
+        chunks.append(f"{username}: ")
+        chunks.append(f"username_{color_index}")
+        
+        # Message with appropriate styling
+        if message_type in STYLED_MESSAGE_TYPES:
+            chunks.append(f"{message}\n")
+            chunks.append(message_type)
+        else:
+            # Regular message - check for URLs
+            self._format_message_with_urls(message, chunks)
+    
+    def _format_message_with_urls(self, message: str, chunks: List):
+        """Append message text with URL highlighting to chunks"""
         last_end = 0
-        for match in urls:
-            # Insert text before URL
-            self.chat_display.insert(tk.END, message[last_end:match.start()])
+        for match in URL_PATTERN.finditer(message):
+            # Text before URL
+            chunks.append(message[last_end:match.start()])
+            chunks.append(())
             
-            # Insert URL with special tag
-            self.chat_display.insert(tk.END, match.group(), "url")
+            # URL with special tag
+            chunks.append(match.group())
+            chunks.append("url")
             
             last_end = match.end()
         
-        # Insert remaining text
-        self.chat_display.insert(tk.END, message[last_end:] + "\n")
+        # Remaining text
+        chunks.append(message[last_end:] + "\n")
+        chunks.append(())
     
-    def _cleanup_old_messages(self):
-        """Clean up old messages from display"""
-        # Get current line count
-        line_count = float(self.chat_display.index(tk.END).split('.')[0])
-        
-        # If too many lines, remove some from the top
-        if line_count > self.max_messages * 1.5:
-            self.chat_display.configure(state=tk.NORMAL)
-            # Remove first 100 lines
-            self.chat_display.delete(1.0, "100.0")
-            self.chat_display.configure(state=tk.DISABLED)
+    def _trim_display(self):
+        """Keep only the newest max_display_lines lines in the (editable) widget"""
+        excess = len(self._displayed) - self.max_display_lines
+        if excess > 0:
+            for _ in range(excess):
+                self._display_lines.pop(self._displayed.popleft(), None)
+            self._first_line += excess
+            self.chat_display.delete("1.0", f"{excess + 1}.0")
+    
+    def _reset_display(self):
+        """Forget which messages are on screen"""
+        self._displayed.clear()
+        self._display_lines.clear()
+        self._first_line = self._next_line = 0
+    
+    def _tag_message_line(self, msg: Dict, tag: str):
+        """Apply a tag to the widget line showing a message, if it is on screen"""
+        line = self._display_lines.get(msg.get('seq'))
+        if line is not None:
+            widget_line = line - self._first_line + 1
+            self.chat_display.tag_add(tag, f"{widget_line}.0", f"{widget_line}.end")
     
     def _add_example_messages(self):
         """Add example messages for testing"""
@@ -409,10 +527,69 @@ class ChatWindow:
     
     def highlight_mention(self, username: str):
         """Highlight messages that mention a specific username"""
-        # This would highlight messages containing @username
-        pass
+        self.chat_display.tag_remove("mention", "1.0", tk.END)
+        self.highlighted_user = username.lstrip('@') if username else None
+        
+        if self.highlighted_user:
+            for msg in self.index.mentions(self.highlighted_user):
+                self._tag_message_line(msg, "mention")
     
     def filter_messages(self, filter_type: str):
-        """Filter messages by type"""
-        # This would filter messages (show only AI responses, commands, etc.)
-        pass
+        """Filter messages by type ('all' shows everything)"""
+        message_type = None if filter_type in (None, "", "all") else filter_type
+        query = self.active_filter.get('query', "") if self.active_filter else ""
+        self._apply_filter(query=query, message_type=message_type)
+    
+    def search_messages(self, query: str, username: str = None, limit: int = None) -> List[Dict]:
+        """Show retained messages matching a search; older history comes from the database"""
+        message_type = self.active_filter.get('message_type') if self.active_filter else None
+        results = self._apply_filter(query=query, username=username, message_type=message_type)
+        
+        limit = limit or self.max_display_lines
+        if query and self.history_search and len(results) < limit:
+            self.history_search(query, limit - len(results), self._show_history_results)
+        
+        return results
+    
+    def _apply_filter(self, query: str = "", username: str = None, message_type: str = None) -> List[Dict]:
+        """Re-render the display from the indexes for the given filter"""
+        if query or username or message_type:
+            self.active_filter = {'query': query, 'username': username, 'message_type': message_type}
+        else:
+            self.active_filter = None
+        
+        if self.active_filter:
+            results = self.index.search(limit=self.max_display_lines, **self.active_filter)
+        else:
+            results = list(self.messages)[-self.max_display_lines:]
+        
+        self._render(results, replace=True)
+        self.highlight_mention(self.highlighted_user)
+        return results
+    
+    def _show_history_results(self, history: List[Dict]):
+        """Prepend older matches from the database above the retained ones"""
+        if not history or not self.active_filter:
+            return
+        
+        # Skip rows that are still retained (and therefore already shown)
+        retained = {(msg['username'].lower(), msg['message']) for msg in self.messages}
+        history = [msg for msg in history if (msg['username'].lower(), msg['message']) not in retained]
+        
+        room = self.max_display_lines - len(self._displayed)
+        if not history or room <= 0:
+            return
+        history = history[-room:]
+        
+        chunks = []
+        for msg in history:
+            self._format_message(msg, chunks)
+        
+        self.chat_display.configure(state=tk.NORMAL)
+        self.chat_display.insert("1.0", *chunks)
+        self.chat_display.configure(state=tk.DISABLED)
+        
+        # Prepended lines shift everything below them down
+        for _ in history:
+            self._displayed.appendleft(None)
+        self._first_line -= len(history)
@@ -11,13 +11,12 @@ import threading
 import asyncio
 from datetime import datetime
 import logging
-from PIL import Image, ImageTk
 import os
 from pathlib import Path
 
 from ..core.config import Config
-from .settings_window import SettingsWindow
-from .oauth_wizard import OAuthSetupWizard
+from ..core.startup_profiler import profiler
+from .chat_window import ChatWindow
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +35,9 @@ class MainWindow:
         self.oauth_wizard = None
         self.status_bar = None
         self.connection_status = None
+        self.chat_window = None
+        self.status_values = {}
+        self.latest_stats = None
         
         # Content panels
         self.sidebar = None
@@ -141,23 +143,8 @@ class MainWindow:
         self.root.geometry("1400x900")
         self.root.configure(fg_color=self.colors['bg_primary'])
         
-        # Set window icon
-        try:
-            icon_path = Path(__file__).parent.parent.parent / "assets" / "Chibi_Construct.png"
-            if icon_path.exists():
-                # Set the window icon properly
-                self.root.iconbitmap(default=str(icon_path)) if icon_path.suffix == '.ico' else None
-                
-                # Also set with PhotoImage for broader compatibility
-                icon = Image.open(icon_path)
-                icon = icon.resize((32, 32), Image.Resampling.LANCZOS)
-                icon_photo = ImageTk.PhotoImage(icon)
-                self.root.iconphoto(True, icon_photo)
-                
-                # Store reference to prevent garbage collection
-                self.icon_photo = icon_photo
-        except Exception as e:
-            logger.warning(f"Could not load icon: {e}")
+        # Load the window icon once the window is on screen
+        self.root.after_idle(self._load_window_icon)
         
         # Make window resizable
         self.root.minsize(1200, 800)
@@ -169,8 +156,67 @@ class MainWindow:
         if self.first_run:
             self.root.after(1000, self._show_setup_wizard)
         
+        # Drain chat and stats from the event loop once per frame
+        self.app.ui_bridge.start(
+            self.root,
+            on_messages=self._on_chat_batch,
+            on_stats=self._update_bot_status
+        )
+        
+        # Reloaded settings are shown on the Tk thread
+        self.app.config_watcher.subscribe(
+            lambda event: self.app.ui_bridge.post_callback(self.apply_config, event)
+        )
+        
+        # Event loop stalls are reported in the activity log
+        self.app.loop_monitor.subscribe(
+            lambda event: self.app.ui_bridge.post_callback(self._on_loop_lag, event)
+        )
+        
+        # Report startup timings once the first frame has been drawn
+        self.root.after_idle(self._on_first_frame)
+        
         logger.info("🪟 Main window created")
     
+    def apply_config(self, event):
+        """Show a reloaded configuration (Tk thread)"""
+        if event.get('ui.always_on_top'):
+            self.root.attributes('-topmost', self.config.ui.always_on_top)
+        
+        if event.get('ui.window_width') or event.get('ui.window_height'):
+            self.root.geometry(f"{self.config.ui.window_width}x{self.config.ui.window_height}")
+        
+        self._log_activity(f"Settings reloaded: {', '.join(sorted(event.paths))}")
+    
+    def _on_first_frame(self):
+        """Record that the main window is visible"""
+        profiler.mark("window visible")
+        profiler.log_report()
+    
+    def _load_window_icon(self):
+        """Load the window and sidebar icons (deferred from startup)"""
+        try:
+            from PIL import Image, ImageTk
+            
+            icon_path = Path(__file__).parent.parent.parent / "assets" / "Chibi_Construct.png"
+            if not icon_path.exists():
+                return
+            
+            source = Image.open(icon_path)
+            
+            # Set with PhotoImage for broader compatibility
+            icon_photo = ImageTk.PhotoImage(source.resize((32, 32), Image.Resampling.LANCZOS))
+            self.root.iconphoto(True, icon_photo)
+            
+            # Store reference to prevent garbage collection
+            self.icon_photo = icon_photo
+            
+            sidebar_photo = ImageTk.PhotoImage(source.resize((24, 24), Image.Resampling.LANCZOS))
+            self.sidebar_icon_label.configure(image=sidebar_photo)
+            self.sidebar_icon_label.image = sidebar_photo  # Keep a reference
+        except Exception as e:
+            logger.warning(f"Could not load icon: {e}")
+    
     def _create_layout(self):
         """Create the main window layout"""
         # Create main container with simple layout
@@ -211,25 +257,14 @@ class MainWindow:
         title_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
         title_frame.pack(expand=True)
         
-        # Load and display icon
-        try:
-            icon_path = Path(__file__).parent.parent.parent / "assets" / "Chibi_Construct.png"
-            if icon_path.exists():
-                icon = Image.open(icon_path)
-                icon = icon.resize((24, 24), Image.Resampling.LANCZOS)
-                icon_photo = ImageTk.PhotoImage(icon)
-                
-                icon_label = ctk.CTkLabel(
-                    title_frame,
-                    image=icon_photo,
-                    text="",
-                    width=24,
-                    height=24
-                )
-                icon_label.image = icon_photo  # Keep a reference
-                icon_label.pack(side="left", padx=5)
-        except Exception as e:
-            logger.warning(f"Could not load sidebar icon: {e}")
+        # Icon placeholder, filled in by _load_window_icon after startup
+        self.sidebar_icon_label = ctk.CTkLabel(
+            title_frame,
+            text="",
+            width=24,
+            height=24
+        )
+        self.sidebar_icon_label.pack(side="left", padx=5)
         
         title_label = ctk.CTkLabel(
             title_frame,
@@ -415,24 +450,10 @@ class MainWindow:
         chat_frame = ctk.CTkFrame(top_frame, fg_color=self.colors['bg_tertiary'])
         chat_frame.pack(fill="both", expand=True, padx=5, pady=5)
         
-        chat_title = ctk.CTkLabel(
-            chat_frame,
-            text="💬 Live Chat",
-            font=("Segoe UI", 14, "bold"),
-            text_color=self.colors['text_primary']
-        )
-        chat_title.pack(anchor="w", padx=10, pady=5)
-        
-        # Chat display
-        self.chat_display = scrolledtext.ScrolledText(
-            chat_frame,
-            height=15,
-            bg=self.colors['bg_primary'],
-            fg=self.colors['text_primary'],
-            insertbackground=self.colors['text_primary'],
-            font=("Consolas", 10)
-        )
-        self.chat_display.pack(fill="both", expand=True, padx=10, pady=5)
+        # Live chat, fed in batches by the UI bridge
+        self.chat_window = ChatWindow(chat_frame, self.colors)
+        self.chat_window.history_search = self._search_chat_history
+        self.chat_window.create_interface()
         
         # Bottom section: Controls and status
         # bottom_frame is already created above
@@ -459,13 +480,28 @@ class MainWindow:
         status_frame = ctk.CTkFrame(bottom_notebook, fg_color=self.colors['bg_tertiary'])
         bottom_notebook.add(status_frame, text="Bot Status")
         
-        self._create_bot_status_section(status_frame)
-        
         # Quick Commands tab
         commands_frame = ctk.CTkFrame(bottom_notebook, fg_color=self.colors['bg_tertiary'])
         bottom_notebook.add(commands_frame, text="Quick Commands")
         
-        self._create_quick_commands_section(commands_frame)
+        # Traces tab
+        traces_frame = ctk.CTkFrame(bottom_notebook, fg_color=self.colors['bg_tertiary'])
+        bottom_notebook.add(traces_frame, text="Traces")
+        
+        # Hidden tabs are built the first time they are selected
+        self._lazy_tabs = {
+            str(status_frame): (status_frame, self._create_bot_status_section),
+            str(commands_frame): (commands_frame, self._create_quick_commands_section),
+            str(traces_frame): (traces_frame, self._create_traces_section)
+        }
+        bottom_notebook.bind("<<NotebookTabChanged>>", self._on_bottom_tab_changed)
+    
+    def _on_bottom_tab_changed(self, event):
+        """Build a lazily created tab when it is first selected"""
+        selected = event.widget.select()
+        if selected in self._lazy_tabs:
+            frame, builder = self._lazy_tabs.pop(selected)
+            builder(frame)
     
     def _create_bot_status_section(self, parent):
         """Create bot status section"""
@@ -504,10 +540,61 @@ class MainWindow:
                 text_color=self.colors[color]
             )
             value_widget.pack(pady=2)
+            self.status_values[label] = value_widget
         
         # Configure grid weights
         for i in range(3):
             status_grid.grid_columnconfigure(i, weight=1)
+        
+        # Show stats that arrived before the tab was built
+        if self.latest_stats:
+            self._update_bot_status(self.latest_stats)
+    
+    def _on_chat_batch(self, messages: List[Dict]):
+        """Render a batch of chat messages from the UI bridge"""
+        if self.chat_window and self.chat_window.chat_display.winfo_exists():
+            self.chat_window.add_messages(messages)
+    
+    def _search_chat_history(self, query: str, limit: int, callback: Callable):
+        """Search the database for older chat and hand results back on the Tk thread"""
+        future = self.app.schedule_coroutine(
+            self.app.database.search_messages(query, limit=limit, order='recent')
+        )
+        if future is None:
+            return
+        
+        def on_done(done):
+            if done.cancelled() or done.exception():
+                return
+            
+            # Oldest first, in the chat window's message format
+            history = [{
+                'username': row['username'],
+                'message': row['content'],
+                'timestamp': str(row['timestamp'])[11:19],
+                'type': row['message_type'],
+                'badges': []
+            } for row in reversed(done.result())]
+            self.app.ui_bridge.post_callback(callback, history)
+        
+        future.add_done_callback(on_done)
+    
+    def _update_bot_status(self, stats: Dict):
+        """Show the latest bot stats from the UI bridge"""
+        self.latest_stats = stats
+        
+        values = {
+            "Commands Processed": str(stats.get('commands_processed', 0)),
+            "AI Responses": str(stats.get('ai_responses_sent', 0))
+        }
+        if isinstance(stats.get('uptime'), datetime):
+            elapsed = int((datetime.now() - stats['uptime']).total_seconds())
+            values["Uptime"] = f"{elapsed // 3600:02d}:{elapsed % 3600 // 60:02d}:{elapsed % 60:02d}"
+        
+        for label, value in values.items():
+            widget = self.status_values.get(label)
+            if widget is not None and widget.winfo_exists():
+                widget.configure(text=value)
     
     def _create_quick_commands_section(self, parent):
         """Create quick commands section"""
@@ -555,7 +642,8 @@ class MainWindow:
             ("🔄 Refresh", self._refresh_data),
             ("🧹 Clear Chat", self._clear_chat),
             ("📊 Stats", self._show_stats),
-            ("🎯 Test AI", self._test_ai)
+            ("🎯 Test AI", self._test_ai),
+            ("🔥 Profile 30s", self._toggle_profiling)
         ]
         
         for text, command in quick_actions:
@@ -570,6 +658,53 @@ class MainWindow:
             )
             btn.pack(side="left", padx=5, pady=10)
     
+    def _create_traces_section(self, parent):
+        """Create the recent traces section"""
+        toolbar = ctk.CTkFrame(parent, fg_color="transparent")
+        toolbar.pack(fill="x", padx=5, pady=(5, 0))
+        
+        refresh_btn = ctk.CTkButton(
+            toolbar,
+            text="🔄 Refresh",
+            command=self._refresh_traces,
+            width=100,
+            height=28,
+            fg_color=self.colors['bg_tertiary'],
+            hover_color=self.colors['button_hover']
+        )
+        refresh_btn.pack(side="left")
+        
+        self.traces_log = scrolledtext.ScrolledText(
+            parent,
+            height=8,
+            bg=self.colors['bg_primary'],
+            fg=self.colors['text_secondary'],
+            insertbackground=self.colors['text_secondary'],
+            font=("Consolas", 9)
+        )
+        self.traces_log.pack(fill="both", expand=True, padx=5, pady=5)
+        self._refresh_traces()
+    
+    def _refresh_traces(self):
+        """Show the most recent sampled traces, one line per span"""
+        from ..core.tracing import tracer
+        
+        lines = []
+        for spans in tracer.recent_traces(limit=30):
+            started = spans[0].start
+            for span in spans:
+                depth = "  " if span.parent_id else ""
+                offset = (span.start - started) * 1000
+                error = f"  ❌ {span.error}" if span.error else ""
+                lines.append(f"{depth}{span.name:<20} +{offset:8.1f} ms {span.duration * 1000:9.1f} ms{error}")
+            lines.append("")
+        
+        if not lines:
+            lines = ["No traces yet. Set monitoring.trace_sample_rate in config.json to sample chat messages."]
+        
+        self.traces_log.delete("1.0", tk.END)
+        self.traces_log.insert(tk.END, "\n".join(lines))
+    
     def _create_status_bar(self):
         """Create status bar at bottom"""
         self.status_bar = ctk.CTkFrame(
@@ -653,6 +788,8 @@ class MainWindow:
         # Clear current content
         for widget in self.content_notebook.winfo_children():
             widget.destroy()
+        self.chat_window = None
+        self.status_values = {}
         
         if panel_id == "console":
             self._create_console_panel()
@@ -759,7 +896,8 @@ class MainWindow:
     
     def _clear_chat(self):
         """Clear chat display"""
-        self.chat_display.delete(1.0, tk.END)
+        if self.chat_window:
+            self.chat_window._clear_chat()
         self._log_activity("Chat cleared")
     
     def _show_stats(self):
@@ -770,6 +908,30 @@ class MainWindow:
         """Test AI response"""
         self._log_activity("AI test initiated")
     
+    def _toggle_profiling(self):
+        """Start a 30 second profile, or end the running one early"""
+        profiler = self.app.cpu_profiler
+        if profiler and profiler.running:
+            profiler.stop()
+            self._log_activity("Profiling stopped early")
+            return
+        
+        on_done = lambda report: self.app.ui_bridge.post_callback(self._on_profile_done, report)
+        if self.app.start_profiling(30.0, on_done):
+            self._log_activity("Profiling event loop and UI threads for 30s...")
+    
+    def _on_profile_done(self, report):
+        """Summarize a finished profile in the activity log"""
+        self._log_activity(f"Profile written: {report.collapsed_path} ({report.samples} samples)")
+        for function, samples in report.hot_functions[:5]:
+            self._log_activity(f"  {samples:5d}  {function}")
+        for row in report.task_summary.get('longest_blocking', [])[:3]:
+            self._log_activity(f"  blocked {row['max_ms']:.1f} ms: {row['callback']}")
+    
+    def _on_loop_lag(self, event):
+        """Warn that chat handling was stalled by blocking work"""
+        self._log_activity(f"⚠️ Event loop blocked for {event.lag * 1000:.0f} ms in {event.culprit}")
+    
     def _log_activity(self, message):
         """Log activity"""
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -779,6 +941,8 @@ class MainWindow:
     def _open_settings(self):
         """Open settings window"""
         if self.settings_window is None:
+            from .settings_window import SettingsWindow
+            
             self.settings_window = SettingsWindow(self.root, self.config, self.colors)
         self.settings_window.show()
     
@@ -786,6 +950,8 @@ class MainWindow:
         """Show the OAuth setup wizard"""
         try:
             if self.oauth_wizard is None:
+                from .oauth_wizard import OAuthSetupWizard
+                
                 self.oauth_wizard = OAuthSetupWizard(
                     parent=self.root,
                     config=self.config,
@@ -4,6 +4,5 @@ Modular setup wizard broken into manageable components
 """
 
 from .wizard_main import SetupWizard
-from .steps import *
 
 __all__ = ['SetupWizard']
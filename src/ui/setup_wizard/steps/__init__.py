@@ -3,15 +3,21 @@ Setup Wizard Steps
 Modular step components for the setup wizard
 """
 
-from .base_step import BaseStep
-from .welcome_step import WelcomeStep
-from .platform_step import PlatformStep
-from .broadcaster_step import BroadcasterStep
-from .bot_step import BotStep
-from .ai_step import AIStep
-from .apis_step import APIsStep
-from .backup_step import BackupStep
-from .complete_step import CompleteStep
+import importlib
+
+# Step classes are imported lazily on attribute access so that importing the
+# package does not pull in every step's UI code
+_STEP_MODULES = {
+    'BaseStep': 'base_step',
+    'WelcomeStep': 'welcome_step',
+    'PlatformStep': 'platform_step',
+    'BroadcasterStep': 'broadcaster_step',
+    'BotStep': 'bot_step',
+    'AIStep': 'ai_step',
+    'APIsStep': 'apis_step',
+    'BackupStep': 'backup_step',
+    'CompleteStep': 'complete_step'
+}
 
 __all__ = [
     'BaseStep',
@@ -24,3 +30,10 @@ __all__ = [
     'BackupStep',
     'CompleteStep'
 ]
+
+
+def __getattr__(name):
+    if name in _STEP_MODULES:
+        module = importlib.import_module(f".{_STEP_MODULES[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -9,21 +9,27 @@ import customtkinter as ctk
 from typing import Dict, Optional, Callable, List
 import logging
 import threading
+import importlib
 
 from ..components.standard_widgets import (
     StandardFrame, StandardButton, StandardLabel, StandardProgressBar
 )
-from .steps.welcome_step import WelcomeStep
-from .steps.platform_step import PlatformStep
-from .steps.broadcaster_step import BroadcasterStep
-from .steps.bot_step import BotStep
-from .steps.ai_step import AIStep
-from .steps.apis_step import APIsStep
-from .steps.backup_step import BackupStep
-from .steps.complete_step import CompleteStep
 
 logger = logging.getLogger(__name__)
 
+# Wizard steps in display order as (module, class); each step module is
+# imported the first time the step is shown
+STEP_SPECS = [
+    ('welcome_step', 'WelcomeStep'),
+    ('platform_step', 'PlatformStep'),
+    ('broadcaster_step', 'BroadcasterStep'),
+    ('bot_step', 'BotStep'),
+    ('ai_step', 'AIStep'),
+    ('apis_step', 'APIsStep'),
+    ('backup_step', 'BackupStep'),
+    ('complete_step', 'CompleteStep')
+]
+
 
 class SetupWizard:
     """Main setup wizard coordinator"""
@@ -59,17 +65,8 @@ class SetupWizard:
             'skip_backup': False
         }
         
-        # Initialize steps
-        self.steps: List[object] = [
-            WelcomeStep(self),
-            PlatformStep(self),
-            BroadcasterStep(self),
-            BotStep(self),
-            AIStep(self),
-            APIsStep(self),
-            BackupStep(self),
-            CompleteStep(self)
-        ]
+        # Steps are created on first use (see _get_step)
+        self.steps: List[Optional[object]] = [None] * len(STEP_SPECS)
         
         # UI components
         self.title_label = None
@@ -232,10 +229,19 @@ class SetupWizard:
         y = (self.window.winfo_screenheight() // 2) - (height // 2)
         self.window.geometry(f'{width}x{height}+{x}+{y}')
     
+    def _get_step(self, index: int):
+        """Get a wizard step, importing and creating it on first use"""
+        if self.steps[index] is None:
+            module_name, class_name = STEP_SPECS[index]
+            module = importlib.import_module(f".steps.{module_name}", __package__)
+            self.steps[index] = getattr(module, class_name)(self)
+        
+        return self.steps[index]
+    
     def _show_step(self):
         """Show the current step"""
         if self.current_step < len(self.steps):
-            step = self.steps[self.current_step]
+            step = self._get_step(self.current_step)
             
             # Update header
             self.step_label.configure(text=f"Step {self.current_step + 1} of {len(self.steps)}")
@@ -269,7 +275,7 @@ class SetupWizard:
     
     def _next_step(self):
         """Go to next step"""
-        current_step = self.steps[self.current_step]
+        current_step = self._get_step(self.current_step)
         
         # Validate current step
         if hasattr(current_step, 'validate') and not current_step.validate():
@@ -283,7 +289,7 @@ class SetupWizard:
     
     def _skip_step(self):
         """Skip current step"""
-        current_step = self.steps[self.current_step]
+        current_step = self._get_step(self.current_step)
         
         # Let the step handle its own skip logic
         if hasattr(current_step, 'skip'):
@@ -297,12 +303,8 @@ class SetupWizard:
             # Apply configuration from wizard data
             self._apply_configuration()
             
-            # Save configuration
-            self.config.save()
-            
-            # Mark setup as complete
-            self.config.set('app', 'setup_complete', True)
-            self.config.save()
+            # Save configuration and mark setup as complete
+            self.config.mark_setup_complete()
             
             # Close window
             self.window.destroy()
@@ -319,32 +321,32 @@ class SetupWizard:
     
     def _apply_configuration(self):
         """Apply wizard data to configuration"""
-        # Twitch configuration
+        # Twitch configuration: the bot joins the broadcaster's channel and
+        # chats as the bot account unless the broadcaster doubles as the bot
         if self.wizard_data.get('broadcaster_token'):
-            self.config.set('twitch', 'broadcaster_token', self.wizard_data['broadcaster_token'])
-            self.config.set('twitch', 'broadcaster_username', self.wizard_data['broadcaster_username'])
-        
-        if self.wizard_data.get('bot_token'):
-            self.config.set('twitch', 'bot_token', self.wizard_data['bot_token'])
-            self.config.set('twitch', 'bot_username', self.wizard_data['bot_username'])
+            self.config.set('twitch.channel', self.wizard_data['broadcaster_username'])
+            self.config.set('twitch.token', self.wizard_data['broadcaster_token'])
+            self.config.set('twitch.username', self.wizard_data['broadcaster_username'])
         
-        self.config.set('twitch', 'use_broadcaster_as_bot', self.wizard_data.get('use_broadcaster_as_bot', True))
+        if self.wizard_data.get('bot_token') and not self.wizard_data.get('use_broadcaster_as_bot'):
+            self.config.set('twitch.token', self.wizard_data['bot_token'])
+            self.config.set('twitch.username', self.wizard_data['bot_username'])
         
         # AI Services
         if self.wizard_data.get('openrouter_key'):
-            self.config.set('ai', 'openrouter_api_key', self.wizard_data['openrouter_key'])
+            self.config.set('ai.api_key', self.wizard_data['openrouter_key'])
         
         if self.wizard_data.get('elevenlabs_key'):
-            self.config.set('ai', 'elevenlabs_api_key', self.wizard_data['elevenlabs_key'])
+            self.config.set('ai.elevenlabs_api_key', self.wizard_data['elevenlabs_key'])
         
         if self.wizard_data.get('rawg_key'):
-            self.config.set('ai', 'rawg_api_key', self.wizard_data['rawg_key'])
+            self.config.set('ai.rawg_api_key', self.wizard_data['rawg_key'])
         
         # Cloud backup
         if self.wizard_data.get('github_token'):
-            self.config.set('backup', 'github_token', self.wizard_data['github_token'])
+            self.config.set('backup.github_token', self.wizard_data['github_token'])
         
-        self.config.set('backup', 'backup_type', self.wizard_data.get('backup_type', 'local'))
+        self.config.set('backup.backup_type', self.wizard_data.get('backup_type', 'local'))
     
     def _on_closing(self):
         """Handle window closing"""
@@ -0,0 +1,132 @@
+"""
+UI Bridge for Stream Artifact
+Hands chat messages and stats from the asyncio thread to the Tk thread
+"""
+
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class UIBridge:
+    """Batched, thread-safe hand-off from the event loop to the Tk main loop
+
+    Producers on any thread append to a deque (append/popleft are atomic in
+    CPython, so no lock is taken). The Tk thread drains it once per frame
+    with a single after() callback, so a burst of chat becomes one batch
+    insert and only the newest stats snapshot is ever rendered.
+    """
+
+    def __init__(self, interval_ms: int = 50, max_batch: int = 500, max_pending: int = 5000):
+        self.interval_ms = interval_ms
+        self.max_batch = max_batch
+
+        # Oldest messages are discarded if the UI falls this far behind
+        self._messages: deque = deque(maxlen=max_pending)
+        self._latest_stats: Optional[Dict] = None
+        self._callbacks: deque = deque()
+
+        self._root = None
+        self._after_id = None
+        self.on_messages: Optional[Callable[[List[Dict]], None]] = None
+        self.on_stats: Optional[Callable[[Dict], None]] = None
+
+        # Counters for diagnostics
+        self.messages_posted = 0
+        self.messages_dropped = 0
+        self.stats_coalesced = 0
+        self.batches_rendered = 0
+
+    def post_message(self, username: str, message: str, message_type: str = "chat",
+                     user_badges: List[str] = None, timestamp: str = None):
+        """Queue a chat message for display (safe from any thread)"""
+        if len(self._messages) == self._messages.maxlen:
+            self.messages_dropped += 1
+
+        self._messages.append({
+            'username': username,
+            'message': message,
+            'timestamp': timestamp or datetime.now().strftime("%H:%M:%S"),
+            'type': message_type,
+            'badges': user_badges or []
+        })
+        self.messages_posted += 1
+
+    def post_stats(self, stats: Dict):
+        """Publish a stats snapshot; unrendered older snapshots are replaced"""
+        if self._latest_stats is not None:
+            self.stats_coalesced += 1
+        self._latest_stats = stats
+
+    def post_callback(self, callback: Callable, *args):
+        """Run callback(*args) on the Tk thread at the next frame"""
+        self._callbacks.append((callback, args))
+
+    @property
+    def pending(self) -> int:
+        """Number of messages waiting for the next frame"""
+        return len(self._messages)
+
+    def start(self, root, on_messages: Callable[[List[Dict]], None] = None,
+              on_stats: Callable[[Dict], None] = None):
+        """Start draining on the Tk thread of the given root widget"""
+        self._root = root
+        if on_messages is not None:
+            self.on_messages = on_messages
+        if on_stats is not None:
+            self.on_stats = on_stats
+
+        if self._after_id is None:
+            self._after_id = self._root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        """Stop draining"""
+        if self._root is not None and self._after_id is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+
+    def _tick(self):
+        """Per-frame drain, then reschedule"""
+        try:
+            self.drain()
+        finally:
+            if self._after_id is not None:
+                self._after_id = self._root.after(self.interval_ms, self._tick)
+
+    def drain(self):
+        """Deliver pending messages as one batch, the newest stats and queued callbacks (Tk thread)"""
+        if self._messages:
+            batch = []
+            popleft = self._messages.popleft
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(popleft())
+            except IndexError:
+                pass
+
+            if self.on_messages:
+                try:
+                    self.on_messages(batch)
+                    self.batches_rendered += 1
+                except Exception as e:
+                    logger.error(f"❌ Error rendering chat batch: {e}")
+
+        stats, self._latest_stats = self._latest_stats, None
+        if stats is not None and self.on_stats:
+            try:
+                self.on_stats(stats)
+            except Exception as e:
+                logger.error(f"❌ Error rendering stats: {e}")
+
+        while self._callbacks:
+            callback, args = self._callbacks.popleft()
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.error(f"❌ Error in UI callback: {e}")
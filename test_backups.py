@@ -0,0 +1,317 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from yarl import URL
+
+from src.core.backup_scheduler import BackupScheduler
+from src.core.cloud_backup import CloudBackupService, LocalBackupService
+
+
+def test_local_backups_are_deduplicated(tmp_path):
+    (tmp_path / "backups").mkdir()
+    legacy = {'timestamp': '2024-01-01T00:00:00', 'version': '1.0.0', 'config': {'ai': {'model': 'old'}}}
+    (tmp_path / "backups" / "backup_20240101_000000.json").write_text(json.dumps(legacy))
+
+    service = LocalBackupService(SimpleNamespace(data_dir=tmp_path))
+    store = service.store
+    commands = {f"!cmd{i}": f"response number {i} " * 10 for i in range(500)}
+    config = {'ai': {'model': 'new'}, 'commands': commands}
+
+    async def run():
+        await service.backup_configuration(config)
+        first_chunks = sum(1 for _ in store.objects_dir.rglob("*.z"))
+
+        # Unchanged configuration costs nothing
+        await service.backup_configuration(config)
+        unchanged = len(store.backups)
+
+        commands["!cmd250"] = "edited"
+        await service.backup_configuration(config)
+        edited_chunks = sum(1 for _ in store.objects_dir.rglob("*.z"))
+
+        for _ in range(12):
+            commands["!cmd250"] += "!"
+            await service.backup_configuration(config)
+
+        return first_chunks, unchanged, edited_chunks, await service.list_backups(), await service.restore_configuration()
+
+    first_chunks, unchanged, edited_chunks, backups, restored = asyncio.run(run())
+
+    assert not list((tmp_path / "backups").glob("backup_*.json"))
+    assert unchanged == 2  # the imported legacy backup and one new one
+    assert first_chunks > 5 and edited_chunks - first_chunks <= 2
+    assert len(backups) == 10 and restored == config
+    assert asyncio.run(service.restore_configuration("backup_20240101_000000.json")) is None
+
+    # Retention collected the chunks only the dropped backups used
+    referenced = {digest for entry in store.backups for digest in entry['chunks']}
+    assert {path.name.split(".")[0] for path in store.objects_dir.rglob("*.z")} == referenced
+
+
+class FakeConfig:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def save(self):
+        pass
+
+
+class FakeGistAPI:
+    """Local stand-in for the parts of the GitHub Gist API the backups use"""
+
+    def __init__(self, page_size=2, truncate_at=2000):
+        self.gists = {}
+        self.requests = []
+        self.bodies = []
+        self.page_size = page_size
+        self.truncate_at = truncate_at
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post('/gists', self.create)
+        app.router.add_get('/gists', self.list)
+        app.router.add_get('/gists/{id}', self.get)
+        app.router.add_patch('/gists/{id}', self.update)
+        app.router.add_delete('/gists/{id}', self.delete)
+        app.router.add_get('/raw/{id}/{name}', self.raw)
+        return app
+
+    def render(self, request, gist):
+        files = {}
+        for name, content in gist['files'].items():
+            truncated = len(content) > self.truncate_at
+            files[name] = {'filename': name, 'content': content[:self.truncate_at] if truncated else content,
+                           'truncated': truncated, 'raw_url': str(request.url.join(URL(f"/raw/{gist['id']}/{name}")))}
+        return dict(gist, files=files)
+
+    async def create(self, request):
+        self.bodies.append(await request.text())
+        body = await request.json()
+        self.requests.append(('POST', sorted(body['files'])))
+        gist_id = f"gist{len(self.gists)}"
+        self.gists[gist_id] = {'id': gist_id, 'description': body['description'], 'created_at': 'now',
+                               'updated_at': 'now', 'files': {name: file['content'] for name, file in body['files'].items()}}
+        return web.json_response(self.render(request, self.gists[gist_id]), status=201)
+
+    async def update(self, request):
+        self.bodies.append(await request.text())
+        body = await request.json()
+        self.requests.append(('PATCH', sorted(body['files'])))
+        gist = self.gists[request.match_info['id']]
+        for name, file in body['files'].items():
+            if file is None:
+                gist['files'].pop(name, None)
+            else:
+                gist['files'][name] = file['content']
+        return web.json_response(self.render(request, gist))
+
+    async def get(self, request):
+        self.requests.append(('GET', request.path))
+        return web.json_response(self.render(request, self.gists[request.match_info['id']]))
+
+    async def raw(self, request):
+        return web.Response(text=self.gists[request.match_info['id']]['files'][request.match_info['name']])
+
+    async def delete(self, request):
+        self.gists.pop(request.match_info['id'])
+        return web.Response(status=204)
+
+    async def list(self, request):
+        page = int(request.query.get('page', 1))
+        self.requests.append(('LIST', page))
+        gists = list(self.gists.values())
+        chunk = gists[(page - 1) * self.page_size:page * self.page_size]
+        etag = f'"{page}-{len(gists)}"'
+        headers = {'ETag': etag}
+        if page * self.page_size < len(gists):
+            headers['Link'] = f'<{request.url.with_query(per_page=100, page=page + 1)}>; rel="next"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304, headers=headers)
+        return web.json_response([dict(gist, files={name: {} for name in gist['files']}) for gist in chunk],
+                                 headers=headers)
+
+
+def test_gist_backups_upload_only_changed_files():
+    api = FakeGistAPI()
+
+    async def run():
+        server = TestServer(api.app())
+        await server.start_server()
+        try:
+            service = CloudBackupService(FakeConfig(), api_url=str(server.make_url('')), list_cache_ttl=0,
+                                         part_size=16 * 1024)
+            service.set_github_credentials('token')
+            commands = {f"!cmd{i}": f"response {i} " * 50 for i in range(200)}
+            config = {'ai': {'model': 'a'}, 'ui': {'theme': 'cyberpunk'}, 'commands': commands}
+
+            assert await service.backup_configuration(config)
+            created = api.requests[-1]
+
+            # Unchanged: no request at all
+            count = len(api.requests)
+            assert await service.backup_configuration(config)
+            unchanged_requests = len(api.requests) - count
+
+            config['ai']['model'] = 'b'
+            assert await service.backup_configuration(config)
+            patched = api.requests[-1]
+
+            # A fresh service compares against the gist instead of re-uploading
+            fresh = CloudBackupService(service.config, api_url=str(server.make_url('')), list_cache_ttl=0,
+                                       part_size=16 * 1024)
+            fresh.set_github_credentials('token')
+            assert await fresh.backup_configuration(config)
+            fresh_requests = api.requests[count + 1:]
+
+            restored = await fresh.restore_configuration()
+
+            for i in range(4):
+                api.gists[f"other{i}"] = {'id': f"other{i}", 'description': 'x', 'created_at': 'now',
+                                          'updated_at': 'now', 'files': {'notes.txt': 'hi'}}
+            listed = await service.list_backups()
+            listed_again = await service.list_backups()
+            return created, unchanged_requests, patched, fresh_requests, restored, listed, listed_again
+        finally:
+            await server.close()
+
+    created, unchanged_requests, patched, fresh_requests, restored, listed, listed_again = asyncio.run(run())
+
+    assert created[0] == 'POST' and len([name for name in created[1] if '.commands.' in name]) > 1
+    assert unchanged_requests == 0
+    assert patched == ('PATCH', ['stream-artifact-config.ai.json', 'stream-artifact-config.json'])
+    assert [method for method, _ in fresh_requests] == ['GET']
+    assert restored['ai'] == {'model': 'b'} and restored['commands']['!cmd150'] == "response 150 " * 50
+    assert len(restored['commands']) == 200
+    assert [backup['id'] for backup in listed] == [backup['id'] for backup in listed_again] == ['gist0']
+    assert [page for method, page in api.requests if method == 'LIST'] == [1, 2, 3, 1, 2, 3]
+
+
+def test_gist_backups_never_upload_credentials():
+    api = FakeGistAPI()
+    secrets = ['oauth:twitchsecret', 'sk-or-aisecret', 'eleven-secret', 'ghp_gistsecret']
+
+    async def run():
+        server = TestServer(api.app())
+        await server.start_server()
+        try:
+            service = CloudBackupService(FakeConfig(), api_url=str(server.make_url('')), list_cache_ttl=0)
+            service.set_github_credentials(secrets[3])
+            config = {
+                'twitch': {'channel': 'chan', 'token': secrets[0], 'client_id': 'public-id'},
+                'ai': {'model': 'a', 'api_key': secrets[1], 'elevenlabs_api_key': secrets[2]},
+                'backup': {'backup_type': 'github', 'github_token': secrets[3]},
+                'commands': {'!token': 'tokens are earned in chat'},
+            }
+            assert await service.backup_configuration(config)
+            config['ai']['model'] = 'b'
+            config['twitch']['token'] = 'oauth:rotated'
+            assert await service.backup_configuration(config)
+            return await service.restore_configuration()
+        finally:
+            await server.close()
+
+    restored = asyncio.run(run())
+
+    assert len(api.bodies) == 2 and 'PATCH' in [method for method, _ in api.requests]
+    for body in api.bodies:
+        for secret in secrets + ['oauth:rotated']:
+            assert secret not in body
+    assert restored['twitch'] == {'channel': 'chan', 'client_id': 'public-id'}
+    assert restored['ai'] == {'model': 'b'}
+    assert restored['backup'] == {'backup_type': 'github'}
+    assert restored['commands'] == {'!token': 'tokens are earned in chat'}
+
+
+def test_scheduler_debounces_config_bursts(tmp_path):
+    class SavingConfig(FakeConfig):
+        data_dir = tmp_path
+
+        def __init__(self):
+            super().__init__()
+            self.listeners = []
+            self.data = {'ai': {'model': 'a'}}
+
+        def add_save_listener(self, callback):
+            self.listeners.append(callback)
+
+        def to_dict(self):
+            return self.data
+
+        def save(self):
+            for callback in self.listeners:
+                callback()
+
+    class SlowDatabaseJob:
+        def run(self):
+            time.sleep(0.05)
+            return {'main.db': SimpleNamespace(file_size=1234)}
+
+    config = SavingConfig()
+    local = LocalBackupService(config)
+
+    async def run():
+        scheduler = BackupScheduler(config, [local], SlowDatabaseJob(), debounce=0.05, database_interval=0.02)
+        scheduler.start()
+        for i in range(20):
+            config.data = {'ai': {'model': f'model {i}'}}
+            config.save()
+            await asyncio.sleep(0.005)
+
+        # The loop keeps running while the snapshot sleeps on the pool
+        ticks = 0
+        while 'database' not in scheduler.last_runs or scheduler.config_backups == 0:
+            await asyncio.sleep(0.001)
+            ticks += 1
+
+        config.save()
+        await scheduler.stop()
+        return scheduler, ticks
+
+    scheduler, ticks = asyncio.run(run())
+
+    assert scheduler.config_backups == 2
+    # The second run found the configuration unchanged and stored nothing
+    assert len(local.store.backups) == 1
+    assert json.loads(local.store.get()) == {'ai': {'model': 'model 19'}}
+    status = scheduler.status()
+    assert status['database']['size'] == 1234 and status['database']['duration'] >= 0.05
+    assert status['LocalBackupService']['success'] and ticks > 10
+
+
+def test_scheduler_stop_bounds_the_final_backup():
+    class HangingService:
+        async def backup_configuration(self, config_data):
+            await asyncio.sleep(60)
+
+    class ListeningConfig(FakeConfig):
+        def add_save_listener(self, callback):
+            self.listener = callback
+
+        def to_dict(self):
+            return {'ai': {'model': 'a'}}
+
+    config = ListeningConfig()
+
+    async def run():
+        scheduler = BackupScheduler(config, [HangingService()], debounce=30)
+        scheduler.start()
+        config.listener()
+        start = time.monotonic()
+        await scheduler.stop(timeout=0.1)
+        return scheduler, time.monotonic() - start
+
+    scheduler, elapsed = asyncio.run(run())
+
+    assert elapsed < 1
+    assert scheduler.config_backups == 0
+    assert scheduler._loop is None and scheduler.executor._shutdown
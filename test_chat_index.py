@@ -0,0 +1,50 @@
+from src.ui.chat_index import ChatIndex
+
+
+def make_message(i, username='viewer', message_type='chat', text=None):
+    return {'username': username, 'message': text or f'hello number {i}', 'type': message_type}
+
+
+def test_search_by_user_type_and_token():
+    index = ChatIndex(capacity=100)
+    index.add(make_message(1, 'alice', text='hey @bob nice play'))
+    index.add(make_message(2, 'bob', 'command', text='!ai what is this game'))
+    index.add(make_message(3, 'StreamArtifact', 'ai_response', text='It is a racing game'))
+
+    assert [m['username'] for m in index.search(username='ALICE')] == ['alice']
+    assert [m['type'] for m in index.search(message_type='ai_response')] == ['ai_response']
+    assert [m['username'] for m in index.search('game')] == ['bob', 'StreamArtifact']
+    assert [m['username'] for m in index.mentions('bob')] == ['alice']
+    assert index.search('game', username='bob', message_type='command')[0]['username'] == 'bob'
+    assert index.search('missing') == []
+
+
+def test_mentions_match_whole_tokens():
+    index = ChatIndex(capacity=10)
+    index.add(make_message(1, 'alice', text='@bobcat is here'))
+    index.add(make_message(2, 'carol', text='gg @Bob!'))
+    index.add(make_message(3, 'dave', text='bobcat bob'))
+
+    assert [m['username'] for m in index.mentions('bob')] == ['carol']
+    assert [index.matches(m, '@bob') for m in index.messages] == [False, True, False]
+
+
+def test_eviction_keeps_indexes_consistent():
+    index = ChatIndex(capacity=10)
+    for i in range(25):
+        index.add(make_message(i, f'user{i % 3}'))
+
+    assert len(index) == 10
+    assert index.first_seq == 15
+    assert [m['seq'] for m in index.search('hello')] == list(range(15, 25))
+    assert index.search('14') == []
+    assert all(seq >= 15 for postings in index.by_token.values() for seq in postings)
+    assert index.get(14) is None and index.get(24)['message'] == 'hello number 24'
+
+
+def test_matches_single_message():
+    index = ChatIndex()
+    msg = make_message(1, 'alice', text='GG @Bob')
+    assert index.matches(msg, query='gg', username='Alice')
+    assert index.matches(msg, query='@bob')
+    assert not index.matches(msg, message_type='command')
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+from src.core.chat_replay import ChatReplay, Raid, load_chat, percentiles, save_chat, synthetic_chat
+
+
+def test_synthetic_chat_is_reproducible_and_round_trips(tmp_path):
+    lines = synthetic_chat(10, 20, users=100, command_share=0.2, raids=[Raid(5, 500, 1)], seed=7)
+    assert lines == synthetic_chat(10, 20, users=100, command_share=0.2, raids=[Raid(5, 500, 1)], seed=7)
+    assert [line.at for line in lines] == sorted(line.at for line in lines)
+
+    raiders = [line for line in lines if line.user.startswith("raider")]
+    assert len(raiders) == 500 and all(5 <= line.at <= 6 for line in raiders)
+    assert any(line.text.startswith("!") for line in lines)
+
+    # Zipf: the top chatter writes far more than an average one
+    regulars = [line.user for line in lines if line.user.startswith("viewer")]
+    assert regulars.count("viewer0") > 5 * len(regulars) / 100
+
+    save_chat(lines, tmp_path / "chat.jsonl")
+    assert load_chat(tmp_path / "chat.jsonl") == lines
+
+
+def test_replay_times_each_message_through_the_handler():
+    lines = synthetic_chat(0.5, 200, users=50, seed=1)
+    seen = []
+
+    async def handler(message):
+        seen.append((message.author.name, message.content, message.channel.name))
+        if message.content == "gg":
+            await asyncio.sleep(0.01)
+        time.sleep(0.0005)
+
+    result = asyncio.run(ChatReplay(lines, handler, channel="test").run())
+
+    assert result.messages == len(lines) == len(seen) == len(result.latencies)
+    assert result.errors == 0
+    assert 0.4 < result.seconds < 2
+    assert seen[0] == (lines[0].user, lines[0].text, "test")
+    summary = result.summary()
+    assert summary['latency_ms']['p50'] <= summary['latency_ms']['p99'] <= summary['latency_ms']['max']
+    assert percentiles([0.001] * 99 + [0.5]) == {'p50': 1.0, 'p95': 1.0, 'p99': 1.0, 'max': 500.0}
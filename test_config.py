@@ -0,0 +1,139 @@
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.core.config import Config, compile_path
+
+ROOT = Path(__file__).resolve().parent
+
+# Saves ever-changing, large configurations as fast as it can
+WRITER = """
+import sys
+from src.core.config import Config, compile_path
+config = Config()
+for index in range(1_000_000):
+    config.config.ai.personality = str(index) * 200_000
+    config.save()
+    config.flush()
+    print(index, flush=True)
+"""
+
+
+def test_saves_are_coalesced_and_unchanged_content_skipped(tmp_path, monkeypatch):
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    config = Config()
+    saved = []
+    config.add_save_listener(lambda: saved.append(config.config.ai.model))
+
+    start = time.perf_counter()
+    for index in range(50):
+        config.config.ai.model = f"model-{index}"
+        config.save()
+    # save() never waits for the disk
+    assert time.perf_counter() - start < config.writer.debounce
+
+    deadline = time.monotonic() + 5
+    while not saved and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert config.writer.writes == 1
+    assert json.loads(config.config_file.read_text())['ai']['model'] == "model-49"
+
+    config.save()
+    assert config.flush()
+    assert config.writer.writes == 1 and config.writer.skipped == 1
+    assert saved == ["model-49"]
+
+    # An edit made by someone else is overwritten even if our content is unchanged
+    config.config_file.write_text("{}")
+    config.save()
+    config.flush()
+    assert config.writer.writes == 2
+    assert json.loads(config.config_file.read_text())['ai']['model'] == "model-49"
+
+
+def test_killed_writer_leaves_a_valid_config(tmp_path):
+    environment = dict(os.environ, HOME=str(tmp_path))
+    config_file = tmp_path / ".stream_artifact" / "config.json"
+    random.seed(7)
+
+    for _ in range(5):
+        process = subprocess.Popen([sys.executable, "-c", WRITER], cwd=ROOT, env=environment,
+                                   stdout=subprocess.PIPE, text=True)
+        # Let a few saves complete, then kill it at an arbitrary point of a write
+        for _ in range(random.randint(1, 3)):
+            process.stdout.readline()
+        time.sleep(random.uniform(0, 0.02))
+        process.send_signal(signal.SIGKILL)
+        process.wait()
+        process.stdout.close()
+
+        data = json.loads(config_file.read_text())
+        personality = data['ai']['personality']
+        assert personality and personality == personality[:len(personality) // 200_000] * 200_000
+        Config.parse(data)
+
+
+def test_dot_paths_are_validated_and_subscribable(tmp_path, monkeypatch):
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    config = Config()
+    changes = []
+    config.subscribe('ai.random_reply_chance', changes.append)
+
+    assert config.get('ai.model') == config.config.ai.model
+    assert config.get('ai') is config.config.ai
+    assert config.get('ai.openrouter_api_key', 'missing') == 'missing'
+    assert compile_path('ai.model') is compile_path('ai.model')
+
+    config.set('ai.random_reply_chance', 1)
+    assert config.config.ai.random_reply_chance == 1.0
+    config.set('ai.random_reply_chance', 1.0)
+    assert [(change.path, change.old, change.new) for change in changes] == [('ai.random_reply_chance', 0.05, 1.0)]
+
+    for key, value in (('app.setup_complete', True), ('twitch', 'broadcaster_token'), ('ai.model.name', 'x')):
+        with pytest.raises(KeyError):
+            config.set(key, value)
+    with pytest.raises(ValueError):
+        config.set('ai.memory_depth', True)
+    with pytest.raises(KeyError):
+        config.subscribe('ai.chance', changes.append)
+
+    config.reset_to_defaults()
+    assert changes[-1].new == 0.05
+    config.unsubscribe('ai.random_reply_chance', changes.append)
+    config.set('ai.random_reply_chance', 0.5)
+    assert len(changes) == 2
+
+
+def test_initial_load_keeps_valid_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    config_file = tmp_path / ".stream_artifact" / "config.json"
+    config_file.parent.mkdir()
+    data = {
+        'twitch': {'token': 'oauth:keep', 'username': 'bot', 'removed_setting': 1},
+        'ai': {'api_key': 'sk-keep', 'memory_depth': 20.0, 'max_response_length': 'long'},
+        'plugins': {'enabled': True},
+    }
+    config_file.write_text(json.dumps(data))
+
+    config = Config()
+
+    assert config.twitch.token == 'oauth:keep' and config.twitch.username == 'bot'
+    assert config.ai.api_key == 'sk-keep' and config.ai.memory_depth == 20
+    assert config.ai.max_response_length == 480
+    # A file that is not JSON at all is kept aside instead of being overwritten
+    broken = '{"twitch": {"token": "oauth:keep",'
+    config_file.write_text(broken)
+    assert Config().twitch.token == ''
+    assert config_file.with_name("config.json.invalid").read_text() == broken
+
+    # Hot reloads stay strict
+    for bad in ({'plugins': {}}, {'ai': {'memory_depth': 20.0}}, {'twitch': {'removed_setting': 1}}):
+        with pytest.raises(ValueError):
+            Config.parse(bad)
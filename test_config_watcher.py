@@ -0,0 +1,89 @@
+import asyncio
+import json
+from pathlib import Path
+
+from src.core.config import Config
+from src.core.config_watcher import ConfigWatcher
+
+
+def make_config(tmp_path, monkeypatch):
+    tmp_path.mkdir(exist_ok=True)
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    config = Config()
+    config.save()
+    config.flush()
+    return config
+
+
+def rewrite(config, section, key, value):
+    data = json.loads(config.config_file.read_text())
+    data[section][key] = value
+    config.config_file.write_text(json.dumps(data))
+
+
+def test_config_reload_publishes_to_matching_sections(tmp_path, monkeypatch):
+    for use_inotify in (True, False):
+        config = make_config(tmp_path / str(use_inotify), monkeypatch)
+        watcher = ConfigWatcher(config, poll_interval=0.02, settle=0.01)
+        received = {'ai': [], 'ui': [], 'all': []}
+
+        async def on_ai(event):
+            received['ai'].append(event)
+
+        watcher.subscribe(on_ai, 'ai')
+        watcher.subscribe(received['ui'].append, 'ui')
+        watcher.subscribe(received['all'].append)
+
+        async def run():
+            watcher.start(use_inotify=use_inotify)
+            try:
+                await asyncio.sleep(0.05)
+                rewrite(config, 'ai', 'model', 'other/model')
+                for _ in range(100):
+                    if watcher.reloads:
+                        break
+                    await asyncio.sleep(0.01)
+
+                # Invalid files are ignored and keep the running configuration
+                config.config_file.write_text('{"ai": {"model": 5}}')
+                await asyncio.sleep(0.2)
+                config.config_file.write_text('{"ai": ')
+                await asyncio.sleep(0.2)
+            finally:
+                watcher.stop()
+
+        asyncio.run(run())
+
+        assert watcher.backend == ("inotify" if use_inotify else "polling")
+        assert watcher.reloads == 1
+        assert config.ai.model == 'other/model'
+        assert len(received['ai']) == 1 and len(received['all']) == 1
+        assert received['ui'] == []
+        change = received['ai'][0].get('ai.model')
+        assert change.old != change.new == 'other/model'
+
+        # The app's own saves produce no event
+        config.save()
+        config.flush()
+        assert asyncio.run(watcher.reload()) is None
+
+
+def test_own_saves_do_not_revert_later_changes(tmp_path, monkeypatch):
+    config = make_config(tmp_path, monkeypatch)
+    watcher = ConfigWatcher(config)
+
+    config.set('backup.gist_id', 'abc')
+    config.save()
+    config.flush()
+    # Changed after the save, like CloudBackupService after an upload
+    config.set('backup.last_cloud_backup', '2024-01-01T00:00:00')
+    assert asyncio.run(watcher.reload()) is None
+    assert config.backup.gist_id == 'abc'
+    assert config.backup.last_cloud_backup == '2024-01-01T00:00:00'
+
+    # An outside edit back to content the app wrote earlier is still applied
+    saved = config.config_file.read_text()
+    rewrite(config, 'ai', 'model', 'edited/model')
+    assert asyncio.run(watcher.reload()).get('ai.model').new == 'edited/model'
+    config.config_file.write_text(saved)
+    assert asyncio.run(watcher.reload()).get('ai.model').new == config.ai.model != 'edited/model'
@@ -0,0 +1,46 @@
+import asyncio
+import json
+import threading
+import time
+
+from src.core.cpu_profiler import SamplingProfiler
+
+
+def busy_handler(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_profile_reports_stacks_and_blocking_callbacks(tmp_path):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="asyncio")
+    thread.start()
+    try:
+        profiler = SamplingProfiler({'asyncio': thread.ident}, tmp_path, interval=0.002)
+        done = threading.Event()
+        assert profiler.start(0.5, lambda report: done.set())
+        assert not profiler.start(0.5)
+
+        async def handler():
+            busy_handler(0.15)
+
+        time.sleep(0.05)
+        asyncio.run_coroutine_threadsafe(handler(), loop).result()
+        assert done.wait(5)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    report = profiler.last_report
+    stacks = report.collapsed_path.read_text().splitlines()
+    assert all(line.startswith("asyncio;") and line.rsplit(" ", 1)[1].isdigit() for line in stacks)
+    assert any("busy_handler" in line for line in stacks)
+    assert any("busy_handler" in function for function, _ in report.hot_functions)
+
+    summary = json.loads(report.summary_path.read_text())
+    slowest = summary['longest_blocking'][0]
+    assert slowest['callback'] == "task test_profile_reports_stacks_and_blocking_callbacks.<locals>.handler"
+    assert slowest['max_ms'] >= 150
+    assert asyncio.events.Handle._run.__name__ == "_run"
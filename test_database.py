@@ -0,0 +1,242 @@
+import asyncio
+import json
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from src.core.database import Database
+from src.core.migrations import MIGRATIONS, SEARCH_HISTORY_VERSION, Migration, MigrationRunner, dry_run
+from src.core.partitions import partition_schema
+
+
+def test_full_text_search_stays_in_sync(tmp_path):
+    async def run():
+        database = Database(tmp_path / "test.db")
+        await database.add_message('alice', 'that dragon fight was hype', 'chan')
+        await database.add_message('bob', 'Dragon slayer strats', 'other')
+        database.queue_message('carol', 'no dragons here, just chat', 'chan')
+        await database.flush()
+        await database.add_ai_memory('alice', 'asked about the dragon', 'It is the final boss')
+
+        ranked = await database.search_messages('dragon')
+        recent = await database.search_messages('drag', channel='chan', order='recent')
+        page = await database.search_messages('drag', order='recent', limit=1, offset=1)
+        memory = await database.search_memory('boss', username='alice')
+
+        schema = partition_schema(database.current_partition)
+        await database.connection.execute(f"DELETE FROM {schema}.messages WHERE username = 'bob'")
+        await database.connection.commit()
+        after_delete = await database.search_messages('slayer')
+        await database.close()
+        return ranked, recent, page, memory, after_delete
+
+    ranked, recent, page, memory, after_delete = asyncio.run(run())
+
+    assert {row['username'] for row in ranked} == {'alice', 'bob', 'carol'}
+    assert [row['username'] for row in recent] == ['carol', 'alice']
+    assert [row['username'] for row in page] == ['bob']
+    assert memory[0]['response'] == 'It is the final boss'
+    assert after_delete == []
+
+
+def test_hot_queries_use_indexes(tmp_path):
+    """Every query Database runs must avoid full table scans and temp B-tree sorts"""
+    async def run():
+        database = Database(tmp_path / "plans.db")
+        await database.add_user('alice')
+        await database.add_message('alice', 'hello dragon', 'chan')
+        database.queue_message('alice', 'queued hello', 'chan')
+        await database.flush()
+        await database.add_ai_memory('alice', 'dragon question', 'dragon answer')
+        await database.add_stream_event('follow', 'alice')
+
+        statements = []
+        await database.connection.set_trace_callback(statements.append)
+
+        await database.get_recent_messages('chan')
+        await database.get_user_memory('alice')
+        await database.get_user_stats('alice')
+        await database.get_recent_events()
+        await database.search_messages('dragon')
+        await database.search_messages('dragon', channel='chan', username='alice', order='recent')
+        await database.search_messages('hello', since='2000-01-01', offset=10)
+        await database.search_memory('dragon', username='alice')
+        await database.search_memory('dragon', order='recent')
+        database.queue_message('alice', 'another hello', 'chan')
+        await database.flush()
+        await database.cleanup_old_data()
+
+        await database.connection.set_trace_callback(None)
+
+        plans = {}
+        for sql in statements:
+            if sql.lstrip().startswith(('--', 'BEGIN', 'COMMIT', 'PRAGMA', 'ATTACH', 'DETACH')):
+                continue
+            # FTS5's own statements on its shadow tables ('schema'.'table')
+            if "'.'" in sql:
+                continue
+            cursor = await database.connection.execute(f"EXPLAIN QUERY PLAN {sql}")
+            plans[sql] = [row['detail'] for row in await cursor.fetchall()]
+
+        await database.close()
+        return plans
+
+    plans = asyncio.run(run())
+    assert len(plans) >= 10
+
+    for sql, details in plans.items():
+        filtered = ' WHERE ' in ' '.join(sql.upper().split())
+        for detail in details:
+            # Walking an index in ORDER BY order is fine for an unfiltered
+            # LIMIT query; anything filtered must SEARCH an index instead
+            scan = detail.startswith('SCAN') and 'VIRTUAL TABLE' not in detail
+            assert not (scan and (filtered or 'USING' not in detail)), f"full scan ({detail}) in: {sql}"
+            assert 'TEMP B-TREE' not in detail, f"sort ({detail}) in: {sql}"
+
+
+def test_migrations_are_versioned_and_transactional(tmp_path):
+    db_path = tmp_path / "migrations.db"
+    database = Database(db_path)
+    assert database.schema_version == MIGRATIONS[-1].version
+
+    def add_column(conn):
+        conn.execute("ALTER TABLE topics ADD COLUMN weight REAL")
+
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (id INTEGER)")
+        raise RuntimeError("boom")
+
+    extra = MIGRATIONS + (Migration(100, "add weight", add_column),)
+    current, timings = dry_run(db_path, extra)
+    assert current == MIGRATIONS[-1].version
+    assert [migration.version for migration, _ in timings] == [100]
+
+    conn = sqlite3.connect(str(db_path))
+    runner = MigrationRunner(conn, extra + (Migration(101, "broken", broken),))
+    assert runner.current_version == MIGRATIONS[-1].version
+
+    with pytest.raises(RuntimeError):
+        runner.migrate()
+
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+    assert runner.current_version == 100
+    assert 'half_done' not in tables
+    conn.close()
+
+
+def test_search_history_is_indexed_online(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "upgrade.db"))
+    conn.execute("CREATE TABLE messages (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL, "
+                 "content TEXT NOT NULL, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, channel TEXT NOT NULL, "
+                 "message_type TEXT DEFAULT 'chat', metadata TEXT DEFAULT '{}')")
+    conn.execute("INSERT INTO messages (username, content, channel) VALUES ('alice', 'old dragon', 'chan')")
+    conn.commit()
+
+    def matches():
+        return conn.execute("SELECT COUNT(*) FROM messages_fts WHERE messages_fts MATCH 'dragon'").fetchone()[0]
+
+    runner = MigrationRunner(conn)
+    runner.migrate(defer_online=True)
+    # Later regular migrations ran, but the deferred index build (2) did not
+    assert runner.current_version == 1
+    assert [migration.version for migration in runner.pending()] == [2, 5, 6]
+    conn.execute("INSERT INTO messages (username, content, channel) VALUES ('bob', 'new dragon', 'chan')")
+    # Before the online step only rows written since the upgrade are indexed
+    assert matches() == 1
+    assert SEARCH_HISTORY_VERSION in [migration.version for migration in runner.pending()]
+
+    runner.migrate()
+    assert matches() == 2
+    assert runner.pending() == []
+    assert runner.current_version == MIGRATIONS[-1].version
+    conn.close()
+
+
+def test_message_metadata_columns_and_backfill(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    legacy = sqlite3.connect(str(db_path))
+    legacy.execute("""
+        CREATE TABLE messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL, content TEXT NOT NULL,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, channel TEXT NOT NULL,
+            message_type TEXT DEFAULT 'chat', metadata TEXT DEFAULT '{}'
+        )
+    """)
+    legacy.execute(
+        "INSERT INTO messages (username, content, channel, metadata) VALUES (?, ?, ?, ?)",
+        ('alice', 'old message', 'chan', '{"display_name": "Alice", "is_subscriber": true, "is_vip": false, '
+                                         '"is_mod": false, "badges": ["subscriber", "glhf-pledge"], "color": "#f00"}')
+    )
+    legacy.commit()
+    legacy.close()
+
+    async def run():
+        database = Database(db_path)
+        await database.add_message('bob', 'new message', 'chan', metadata={
+            'display_name': 'Bob', 'is_subscriber': False, 'is_vip': True, 'is_mod': True,
+            'badges': ['moderator', 'vip']
+        })
+        plain = await database.get_recent_messages('chan')
+        full = await database.get_recent_messages('chan', include_metadata=True)
+        # The legacy row stays in the main table, new messages go to this month's partition
+        schema = partition_schema(database.current_partition)
+        cursor = await database.connection.execute(f"""
+            SELECT id, display_name, badges, metadata FROM main.messages
+            UNION ALL SELECT id, display_name, badges, metadata FROM {schema}.messages ORDER BY id
+        """)
+        rows = [tuple(row)[1:] for row in await cursor.fetchall()]
+        await database.close()
+        return plain, full, rows
+
+    plain, full, rows = asyncio.run(run())
+
+    assert 'metadata' not in plain[0]
+    assert {message['display_name'] for message in plain} == {'Alice', 'Bob'}
+
+    by_user = {message['username']: message['metadata'] for message in full}
+    assert by_user['alice'] == {'display_name': 'Alice', 'is_subscriber': True, 'is_vip': False, 'is_mod': False,
+                                'badges': ['subscriber', 'glhf-pledge'], 'color': '#f00'}
+    assert by_user['bob']['is_mod'] and by_user['bob']['is_vip'] and not by_user['bob']['is_subscriber']
+    assert sorted(by_user['bob']['badges']) == ['moderator', 'vip']
+
+    # Promoted fields left the JSON; only rare extras remain
+    assert json.loads(rows[0][2]) == {'badges': ['glhf-pledge'], 'color': '#f00'}
+    assert rows[1][2] is None
+
+
+def test_partitions_rotate_archive_and_expire(tmp_path, monkeypatch):
+    now = {'value': datetime(2024, 1, 15)}
+    monkeypatch.setattr('src.core.database._utcnow', lambda: now['value'])
+
+    async def run():
+        database = Database(tmp_path / "partitioned.db")
+        database.partitions.live_partitions = 2
+        for month, word in ((1, 'january'), (2, 'february'), (3, 'march')):
+            now['value'] = datetime(2024, month, 15)
+            await database.add_message('alice', f'{word} dragon', 'chan')
+
+        live = database.partitions.live_keys()
+        archived = database.partitions.archived_keys()
+        recent = await database.get_recent_messages('chan')
+        live_only = await database.search_messages('january')
+        with_archive = await database.search_messages('january', include_archived=True)
+        since = await database.search_messages('dragon', since='2024-01-01', order='recent')
+
+        now['value'] = datetime(2024, 6, 1)
+        await database.cleanup_old_data(days=60)
+        remaining = database.partitions.live_keys() + database.partitions.archived_keys()
+        await database.close()
+        return live, archived, recent, live_only, with_archive, since, remaining
+
+    live, archived, recent, live_only, with_archive, since, remaining = asyncio.run(run())
+
+    assert live == ['2024_03', '2024_02']
+    assert archived == ['2024_01']
+    assert [message['content'] for message in recent] == ['march dragon', 'february dragon']
+    assert live_only == []
+    assert [row['content'] for row in with_archive] == ['january dragon']
+    assert [row['content'] for row in since] == ['march dragon', 'february dragon', 'january dragon']
+    assert len({row['id'] for row in since}) == 3
+    # Retention dropped the whole months before April; June's partition was just created
+    assert remaining == ['2024_06']
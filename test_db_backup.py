@@ -0,0 +1,42 @@
+import sqlite3
+
+from src.core.db_backup import DatabaseBackup
+
+
+def test_snapshots_are_incremental_and_verified(tmp_path):
+    db_path = tmp_path / "live.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE messages (id INTEGER PRIMARY KEY, content TEXT)")
+    conn.executemany("INSERT INTO messages (content) VALUES (?)", ((f"message {i} " * 20,) for i in range(5000)))
+    conn.commit()
+
+    backup = DatabaseBackup(db_path, tmp_path / "backups", pages_per_step=16)
+    full = backup.snapshot()
+
+    # A writer keeps using the database between snapshots
+    conn.execute("UPDATE messages SET content = 'edited' WHERE id = 42")
+    conn.execute("INSERT INTO messages (content) VALUES ('new')")
+    conn.commit()
+    delta = backup.snapshot()
+
+    assert full.kind == 'full' and delta.kind == 'delta' and delta.base == full.id
+    assert delta.changed_pages < full.changed_pages / 10
+    assert delta.file_size < full.file_size / 10
+
+    assert backup.restore(tmp_path / "restored.db").id == delta.id
+    rows = sqlite3.connect(str(tmp_path / "restored.db")).execute(
+        "SELECT COUNT(*), (SELECT content FROM messages WHERE id = 42) FROM messages"
+    ).fetchone()
+    assert rows == (5001, 'edited')
+
+    backup.restore(tmp_path / "older.db", full.id)
+    assert sqlite3.connect(str(tmp_path / "older.db")).execute("SELECT COUNT(*) FROM messages").fetchone()[0] == 5000
+
+    # A damaged snapshot file is caught
+    with open(tmp_path / "backups" / delta.file, 'r+b') as handle:
+        handle.seek(40)
+        handle.write(b"\x00\x01\x02")
+    assert backup.verify(full.id)
+    assert not backup.verify()
+    conn.close()
@@ -0,0 +1,46 @@
+import asyncio
+from datetime import datetime
+
+from src.core.database import Database
+from src.core.export import HistoryExporter, read_chunk
+
+
+def test_export_is_chunked_and_incremental(tmp_path, monkeypatch):
+    now = {'value': datetime(2024, 1, 15)}
+    monkeypatch.setattr('src.core.database._utcnow', lambda: now['value'])
+    db_path = tmp_path / "export.db"
+
+    async def add(month, count):
+        database = Database(db_path)
+        database.partitions.live_partitions = 1
+        now['value'] = datetime(2024, month, 15)
+        for i in range(count):
+            database.queue_message(f'viewer{i}', f'month {month} message {i}', 'chan')
+        await database.add_ai_memory('viewer1', 'question', None)
+        await database.flush()
+        await database.close()
+
+    asyncio.run(add(1, 5))
+    asyncio.run(add(2, 3))
+    assert Database(db_path).partitions.archived_keys() == ['2024_01']
+
+    exporter = HistoryExporter(db_path, tmp_path / "out", format='jsonz', chunk_rows=4)
+    first = exporter.export()
+    assert first.rows == {'messages': 8, 'users': 0, 'stream_events': 0, 'ai_memory': 2}
+
+    asyncio.run(add(2, 2))
+    second = exporter.export()
+    assert second.rows == {'messages': 2, 'users': 0, 'stream_events': 0, 'ai_memory': 1}
+
+    messages = sorted(path for path in first.files + second.files if path.parent.name == 'messages')
+    ids, contents = [], []
+    for path in messages:
+        columns = read_chunk(path)
+        assert len(columns['id']) <= 4
+        ids += columns['id']
+        contents += columns['content']
+    memory = read_chunk(next(path for path in second.files if path.parent.name == 'ai_memory'))
+
+    assert ids == sorted(set(ids)) and len(ids) == 10
+    assert contents[0] == 'month 1 message 0' and contents[-1] == 'month 2 message 1'
+    assert memory['response'] == [None]
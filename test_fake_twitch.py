@@ -0,0 +1,93 @@
+import asyncio
+
+import aiohttp
+
+from src.core.fake_twitch import FakeTwitchServer, Scenario
+
+
+async def read_until(reader, marker, limit=5000):
+    lines = []
+    while len(lines) < limit:
+        line = (await asyncio.wait_for(reader.readline(), 5)).decode('utf-8').rstrip("\r\n")
+        lines.append(line)
+        if marker in line:
+            return lines
+    raise AssertionError(f"{marker!r} not received")
+
+
+def test_tcp_login_join_chat_ping_and_rate_limit():
+    async def run():
+        server = FakeTwitchServer(rate_limit=3, tokens=["oauth:secret"])
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            writer.write(b"PASS oauth:secret\r\nNICK StreamBot\r\nCAP REQ :twitch.tv/tags twitch.tv/commands\r\n")
+            assert any(" 001 streambot " in line for line in await read_until(reader, " 376 "))
+            assert "CAP * ACK :twitch.tv/tags twitch.tv/commands" in (await read_until(reader, "CAP"))[-1]
+
+            writer.write(b"JOIN #chan\r\n")
+            joined = await read_until(reader, "ROOMSTATE #chan")
+            assert any(" 353 streambot = #chan :streambot" in line for line in joined)
+
+            await server.say("chan", "viewer1", "hello there", badges=('subscriber', 'vip'))
+            line = (await read_until(reader, "PRIVMSG"))[-1]
+            tags, _, rest = line.partition(" ")
+            assert rest == ":viewer1!viewer1@viewer1.tmi.twitch.tv PRIVMSG #chan :hello there"
+            tags = dict(tag.split("=", 1) for tag in tags.lstrip("@").split(";"))
+            assert tags['badges'] == "subscriber/1,vip/1" and tags['subscriber'] == "1" and tags['vip'] == "1"
+
+            writer.write(b"PING :tmi.twitch.tv\r\n")
+            assert (await read_until(reader, "PONG"))[-1] == ":tmi.twitch.tv PONG tmi.twitch.tv :tmi.twitch.tv"
+
+            for text in ["one", "one", "two", "three", "four"]:
+                writer.write(f"PRIVMSG #chan :{text}\r\n".encode())
+            assert "msg_duplicate" in (await read_until(reader, "NOTICE"))[-1]
+            assert "msg_ratelimit" in (await read_until(reader, "NOTICE"))[-1]
+            assert [message.text for message in server.received] == ["one", "two", "three"]
+            assert (server.duplicates, server.rate_limited) == (1, 1)
+
+            # A wrong token is refused the way Twitch refuses it
+            reader2, writer2 = await asyncio.open_connection(server.host, server.port)
+            writer2.write(b"PASS oauth:wrong\r\nNICK intruder\r\n")
+            assert "Login unsuccessful" in (await read_until(reader2, "NOTICE"))[-1]
+            writer.close()
+            writer2.close()
+        finally:
+            await server.stop()
+
+    asyncio.run(run())
+
+
+def test_websocket_raid_scenario_and_forced_disconnect():
+    async def run():
+        server = FakeTwitchServer()
+        await server.start()
+        scenario = Scenario.synthetic("chan", 0.5, 200, seed=3).raid(0.2, "bigstreamer", 2000, 0.3).disconnect(0.8)
+        try:
+            async with aiohttp.ClientSession() as session:
+                ws = await session.ws_connect(server.ws_url)
+                await ws.send_str("PASS oauth:x\r\nNICK bot\r\nJOIN #chan\r\n")
+                await server.wait_for_join("chan")
+
+                play = asyncio.create_task(server.play(scenario, speed=2.0))
+                lines = []
+                async for msg in ws:
+                    lines += [line for line in msg.data.split("\r\n") if line]
+                await play
+
+                chat = [line for line in lines if " PRIVMSG #chan :" in line]
+                assert len(chat) == scenario.chat_lines > 2000
+                assert sum("bigstreamer_raider0_" in line for line in chat) == 2000
+                assert any("msg-id=raid" in line and "msg-param-viewerCount=2000" in line for line in lines)
+                assert ws.closed and not server.sessions
+
+                # The client comes back after the drop
+                ws = await session.ws_connect(server.ws_url)
+                await ws.send_str("PASS oauth:x\r\nNICK bot\r\nJOIN #chan\r\n")
+                await server.wait_for_join("chan")
+                assert (server.connections, server.logins) == (2, 2)
+                await ws.close()
+        finally:
+            await server.stop()
+
+    asyncio.run(run())
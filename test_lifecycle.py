@@ -0,0 +1,133 @@
+import asyncio
+
+from src.core.lifecycle import LifecycleManager
+from src.core.twitch_client import TwitchClient
+from src.ui.ui_bridge import UIBridge
+
+
+def test_steps_time_out_before_the_guard():
+    async def run():
+        manager = LifecycleManager(deadline=1.0, min_step_time=0.1, step_margin=0.05)
+        budgets = []
+
+        async def drain(budget):
+            # Like drain_outbound: wait out the budget, then count what is left
+            budgets.append(budget)
+            try:
+                await asyncio.wait_for(asyncio.Event().wait(), budget)
+            except asyncio.TimeoutError:
+                return 3
+
+        async def hang(budget):
+            await asyncio.Event().wait()
+
+        async def fail(budget):
+            raise RuntimeError("disk gone")
+
+        async def close(budget):
+            budgets.append(budget)
+
+        manager.register("drain", drain)
+        manager.register("hang", hang)
+        manager.register("fail", fail)
+        manager.register("close", close)
+        report = await manager.shutdown()
+        again = await manager.shutdown()
+        return report, again, budgets
+
+    report, again, budgets = asyncio.run(run())
+
+    assert report.completed == ["drain", "close"]
+    assert report.dropped == {"drain": 3}
+    assert report.timed_out == ["hang"]
+    assert report.failed == {"fail": "disk gone"}
+    assert not report.clean
+    assert again is report
+    # The deadline less min_step_time for each of the three later steps, less the margin
+    assert 0.6 <= budgets[0] <= 0.65
+    assert 0.1 <= budgets[1] <= 0.15
+
+
+def test_hanging_step_leaves_time_to_close():
+    async def run():
+        manager = LifecycleManager(deadline=1.0, min_step_time=0.5)
+        closed = []
+
+        async def hang(budget):
+            await asyncio.Event().wait()
+
+        async def close(budget):
+            await asyncio.sleep(0.05)
+            closed.append(budget)
+
+        manager.register("outbound messages", hang)
+        for name in ("database", "traces", "loop monitor"):
+            manager.register(name, close)
+        return await manager.shutdown(), closed
+
+    report, closed = asyncio.run(run())
+
+    assert report.timed_out == ["outbound messages"]
+    assert report.completed == ["database", "traces", "loop monitor"]
+    # Four steps share the deadline, so each is set aside a quarter of it
+    assert all(budget > 0.1 for budget in closed)
+    assert report.duration < 1.1
+
+
+def test_drain_outbound_stops_the_send_worker():
+    async def run():
+        # Only the send queue and worker are used; twitchio's Bot setup is skipped
+        client = TwitchClient.__new__(TwitchClient)
+        client.message_queue = asyncio.Queue()
+        client.accepting_messages = True
+        client.ui_bridge = None
+        client.target_channel = "chan"
+        client._send_task = None
+        sent = []
+
+        async def send_message(message, channel=None):
+            sent.append(message)
+            if message == "slow":
+                await asyncio.sleep(60)
+            return True
+
+        client.send_message = send_message
+        client._send_task = asyncio.get_running_loop().create_task(client._send_worker())
+        for text in ("one", "slow", "two", "three"):
+            client.queue_send(text)
+        dropped = await client.drain_outbound(timeout=0.2)
+        return dropped, sent, client
+
+    dropped, sent, client = asyncio.run(run())
+
+    assert sent == ["one", "slow"]
+    assert dropped == 2
+    assert client._send_task.done()
+    assert client.message_queue.empty()
+
+
+def test_failed_sends_are_not_shown_as_said():
+    async def run():
+        client = TwitchClient.__new__(TwitchClient)
+        client.message_queue = asyncio.Queue()
+        client.accepting_messages = True
+        client.ui_bridge = UIBridge()
+        client.target_channel = "chan"
+        client.stats = {'messages_received': 0}
+
+        async def send_message(message, channel=None):
+            return message != "lost"
+
+        client.send_message = send_message
+        client._send_task = asyncio.get_running_loop().create_task(client._send_worker())
+        client.queue_send("lost")
+        await client.drain_outbound(timeout=1)
+        return client.ui_bridge
+
+    bridge = asyncio.run(run())
+    shown = []
+    bridge.on_messages = shown.extend
+    bridge.drain()
+
+    assert [(m['username'], m['type']) for m in shown] == [('System', 'system')]
+    assert "lost" in shown[0]['message']
@@ -0,0 +1,35 @@
+import logging
+import threading
+
+from src.core.log_pipeline import DuplicateSuppressor, LogPipeline
+
+
+def test_records_are_written_off_thread_and_storms_suppressed(tmp_path):
+    pipeline = LogPipeline(DuplicateSuppressor(window=60, burst=3))
+    pipeline.attach_file(tmp_path / "bot.log")
+    logger = logging.getLogger("test_log_pipeline")
+    logger.propagate = False
+    logger.addHandler(pipeline.handler)
+    logger.setLevel(logging.INFO)
+    pipeline.start()
+    try:
+        for index in range(5):
+            logger.info(f"💬 viewer{index}: hello")
+        for _ in range(1000):
+            logger.error("❌ Failed to send message: connection reset")
+        try:
+            raise ValueError("bad payload")
+        except ValueError:
+            logger.exception("❌ Handler failed")
+        writer = pipeline._thread
+    finally:
+        logger.removeHandler(pipeline.handler)
+        pipeline.stop()
+
+    assert writer is not threading.current_thread()
+    lines = (tmp_path / "bot.log").read_text(encoding='utf-8').splitlines()
+    assert sum("hello" in line for line in lines) == 5
+    assert sum(line.endswith("test_log_pipeline: ❌ Failed to send message: connection reset") for line in lines) == 3
+    assert any("Suppressed 997 more of: ❌ Failed to send message" in line for line in lines)
+    assert any("ValueError: bad payload" in line for line in lines)
+    assert pipeline.suppressor.suppressed == 997
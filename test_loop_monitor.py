@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+from src.core.loop_monitor import LoopMonitor
+
+
+def blocking_handler():
+    time.sleep(0.4)
+
+
+def test_blocking_call_is_detected_with_its_stack():
+    async def run():
+        monitor = LoopMonitor(interval=0.02, lag_budget=0.1, capture_after=0.05, warn_every=0)
+        warnings = []
+        monitor.subscribe(warnings.append)
+        monitor.start()
+
+        # Normal scheduling stays under budget
+        await asyncio.sleep(0.2)
+        assert not monitor.events
+
+        asyncio.get_running_loop().call_soon(blocking_handler)
+        await asyncio.sleep(0.2)
+        monitor.stop()
+        return monitor, warnings
+
+    monitor, warnings = asyncio.run(run())
+
+    assert len(monitor.events) == 1 and warnings == monitor.events
+    event = monitor.events[0]
+    assert event.lag >= 0.3
+    assert "blocking_handler" in event.stack
+    assert "blocking_handler" in event.culprit
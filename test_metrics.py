@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.core.database import Database
+from src.core.metrics import MetricsRegistry, metrics
+from src.core.metrics_server import MetricsServer
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests "served"', ('route',))
+    latency = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+    depth = registry.gauge('queue_depth', 'Queue depth')
+    depth.set_function(lambda: 7)
+
+    # Each thread counts in its own cells; the scrape adds them up
+    child = requests.labels(route='/a"b')
+    threads = [threading.Thread(target=lambda: [child.inc() for _ in range(10000)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value)
+
+    text = registry.render()
+    assert 'requests_total{route="/a\\"b"} 40000.0' in text
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1.0' in text
+    assert 'latency_seconds_bucket{le="1.0"} 3.0' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4.0' in text
+    assert 'latency_seconds_count 4.0' in text
+    assert 'queue_depth 7.0' in text
+
+
+def test_database_writes_are_served_on_metrics(tmp_path):
+    async def run():
+        database = Database(tmp_path / "metrics.db")
+        writes = metrics.get('stream_artifact_db_writes_total').labels().value
+        for index in range(30):
+            database.queue_message("viewer", f"message {index}", "chan")
+        await database.flush()
+        await database.close()
+
+        client = TestClient(TestServer(MetricsServer().app))
+        await client.start_server()
+        try:
+            response = await client.get('/metrics')
+            return writes, response.headers['Content-Type'], await response.text()
+        finally:
+            await client.close()
+
+    writes, content_type, text = asyncio.run(run())
+    assert content_type.startswith('text/plain; version=0.0.4')
+    assert f'stream_artifact_db_writes_total {writes + 60!r}' in text
+    assert 'stream_artifact_db_write_batch_seconds_count' in text
+    assert 'stream_artifact_db_write_queue_depth 0.0' in text
@@ -0,0 +1,45 @@
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+from src.core.database import Database
+from src.core.startup_profiler import StartupProfiler
+
+LAZY_MODULES = ['customtkinter', 'twitchio', 'aiohttp', 'PIL', 'src.ui.main_window']
+
+
+def test_app_import_defers_heavy_subsystems():
+    check = f"import sys, src.core.app; print([m for m in {LAZY_MODULES!r} if m in sys.modules])"
+    result = subprocess.run([sys.executable, '-c', check], cwd=Path(__file__).parent,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
+
+
+def test_profiler_records_imports_and_stages():
+    profiler = StartupProfiler()
+    profiler.enable()
+    try:
+        sys.modules.pop('colorsys', None)
+        with profiler.stage('import colorsys'):
+            import colorsys  # noqa: F401
+        profiler.mark('done')
+    finally:
+        profiler.disable()
+
+    assert 'colorsys' in profiler.import_times
+    assert profiler.stage_times[0][0] == 'import colorsys'
+    assert 'colorsys' in profiler.report()
+
+
+def test_database_deferred_init(tmp_path):
+    database = Database(tmp_path / 'test.db', defer_init=True)
+
+    async def run():
+        await database.add_message('viewer', 'hello', 'channel')
+        messages = await database.get_recent_messages('channel')
+        await database.disconnect()
+        return messages
+
+    messages = asyncio.run(run())
+    assert messages[0]['content'] == 'hello'
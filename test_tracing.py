@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+from src.core.database import Database
+from src.core.tracing import NOOP_SPAN, JsonlExporter, Tracer
+
+
+def test_sampled_message_spans_reach_the_jsonl_file(tmp_path):
+    exporter = JsonlExporter(tmp_path / "traces.jsonl", max_bytes=2000, backups=2)
+    tracer = Tracer(sample_rate=1.0, exporter=exporter)
+    outbound = asyncio.Queue()
+
+    async def send_worker():
+        text, parent = await outbound.get()
+        with tracer.span("chat.send", parent):
+            await asyncio.sleep(0)
+
+    async def run():
+        database = Database(tmp_path / "trace.db")
+        worker = asyncio.get_running_loop().create_task(send_worker())
+        with tracer.trace("chat.message", user="viewer") as root:
+            persist = tracer.span("db.persist")
+            database.queue_message("viewer", "hello", "chan")
+            database.queue_callback(persist.end)
+            with tracer.span("ai.http", model="test") as http:
+                http.set(status=200)
+            outbound.put_nowait(("hi", tracer.current()))
+        await database.flush()
+        await worker
+        await database.close()
+        return root
+
+    root = asyncio.run(run())
+    spans = tracer.recent_traces()[0]
+    assert [span.name for span in spans] == ["chat.message", "db.persist", "ai.http", "chat.send"]
+    assert all(span.trace_id == root.trace_id for span in spans)
+    assert all(span.parent_id == root.span_id for span in spans[1:])
+    assert spans[2].attributes == {'model': 'test', 'status': 200}
+
+    # db.persist ends at the commit, after the message handler returned
+    assert spans[1].start + spans[1].duration > root.start + root.duration
+
+    # Enough traces to rotate the small file
+    for _ in range(20):
+        with tracer.trace("chat.message"):
+            pass
+    # Spans are written by the exporter's thread; close() waits for them
+    exporter.close()
+    lines = (tmp_path / "traces.jsonl").read_text().splitlines()
+    assert (tmp_path / "traces.jsonl.1").exists()
+    assert json.loads(lines[-1])['name'] == "chat.message"
+    assert exporter.spans.empty()
+
+    # Exporting again after close starts a new writer
+    with tracer.trace("chat.message", after="close"):
+        pass
+    exporter.close()
+    assert json.loads((tmp_path / "traces.jsonl").read_text().splitlines()[-1])['attributes'] == {'after': 'close'}
+
+
+def test_unsampled_messages_record_nothing():
+    tracer = Tracer(sample_rate=0.0)
+    with tracer.trace("chat.message") as root:
+        assert root is NOOP_SPAN and not root
+        assert tracer.span("ai.http") is NOOP_SPAN
+        assert tracer.current() is None
+    assert not tracer.finished
@@ -0,0 +1,75 @@
+from src.ui.ui_bridge import UIBridge
+
+
+class StubRoot:
+    """Records after() calls instead of running a Tk main loop"""
+
+    def __init__(self):
+        self.scheduled = []
+        self.cancelled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append((ms, callback))
+        return f"after#{len(self.scheduled)}"
+
+    def after_cancel(self, after_id):
+        self.cancelled.append(after_id)
+
+
+def test_drain_batches_coalesces_and_drops():
+    bridge = UIBridge(interval_ms=20, max_batch=3, max_pending=5)
+    root = StubRoot()
+    batches, stats, calls = [], [], []
+    bridge.start(root, on_messages=batches.append, on_stats=stats.append)
+
+    for n in range(7):
+        bridge.post_message(f"user{n}", f"message {n}")
+    bridge.post_stats({'messages_received': 1})
+    bridge.post_stats({'messages_received': 2})
+    bridge.post_callback(calls.append, "lag")
+
+    assert bridge.messages_posted == 7
+    assert bridge.messages_dropped == 2
+    assert bridge.stats_coalesced == 1
+    assert bridge.pending == 5
+
+    # One frame: at most max_batch messages, only the newest stats, every callback
+    ms, tick = root.scheduled[-1]
+    assert ms == 20
+    tick()
+    assert [m['username'] for m in batches[0]] == ["user2", "user3", "user4"]
+    assert stats == [{'messages_received': 2}]
+    assert calls == ["lag"]
+    assert len(root.scheduled) == 2
+
+    bridge.drain()
+    assert [m['username'] for m in batches[1]] == ["user5", "user6"]
+    assert bridge.batches_rendered == 2
+    assert bridge.pending == 0
+
+    # Nothing pending: no empty batch, no repeated stats
+    bridge.drain()
+    assert len(batches) == 2 and len(stats) == 1
+
+    bridge.stop()
+    assert root.cancelled == ["after#2"]
+
+
+def test_render_errors_do_not_stop_delivery():
+    bridge = UIBridge()
+    calls = []
+
+    def broken(batch):
+        raise ValueError("widget destroyed")
+
+    bridge.on_messages = broken
+    bridge.on_stats = calls.append
+    bridge.post_message("alice", "hi")
+    bridge.post_stats({'n': 1})
+    bridge.post_callback(lambda: 1 / 0)
+    bridge.post_callback(calls.append, "after")
+    bridge.drain()
+
+    assert calls == [{'n': 1}, "after"]
+    assert bridge.batches_rendered == 0
+    assert bridge.pending == 0